@@ -0,0 +1,198 @@
+"""
+Memoization cache for deterministic calculation endpoints.
+
+Every calculation endpoint is a pure function of its request body, so results
+are cached under (endpoint, canonicalized request model, petrocalc version).
+Entries are evicted least-recently-used once the entry or byte budget is
+exceeded, and expire after a fixed time to live.
+"""
+
+import functools
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, List, Optional, Sequence, Set, Tuple
+
+from pydantic import BaseModel
+
+from app.config import get_config
+from app.metrics import mark_handler_end, mark_handler_start
+from app.responses import is_slim, slim_response
+
+_MISSING = object()
+
+
+def canonicalize(request: BaseModel, exclude: Optional[Set[str]] = None) -> str:
+    """Serialize a request model to a stable string, defaults included."""
+    return json.dumps(request.model_dump(mode="json", exclude=exclude), sort_keys=True, separators=(",", ":"))
+
+
+def _approximate_size(key: Tuple[str, str, str], value: Any) -> int:
+    """Approximate memory held by an entry, measured as its JSON size."""
+    try:
+        value_size = len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        value_size = 0
+    return sum(len(part) for part in key) + value_size
+
+
+class CalculationCache:
+    """Size-bounded LRU cache with a per-entry time to live."""
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024,
+                 ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a cached value, counting the lookup as a hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, size, value = entry
+                if expires_at >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.bytes -= size
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, size: int = 0):
+        """Store a value, evicting least-recently-used entries to stay in budget."""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+            self.bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def get_status(self) -> dict:
+        """Counters and memory use for ``/api/status``."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled_routers": sorted(config.cache_routers) if config.cache_routers is not None else "all",
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "approx_bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+config = get_config()
+
+# Global cache instance
+cache = CalculationCache(
+    max_entries=config.cache_max_entries,
+    max_bytes=config.cache_max_bytes,
+    ttl_seconds=config.cache_ttl_seconds,
+)
+
+
+def get_cache() -> CalculationCache:
+    """Get the global calculation cache."""
+    return cache
+
+
+def is_enabled_for(router_name: str) -> bool:
+    """Whether caching is switched on for a router (``PETROCALC_CACHE_ROUTERS``)."""
+    return config.cache_routers is None or router_name in config.cache_routers
+
+
+def cached(endpoint: Callable) -> Callable:
+    """
+    Cache the results of a calculation endpoint taking a single ``request`` model.
+
+    The router is taken from the endpoint's module, so caching can be switched
+    on or off per router. Only successful results are stored. The wrapper
+    also marks where request validation ends and serialization starts for
+    the request metrics, and returns the slim form of the result when the
+    request asked for it (see ``app.responses``).
+    """
+    router_name = endpoint.__module__.rsplit(".", 1)[-1]
+    endpoint_name = f"{router_name}.{endpoint.__name__}"
+    version: Optional[str] = None
+
+    @functools.wraps(endpoint)
+    async def wrapper(request: BaseModel):
+        mark_handler_start()
+        try:
+            result = await lookup(request)
+        finally:
+            mark_handler_end()
+        if is_slim():
+            return slim_response(request, result)
+        return result
+
+    async def lookup(request: BaseModel):
+        nonlocal version
+        if not is_enabled_for(router_name):
+            return await endpoint(request)
+        if version is None:
+            version = config.get_petrocalc_version()
+        key = (endpoint_name, canonicalize(request), version)
+        result = cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = await endpoint(request)
+            cache.set(key, result, _approximate_size(key, result))
+        return result
+
+    return wrapper
+
+
+async def cached_items(
+    endpoint_name: str,
+    items: Sequence[BaseModel],
+    compute: Callable[[List[BaseModel]], Awaitable[List[Any]]],
+    context: str = "",
+    exclude: Optional[Set[str]] = None
+) -> List[Any]:
+    """
+    Cache the per-item results of a batch calculation.
+
+    Each item is looked up on its own, under ``(endpoint_name, context,
+    item)`` where ``context`` holds the settings shared by the batch and
+    ``exclude`` names item fields (labels) that do not affect the result.
+    Only the items that miss are passed to ``compute``, in one call, which
+    returns their results in order. Caching follows the router prefix of
+    ``endpoint_name``.
+    """
+    if not is_enabled_for(endpoint_name.split(".", 1)[0]):
+        return await compute(list(items))
+    version = config.get_petrocalc_version()
+    keys = [(endpoint_name, context + canonicalize(item, exclude), version) for item in items]
+    results = [cache.get(key, _MISSING) for key in keys]
+    missing = [index for index, result in enumerate(results) if result is _MISSING]
+    if missing:
+        computed = await compute([items[index] for index in missing])
+        for index, result in zip(missing, computed):
+            results[index] = result
+            cache.set(keys[index], result, _approximate_size(keys[index], result))
+    return results
@@ -5,6 +5,8 @@ This application requires petrocalc to be installed via pip.
 Install it using: pip install petrocalc
 """
 
+import importlib.metadata
+import importlib.util
 import os
 import sys
 from pathlib import Path
@@ -16,7 +18,29 @@ class PetroCalcConfig:
     def __init__(self):
         self.app_root = Path(__file__).parent.parent
         self.petrocalc_location = None
+        self.petrocalc_path = None
+        self._petrocalc_version: Optional[str] = None
+        self._status_info: Optional[dict] = None
         self.is_development = self._detect_development_mode()
+        self.batch_max_items = int(os.getenv("PETROCALC_BATCH_MAX_ITEMS", "1000"))
+        self.executor_kind = os.getenv("PETROCALC_EXECUTOR", "thread")
+        self.executor_workers = int(os.getenv("PETROCALC_EXECUTOR_WORKERS", "0")) or None
+        self.executor_max_queue = int(os.getenv("PETROCALC_EXECUTOR_MAX_QUEUE", "64"))
+        self.offload_min_items = int(os.getenv("PETROCALC_OFFLOAD_MIN_ITEMS", "256"))
+        self.offload_enabled = os.getenv("PETROCALC_OFFLOAD", "1") != "0"
+        self.cache_routers = self._parse_cache_routers(os.getenv("PETROCALC_CACHE_ROUTERS", "all"))
+        self.cache_max_entries = int(os.getenv("PETROCALC_CACHE_MAX_ENTRIES", "4096"))
+        self.cache_max_bytes = int(os.getenv("PETROCALC_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.cache_ttl_seconds = float(os.getenv("PETROCALC_CACHE_TTL", "3600"))
+        self.bulk_chunk_rows = int(os.getenv("PETROCALC_BULK_CHUNK_ROWS", "1000"))
+        self.sweep_max_points = int(os.getenv("PETROCALC_SWEEP_MAX_POINTS", "1000000"))
+        self.server_host = os.getenv("PETROCALC_HOST", "0.0.0.0")
+        self.server_port = int(os.getenv("PETROCALC_PORT", "8000"))
+        self.server_workers = int(os.getenv("PETROCALC_WORKERS", "0")) or os.cpu_count() or 1
+        self.server_preload = os.getenv("PETROCALC_PRELOAD", "1") != "0"
+        self.server_keep_alive = int(os.getenv("PETROCALC_KEEP_ALIVE", "30"))
+        self.server_backlog = int(os.getenv("PETROCALC_BACKLOG", "4096"))
+        self.server_access_log = os.getenv("PETROCALC_ACCESS_LOG", "0") != "0"
         self._setup_petrocalc_import()
     
     def _detect_development_mode(self) -> bool:
@@ -26,13 +50,24 @@ class PetroCalcConfig:
             "--reload" in sys.argv
         )
     
+    @staticmethod
+    def _parse_cache_routers(value: str) -> Optional[set]:
+        """Parse the cached router list; ``None`` means every router is cached."""
+        value = value.strip().lower()
+        if value == "all":
+            return None
+        if value in ("", "none"):
+            return set()
+        return {name.strip() for name in value.split(",") if name.strip()}
+    
     def _setup_petrocalc_import(self):
-        """Setup petrocalc import."""
-        try:
-            import petrocalc
+        """Locate petrocalc without importing it; routers import it on first use."""
+        spec = importlib.util.find_spec("petrocalc")
+        if spec is not None:
             self.petrocalc_location = "pip_installed"
-            print(f"ℹ️  Using pip-installed petrocalc from: {petrocalc.__file__}")
-        except ImportError:
+            self.petrocalc_path = spec.origin
+            print(f"ℹ️  Using pip-installed petrocalc from: {spec.origin}")
+        else:
             self.petrocalc_location = "not_found"
             print("❌ petrocalc package not found!")
     
@@ -54,23 +89,29 @@ If petrocalc is not yet published to PyPI, you can install from source:
 """
         return ""
     
+    def get_petrocalc_version(self) -> str:
+        """Installed petrocalc version, read once from the package metadata."""
+        if self._petrocalc_version is None:
+            if not self.is_petrocalc_available():
+                self._petrocalc_version = 'not_installed'
+            else:
+                try:
+                    self._petrocalc_version = importlib.metadata.version("petrocalc")
+                except importlib.metadata.PackageNotFoundError:
+                    self._petrocalc_version = 'unknown'
+        return self._petrocalc_version
+    
     def get_status_info(self) -> dict:
-        """Get configuration status information."""
-        try:
-            import petrocalc
-            petrocalc_version = getattr(petrocalc, '__version__', 'unknown')
-            petrocalc_path = getattr(petrocalc, '__file__', 'unknown')
-        except ImportError:
-            petrocalc_version = 'not_installed'
-            petrocalc_path = 'not_found'
-        
-        return {
-            "app_root": str(self.app_root),
-            "is_development": self.is_development,
-            "petrocalc_location": self.petrocalc_location,
-            "petrocalc_version": petrocalc_version,
-            "petrocalc_path": petrocalc_path,
-        }
+        """Get configuration status information (computed once)."""
+        if self._status_info is None:
+            self._status_info = {
+                "app_root": str(self.app_root),
+                "is_development": self.is_development,
+                "petrocalc_location": self.petrocalc_location,
+                "petrocalc_version": self.get_petrocalc_version(),
+                "petrocalc_path": self.petrocalc_path or 'not_found',
+            }
+        return dict(self._status_info)
 
 # Global configuration instance
 config = PetroCalcConfig()
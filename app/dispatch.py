@@ -0,0 +1,128 @@
+"""
+In-process dispatch of calculation endpoints.
+
+Resolves an endpoint path such as ``/api/drilling/hydrostatic-pressure`` to
+the registered route and its Pydantic request model so that calculations can
+be validated and invoked without another HTTP round trip.
+"""
+
+import json
+from typing import Any, Dict, Optional, Type
+
+from fastapi import FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ValidationError
+from starlette.responses import Response
+
+from app.responses import response_mode, slim_result
+
+
+class CalculationRoute:
+    """A POST calculation endpoint that takes a single request model."""
+
+    def __init__(self, path: str, route: APIRoute, model: Type[BaseModel]):
+        self.path = path
+        self.route = route
+        self.model = model
+        self.endpoint = route.endpoint
+
+
+class DispatchError(Exception):
+    """Raised when a dispatched call fails, carrying an HTTP status code."""
+
+    def __init__(self, status_code: int, detail: Any):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _request_model(route: APIRoute) -> Optional[Type[BaseModel]]:
+    """Return the body model of a route whose only parameter is ``request``."""
+    dependant = route.dependant
+    params = dependant.body_params
+    if len(params) != 1 or dependant.query_params or dependant.path_params or dependant.request_param_name:
+        return None
+    field = params[0]
+    model = getattr(field, "type_", None) or getattr(field.field_info, "annotation", None)
+    if isinstance(model, type) and issubclass(model, BaseModel):
+        return model
+    return None
+
+
+def get_route_table(app: FastAPI) -> Dict[str, CalculationRoute]:
+    """
+    Build (once) the table of dispatchable calculation routes keyed by path.
+
+    Routes are read from ``app.state.calculation_routers``, the mapping of
+    API prefix to router that ``app.main`` includes in the application.
+    """
+    table = getattr(app.state, "calculation_routes", None)
+    if table is None:
+        table = {}
+        routers = getattr(app.state, "calculation_routers", {})
+        for prefix, router in routers.items():
+            for route in router.routes:
+                if not isinstance(route, APIRoute) or "POST" not in route.methods:
+                    continue
+                model = _request_model(route)
+                if model is not None:
+                    path = prefix + route.path
+                    table[path] = CalculationRoute(path, route, model)
+        app.state.calculation_routes = table
+    return table
+
+
+def normalize_endpoint(endpoint: str) -> str:
+    """Accept ``/api/drilling/x``, ``api/drilling/x`` or ``drilling/x``."""
+    path = "/" + endpoint.strip().strip("/")
+    if not path.startswith("/api/"):
+        path = "/api" + path
+    return path
+
+
+def resolve(app: FastAPI, endpoint: str) -> CalculationRoute:
+    """Look up a calculation route, raising DispatchError(404) if unknown."""
+    path = normalize_endpoint(endpoint)
+    route = get_route_table(app).get(path)
+    if route is None:
+        raise DispatchError(404, f"Unknown calculation endpoint: {endpoint}")
+    return route
+
+
+def validate(route: CalculationRoute, payload: Dict[str, Any]) -> BaseModel:
+    """Validate a payload against the route's request model."""
+    try:
+        return route.model.model_validate(payload)
+    except ValidationError as e:
+        raise DispatchError(422, jsonable_encoder(e.errors(include_url=False)))
+
+
+async def call(route: CalculationRoute, request: BaseModel, use_cache: bool = True, slim: bool = False) -> Any:
+    """
+    Invoke the endpoint with a validated request and return JSON-ready data.
+
+    ``use_cache=False`` bypasses the result cache, for bulk jobs whose
+    one-off inputs would otherwise evict frequently used entries.
+    ``slim=True`` drops the inputs the endpoint echoes back.
+    """
+    endpoint = route.endpoint if use_cache else getattr(route.endpoint, "__wrapped__", route.endpoint)
+    try:
+        # The caller encodes the combined response, so get the plain result
+        with response_mode(False):
+            result = await endpoint(request=request)
+    except HTTPException as e:
+        raise DispatchError(e.status_code, e.detail)
+    except Exception as e:
+        raise DispatchError(500, str(e))
+    if isinstance(result, Response):
+        if result.media_type and "json" in result.media_type:
+            return json.loads(result.body)
+        raise DispatchError(400, f"{route.path} returns {result.media_type} and cannot be dispatched")
+    return jsonable_encoder(slim_result(request, result) if slim else result)
+
+
+async def dispatch(app: FastAPI, endpoint: str, payload: Dict[str, Any], slim: bool = False) -> Any:
+    """Resolve, validate and call an endpoint in one step."""
+    route = resolve(app, endpoint)
+    return await call(route, validate(route, payload), slim=slim)
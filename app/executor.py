@@ -0,0 +1,273 @@
+"""
+Execution layer for petrocalc calculations.
+
+Route handlers are ``async def`` but petrocalc functions are synchronous, so a
+slow call made inline blocks every other request on the worker. Handlers call
+``run_calculation`` instead: cheap calls still run inline (a pool hop costs
+more than they do), while calls classified as expensive run in a bounded
+thread or process pool and the event loop stays responsive.
+
+Admission to the pool is decided per HTTP request: ``AdmissionMiddleware``
+gives each request an ``Admission`` record in a context variable, and once
+a request's first offloaded call is admitted the rest of its calls (a batch,
+sweep or chunked kernel fanning out) wait for a worker instead of being
+rejected.
+"""
+
+import asyncio
+import functools
+import inspect
+import os
+import time
+from contextvars import ContextVar
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import get_config
+from app.metrics import add_compute_time
+
+# Functions that are always offloaded, keyed by "<module>.<name>"
+OFFLOAD_FUNCTIONS = {
+    "petrocalc.production.well_test_analysis_horner",
+    "petrocalc.production.average_reservoir_pressure_mdh",
+    "petrocalc.economics.internal_rate_of_return",
+    "petrocalc.economics.discounted_payback_period",
+    "petrocalc.economics.unknown_interest_rate",
+    "app.traverse.pressure_traverse",
+}
+
+
+class Admission:
+    """Admission state of one HTTP request, shared by every call it makes."""
+
+    __slots__ = ("admitted", "waiting")
+
+    def __init__(self):
+        self.admitted = False
+        self.waiting = 0
+
+
+_admission: ContextVar[Optional[Admission]] = ContextVar("petrocalc_admission", default=None)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware giving every HTTP request its own ``Admission`` record."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _admission.set(Admission())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _admission.reset(token)
+
+
+def _function_key(func: Callable) -> str:
+    return f"{getattr(func, '__module__', '')}.{getattr(func, '__name__', '')}"
+
+
+class CalculationExecutor:
+    """Bounded pool that runs expensive calculations off the event loop."""
+
+    def __init__(self, kind: str = "thread", max_workers: Optional[int] = None,
+                 max_queue: int = 64, offload_min_items: int = 256, enabled: bool = True):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.offload_min_items = offload_min_items
+        self.enabled = enabled
+        self._pool: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop = None
+        # Counters are only touched from the event loop thread
+        self.active = 0
+        self.queued = 0
+        self.queued_requests = 0
+        self.offloaded = 0
+        self.inline = 0
+        self.rejected = 0
+
+    @property
+    def pool(self) -> Executor:
+        """Create the pool on first use so forked server workers get their own."""
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="petrocalc")
+        return self._pool
+
+    def should_offload(self, func: Callable, args: tuple, kwargs: dict) -> bool:
+        """Classify a call: listed functions and calls on long sequences are offloaded."""
+        if not self.enabled:
+            return False
+        if _function_key(func) in OFFLOAD_FUNCTIONS:
+            return True
+        for value in (*args, *kwargs.values()):
+            if hasattr(value, "__len__") and not isinstance(value, (str, bytes, dict)):
+                if len(value) >= self.offload_min_items:
+                    return True
+        return False
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        """Semaphore limiting pool occupancy, recreated if the event loop changes."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_workers)
+            self._slots_loop = loop
+        return self._slots
+
+    async def run(self, func: Callable, *args, offload: Optional[bool] = None, **kwargs) -> Any:
+        """
+        Run ``func(*args, **kwargs)``, offloading it to the pool if it is expensive.
+
+        ``offload`` overrides the automatic classification. Offloaded calls
+        wait on the event loop for a free worker. A request is admitted on its
+        first offloaded call; once ``max_queue`` requests are already waiting,
+        new requests are rejected with HTTPException(503), while the further
+        calls of an admitted request always wait their turn. Calls made
+        outside an HTTP request are each admitted on their own.
+        """
+        if offload is None:
+            offload = self.should_offload(func, args, kwargs)
+        if not offload:
+            self.inline += 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                add_compute_time(time.perf_counter() - start)
+
+        slots = self._get_slots()
+        admission = _admission.get()
+        if admission is None or not admission.admitted:
+            if slots.locked() and self.queued_requests >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="Calculation queue is full, retry later")
+            if admission is not None:
+                admission.admitted = True
+
+        self._enqueue(admission)
+        try:
+            await slots.acquire()
+        finally:
+            self._dequeue(admission)
+        self.active += 1
+        self.offloaded += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, functools.partial(func, *args, **kwargs))
+        finally:
+            add_compute_time(time.perf_counter() - start)
+            self.active -= 1
+            slots.release()
+
+    def _enqueue(self, admission: Optional[Admission]):
+        """Count a waiting call, and its request if it is the request's first."""
+        self.queued += 1
+        if admission is not None:
+            admission.waiting += 1
+            if admission.waiting > 1:
+                return
+        self.queued_requests += 1
+
+    def _dequeue(self, admission: Optional[Admission]):
+        self.queued -= 1
+        if admission is not None:
+            admission.waiting -= 1
+            if admission.waiting > 0:
+                return
+        self.queued_requests -= 1
+
+    def get_status(self) -> dict:
+        """Concurrency limits and current load for ``/api/status``."""
+        return {
+            "kind": self.kind,
+            "enabled": self.enabled,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "offload_min_items": self.offload_min_items,
+            "active": self.active,
+            "queued": self.queued,
+            "queued_requests": self.queued_requests,
+            "offloaded_total": self.offloaded,
+            "inline_total": self.inline,
+            "rejected_total": self.rejected,
+        }
+
+    def shutdown(self):
+        """Stop the pool; a new one is created on the next offloaded call."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_config = get_config()
+
+# Global executor instance
+executor = CalculationExecutor(
+    kind=_config.executor_kind,
+    max_workers=_config.executor_workers,
+    max_queue=_config.executor_max_queue,
+    offload_min_items=_config.offload_min_items,
+    enabled=_config.offload_enabled,
+)
+
+
+def get_executor() -> CalculationExecutor:
+    """Get the global calculation executor."""
+    return executor
+
+
+async def run_calculation(func: Callable, *args, **kwargs) -> Any:
+    """Run a calculation through the global executor."""
+    return await executor.run(func, *args, **kwargs)
+
+
+async def gather_bounded(awaitables: Iterable[Awaitable], limit: Optional[int] = None,
+                         semaphore: Optional[asyncio.Semaphore] = None) -> List[Any]:
+    """
+    Await ``awaitables`` with at most ``limit`` in flight, returning results in order.
+
+    ``limit`` defaults to the executor's ``max_workers``, so a request fanning
+    out into many calculations keeps the pool busy without piling every call
+    into its queue at once. Pass a ``semaphore`` instead to share one bound
+    between several gathers.
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(limit or executor.max_workers)
+
+    async def bounded(awaitable: Awaitable) -> Any:
+        try:
+            async with semaphore:
+                return await awaitable
+        finally:
+            # Close coroutines that never started (the gather was cancelled)
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+
+    return list(await asyncio.gather(*(bounded(awaitable) for awaitable in awaitables)))
+
+
+async def map_calculation(func: Callable, chunks: Iterable[Any], **kwargs) -> List[Any]:
+    """
+    Run ``func(chunk, **kwargs)`` for every chunk in the pool.
+
+    At most ``max_workers`` chunks are in flight at once. Results are
+    returned in chunk order. With offloading disabled the chunks run inline,
+    one after another.
+    """
+    return await gather_bounded(
+        executor.run(func, chunk, offload=executor.enabled, **kwargs) for chunk in chunks
+    )
@@ -0,0 +1,72 @@
+"""
+Vectorized NumPy kernels for petrocalc correlations.
+
+The petrocalc package evaluates one scalar set of inputs per call. The kernels
+in this package evaluate the same correlations over whole columns at once so
+batch endpoints never loop over rows in Python.
+"""
+
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+Column = Union[float, Sequence[float]]
+
+
+def broadcast_columns(columns: Dict[str, Column]) -> Tuple[Dict[str, np.ndarray], int]:
+    """
+    Convert columnar inputs to float arrays of a common length.
+
+    Scalars and single-element columns are broadcast to the length of the
+    longest column. Any other length mismatch raises ValueError.
+    """
+    arrays = {name: np.atleast_1d(np.asarray(values, dtype=float)) for name, values in columns.items()}
+    lengths = {array.size for array in arrays.values() if array.size != 1}
+    if len(lengths) > 1:
+        sizes = ", ".join(f"{name}={array.size}" for name, array in arrays.items())
+        raise ValueError(f"Column lengths do not match: {sizes}")
+    n_rows = lengths.pop() if lengths else 1
+    return {name: np.broadcast_to(array, (n_rows,)) for name, array in arrays.items()}, n_rows
+
+
+def split_columns(columns: Dict[str, np.ndarray], chunk_rows: int) -> List[Dict[str, np.ndarray]]:
+    """Split equal-length columns into chunks of at most ``chunk_rows`` rows."""
+    n_rows = len(next(iter(columns.values()))) if columns else 0
+    return [
+        {name: array[start:start + chunk_rows] for name, array in columns.items()}
+        for start in range(0, n_rows, chunk_rows)
+    ]
+
+
+class RowErrors:
+    """Per-row error mask collected while evaluating a batch."""
+
+    def __init__(self, n_rows: int):
+        self.valid = np.ones(n_rows, dtype=bool)
+        self.messages = np.full(n_rows, None, dtype=object)
+
+    def flag(self, condition: np.ndarray, message: str):
+        """Mark rows where ``condition`` holds as invalid, keeping the first message."""
+        new = np.asarray(condition, dtype=bool) & self.valid
+        self.messages[new] = message
+        self.valid &= ~new
+
+    def check_finite(self, arrays: Dict[str, np.ndarray]):
+        """Flag rows that contain NaN or infinite inputs."""
+        for name, array in arrays.items():
+            self.flag(~np.isfinite(array), f"{name} must be finite")
+
+    def check_result(self, result: np.ndarray):
+        """Flag rows whose computed result is not finite."""
+        self.flag(~np.isfinite(result), "calculation produced a non-finite result")
+
+    @property
+    def invalid_count(self) -> int:
+        return int((~self.valid).sum())
+
+
+def to_column(values: np.ndarray, valid: np.ndarray) -> list:
+    """Convert a result array to a JSON-ready list with ``None`` for invalid rows."""
+    column = np.asarray(values, dtype=float).astype(object)
+    column[~valid] = None
+    return column.tolist()
@@ -0,0 +1,337 @@
+"""
+Vectorized project economics and Monte Carlo sampling.
+
+Cash flows are arrays of shape (projects or trials, periods) with the same
+conventions as ``petrocalc.economics``: period ``i`` (from zero) is
+discounted by ``(1 + r) ** (i + 1)`` and the initial investment is spent at
+time zero. Every function evaluates all rows at once.
+"""
+
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Largest array (rows x rates, rates x periods or rows x periods) built at once
+# by the multiple-root grid scan
+GRID_SCAN_BLOCK_VALUES = 4_000_000
+
+# Variables of the Monte Carlo project model, in sampling order
+MONTE_CARLO_VARIABLES = (
+    "oil_price", "initial_rate", "decline_rate", "operating_cost_per_barrel",
+    "fixed_operating_cost", "capital_cost", "discount_rate"
+)
+
+
+def discount_factors(rate: np.ndarray, periods: int) -> np.ndarray:
+    """Discount factors ``(1 + r) ** -(i + 1)`` of shape (rows, periods)."""
+    factor = 1 / (1 + np.asarray(rate, dtype=float)[:, None])
+    return np.cumprod(np.broadcast_to(factor, (len(factor), periods)), axis=1)
+
+
+def net_present_value(cash_flows: np.ndarray, rate: np.ndarray, investment: np.ndarray) -> np.ndarray:
+    """NPV of every row of ``cash_flows`` at its own discount rate."""
+    return (cash_flows * discount_factors(rate, cash_flows.shape[1])).sum(axis=1) - investment
+
+
+def discounted_payback_period(cash_flows: np.ndarray, rate: np.ndarray, investment: np.ndarray) -> np.ndarray:
+    """Discounted payback in periods, interpolated within the period it occurs; inf if never."""
+    present = cash_flows * discount_factors(rate, cash_flows.shape[1])
+    cumulative = np.cumsum(present, axis=1) - investment[:, None]
+    paid = cumulative >= 0
+    ever = paid.any(axis=1)
+    period = np.argmax(paid, axis=1)
+    rows = np.arange(len(cash_flows))
+    before = cumulative[rows, period] - present[rows, period]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        payback = period + 1 - before / present[rows, period]
+    # Paid back at time zero (no investment) counts as zero periods
+    payback = np.where(investment <= 0, 0.0, payback)
+    return np.where(ever, payback, np.inf)
+
+
+def internal_rate_of_return(
+    cash_flows: np.ndarray,
+    investment: np.ndarray,
+    tolerance: float = 1e-10,
+    min_rate: float = -0.99,
+    max_rate: float = 10.0,
+    max_iterations: int = 100,
+    low: Optional[np.ndarray] = None,
+    high: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    IRR of every row by safeguarded Newton iteration inside a bisection bracket.
+
+    The root is bracketed in ``[min_rate, max_rate]`` (or per-row ``low`` and
+    ``high`` arrays) by the sign of the NPV at the bracket ends. Each
+    iteration tries a Newton step and falls back to bisection when the step
+    leaves the bracket; the bracket shrinks either way, so every row
+    converges. Returns the rates and the iteration counts; rows without a
+    sign change in the bracket get NaN and zero iterations.
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    investment = np.asarray(investment, dtype=float)
+    n_rows, periods = cash_flows.shape
+    exponents = np.arange(1, periods + 1)
+
+    def npv_and_slope(rate, rows):
+        growth = 1 + rate[:, None]
+        # Running products are much cheaper than powers
+        factors = np.cumprod(np.broadcast_to(1 / growth, (len(rows), periods)), axis=1)
+        values = (cash_flows[rows] * factors).sum(axis=1) - investment[rows]
+        slopes = -(cash_flows[rows] * exponents * factors / growth).sum(axis=1)
+        return values, slopes
+
+    all_rows = np.arange(n_rows)
+    low = np.full(n_rows, min_rate) if low is None else np.array(low, dtype=float)
+    high = np.full(n_rows, max_rate) if high is None else np.array(high, dtype=float)
+    f_low, _ = npv_and_slope(low, all_rows)
+    f_high, _ = npv_and_slope(high, all_rows)
+    bracketed = np.sign(f_low) * np.sign(f_high) <= 0
+    start = np.where((low < 0.1) & (0.1 < high), 0.1, 0.5 * (low + high))
+    rate = np.where(bracketed, start, np.nan)
+    iterations = np.zeros(n_rows, dtype=int)
+    active = bracketed.copy()
+    for _ in range(max_iterations):
+        if not active.any():
+            break
+        rows = np.flatnonzero(active)
+        iterations[rows] += 1
+        values, slopes = npv_and_slope(rate[rows], rows)
+        # Keep the half of the bracket that still holds the sign change
+        below = np.sign(values) == np.sign(f_low[rows])
+        low[rows] = np.where(below, rate[rows], low[rows])
+        f_low[rows] = np.where(below, values, f_low[rows])
+        high[rows] = np.where(below, high[rows], rate[rows])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            newton = rate[rows] - values / slopes
+        inside = np.isfinite(newton) & (newton > low[rows]) & (newton < high[rows])
+        step = np.where(inside, newton, 0.5 * (low[rows] + high[rows]))
+        done = (np.abs(step - rate[rows]) <= tolerance * (1 + np.abs(step))) | (values == 0)
+        rate[rows] = np.where(values == 0, rate[rows], step)
+        active[rows[done]] = False
+    return rate, iterations
+
+
+def sign_changes(cash_flows: np.ndarray, investment: np.ndarray) -> np.ndarray:
+    """
+    Sign changes of each row's cash-flow sequence, investment first.
+
+    By Descartes' rule of signs this bounds the number of IRRs above -100%:
+    none without a sign change, exactly one with a single change.
+    """
+    sequence = np.sign(np.column_stack([-np.asarray(investment, dtype=float), cash_flows]))
+    # Zero flows do not break a run of equal signs: carry the last non-zero sign forward
+    index = np.where(sequence != 0, np.arange(sequence.shape[1]), 0)
+    carried = np.take_along_axis(sequence, np.maximum.accumulate(index, axis=1), axis=1)
+    return ((carried[:, 1:] * carried[:, :-1]) < 0).sum(axis=1)
+
+
+def grid_crossings(cash_flows: np.ndarray, investment: np.ndarray, grid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rows and grid intervals ``(row, i)`` where the NPV changes sign between ``grid[i]`` and ``grid[i + 1]``.
+
+    The NPV of a block of rows at a block of rates is one matrix product with
+    the rates' discount factors; blocks are sized so that no intermediate
+    array holds more than ``GRID_SCAN_BLOCK_VALUES`` values, whatever the
+    number of rows, periods and grid points.
+    """
+    n_rows, periods = cash_flows.shape
+    grid_points = len(grid)
+    rows_per_block = max(1, GRID_SCAN_BLOCK_VALUES // max(grid_points, periods))
+    rates_per_block = max(1, GRID_SCAN_BLOCK_VALUES // max(periods, rows_per_block))
+    pair_row, pair_interval = [], []
+    for start in range(0, n_rows, rows_per_block):
+        flows = cash_flows[start:start + rows_per_block]
+        signs = np.empty((len(flows), grid_points))
+        for first in range(0, grid_points, rates_per_block):
+            rates = grid[first:first + rates_per_block]
+            values = flows @ discount_factors(rates, periods).T - investment[start:start + len(flows), None]
+            signs[:, first:first + len(rates)] = np.sign(values)
+        crossing = signs[:, :-1] * signs[:, 1:] <= 0
+        # A zero exactly on a grid point would be counted by both neighbouring intervals
+        crossing[:, 1:] &= signs[:, 1:-1] != 0
+        rows, intervals = np.nonzero(crossing)
+        pair_row.append(rows + start)
+        pair_interval.append(intervals)
+    return np.concatenate(pair_row), np.concatenate(pair_interval)
+
+
+def irr_roots(
+    cash_flows: np.ndarray,
+    investment: np.ndarray,
+    tolerance: float = 1e-10,
+    min_rate: float = -0.99,
+    max_rate: float = 10.0,
+    grid_points: int = 200,
+    max_iterations: int = 100
+) -> Dict[str, Any]:
+    """
+    Every IRR in ``[min_rate, max_rate]`` of every row, with a status per row.
+
+    Rows with one sign change in their cash flows have at most one IRR and
+    are solved on the whole range. Rows with more are scanned on a grid of
+    ``grid_points`` rates (uniform in log(1 + r)) in blocks of bounded size
+    (see ``grid_crossings``); every interval where the NPV changes sign is
+    solved separately. Roots that touch zero without
+    crossing it between grid points are not detected.
+
+    Returns ``irr`` (the lowest root, NaN if none), ``root_count``,
+    ``status`` (``ok``, ``multiple_roots`` or ``no_root``), ``iterations``,
+    ``sign_changes`` and ``roots`` (all roots of multiple-root rows, by row).
+    """
+    cash_flows = np.asarray(cash_flows, dtype=float)
+    investment = np.asarray(investment, dtype=float)
+    n_rows = len(cash_flows)
+    changes = sign_changes(cash_flows, investment)
+    irr = np.full(n_rows, np.nan)
+    iterations = np.zeros(n_rows, dtype=int)
+    root_count = np.zeros(n_rows, dtype=int)
+    roots: Dict[int, List[float]] = {}
+
+    single = np.flatnonzero(changes == 1)
+    if len(single):
+        irr[single], iterations[single] = internal_rate_of_return(
+            cash_flows[single], investment[single], tolerance, min_rate, max_rate, max_iterations
+        )
+        root_count[single] = np.isfinite(irr[single])
+
+    several = np.flatnonzero(changes > 1)
+    if len(several):
+        grid = np.expm1(np.linspace(np.log1p(min_rate), np.log1p(max_rate), grid_points))
+        pair_row, pair_interval = grid_crossings(cash_flows[several], investment[several], grid)
+        rows = several[pair_row]
+        found, steps = internal_rate_of_return(
+            cash_flows[rows], investment[rows], tolerance, max_iterations=max_iterations,
+            low=grid[pair_interval], high=grid[pair_interval + 1]
+        )
+        np.add.at(root_count, rows, 1)
+        np.add.at(iterations, rows, steps)
+        for row, rate in zip(rows.tolist(), found.tolist()):
+            roots.setdefault(row, []).append(rate)
+        for row, rates in roots.items():
+            irr[row] = rates[0]
+
+    status = np.where(root_count == 0, "no_root", np.where(root_count > 1, "multiple_roots", "ok"))
+    return {
+        "irr": irr,
+        "root_count": root_count,
+        "status": status,
+        "iterations": iterations,
+        "sign_changes": changes,
+        "roots": {row: rates for row, rates in roots.items() if len(rates) > 1},
+    }
+
+
+def sample(spec: Dict[str, Any], n: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Draw ``n`` values of one input.
+
+    ``spec`` is a number (a fixed value) or a dict with ``distribution``
+    (``fixed``, ``uniform``, ``triangular``, ``normal`` or ``lognormal``)
+    and its parameters: ``value``; ``low``/``high``; ``low``/``mode``/``high``;
+    ``mean``/``std`` (for ``lognormal`` the mean and standard deviation of
+    the value itself). ``low``/``high`` truncate normal and lognormal draws.
+    """
+    if not isinstance(spec, dict):
+        return np.full(n, float(spec))
+    kind = spec["distribution"]
+    if kind == "fixed":
+        return np.full(n, float(spec["value"]))
+    if kind == "uniform":
+        return rng.uniform(spec["low"], spec["high"], n)
+    if kind == "triangular":
+        return rng.triangular(spec["low"], spec["mode"], spec["high"], n)
+    if kind == "normal":
+        values = rng.normal(spec["mean"], spec["std"], n)
+    elif kind == "lognormal":
+        mu, sigma = _lognormal_parameters(spec["mean"], spec["std"])
+        values = rng.lognormal(mu, sigma, n)
+    else:
+        raise ValueError(f"Unknown distribution '{kind}'")
+    return np.clip(values, spec.get("low", -np.inf), spec.get("high", np.inf))
+
+
+def quantile(spec: Dict[str, Any], probability: float) -> float:
+    """Value of one input at a cumulative probability (the inverse of ``sample``)."""
+    if not isinstance(spec, dict):
+        return float(spec)
+    kind = spec["distribution"]
+    if kind == "fixed":
+        return float(spec["value"])
+    if kind == "uniform":
+        return spec["low"] + probability * (spec["high"] - spec["low"])
+    if kind == "triangular":
+        low, mode, high = spec["low"], spec["mode"], spec["high"]
+        split = (mode - low) / (high - low) if high > low else 0.0
+        if probability < split:
+            return low + np.sqrt(probability * (high - low) * (mode - low))
+        return high - np.sqrt((1 - probability) * (high - low) * (high - mode))
+    if kind == "normal":
+        value = NormalDist(spec["mean"], spec["std"]).inv_cdf(probability)
+    else:
+        mu, sigma = _lognormal_parameters(spec["mean"], spec["std"])
+        value = float(np.exp(NormalDist(mu, sigma).inv_cdf(probability)))
+    return float(np.clip(value, spec.get("low", -np.inf), spec.get("high", np.inf)))
+
+
+def _lognormal_parameters(mean: float, std: float) -> Tuple[float, float]:
+    """Mean and standard deviation of log(x) for a lognormal x with the given mean and std."""
+    sigma_squared = np.log(1 + (std / mean) ** 2)
+    return float(np.log(mean) - sigma_squared / 2), float(np.sqrt(sigma_squared))
+
+
+def project_cash_flows(inputs: Dict[str, np.ndarray], years: int, royalty_rate: float) -> np.ndarray:
+    """
+    Annual net cash flows of an oil project for arrays of inputs.
+
+    Production declines exponentially from ``initial_rate`` (bbl/day) at the
+    nominal annual ``decline_rate``; each year's volume is the integral of
+    the rate over the year. Net revenue follows ``oil_revenue_calculation``
+    (price less royalty less per-barrel opex) minus the fixed annual opex.
+    """
+    decline = inputs["decline_rate"][:, None]
+    start = np.arange(years)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fraction = np.where(
+            decline > 1e-12, (np.exp(-decline * start) - np.exp(-decline * (start + 1))) / decline, 1.0
+        )
+    volume = inputs["initial_rate"][:, None] * 365 * fraction
+    margin = inputs["oil_price"][:, None] * (1 - royalty_rate) - inputs["operating_cost_per_barrel"][:, None]
+    return volume * margin - inputs["fixed_operating_cost"][:, None]
+
+
+def monte_carlo_chunk(
+    chunk: Tuple[np.random.SeedSequence, int],
+    specs: Dict[str, Any],
+    years: int,
+    royalty_rate: float
+) -> Dict[str, np.ndarray]:
+    """
+    NPV, IRR and discounted payback of one chunk of trials.
+
+    ``chunk`` is the chunk's seed sequence and trial count; inputs are drawn
+    in ``MONTE_CARLO_VARIABLES`` order from a generator seeded by it, so a
+    chunk gives the same trials whichever worker runs it.
+    """
+    seed, n = chunk
+    rng = np.random.default_rng(seed)
+    inputs = {name: sample(specs[name], n, rng) for name in MONTE_CARLO_VARIABLES}
+    return evaluate_project(inputs, years, royalty_rate)
+
+
+def evaluate_project(inputs: Dict[str, np.ndarray], years: int, royalty_rate: float,
+                     metrics: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """NPV (and unless ``metrics`` says otherwise IRR and payback) of arrays of project inputs."""
+    metrics = metrics or ["npv", "irr", "payback"]
+    cash_flows = project_cash_flows(inputs, years, royalty_rate)
+    capital = inputs["capital_cost"]
+    result = {}
+    if "npv" in metrics:
+        result["npv"] = net_present_value(cash_flows, inputs["discount_rate"], capital)
+    if "irr" in metrics:
+        result["irr"] = internal_rate_of_return(cash_flows, capital)[0]
+    if "payback" in metrics:
+        result["payback"] = discounted_payback_period(cash_flows, inputs["discount_rate"], capital)
+    return result
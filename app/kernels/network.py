@@ -0,0 +1,179 @@
+"""
+Steady-state gas network solver on the Weymouth equation.
+
+Pipes connect nodes; some nodes have a fixed pressure, the others a fixed
+net flow (supply positive, offtake negative). Flow in each pipe follows
+Weymouth, q = C * sign(dpi) * sqrt(|dpi|) with dpi the difference of the
+squared end pressures. Newton's method solves for the pipe flows and the
+squared pressures of the free nodes together; each step solves a
+pipe-weighted graph Laplacian, built and factorized as a sparse matrix when
+SciPy is installed.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+try:
+    from scipy import sparse
+    from scipy.sparse.csgraph import connected_components
+    from scipy.sparse.linalg import spsolve
+except ImportError:  # pragma: no cover - SciPy is optional
+    sparse = None
+
+# Weymouth constant for Mscf/day with pressures in psia, diameter in inches, length in miles
+WEYMOUTH_CONSTANT = 433.5
+# Flows below this fraction of the largest pipe flow are raised to it when
+# weighting the Newton system, which would be singular for stagnant pipes
+MIN_FLOW_FRACTION = 1e-9
+# Largest network solved with dense linear algebra when SciPy is missing
+MAX_DENSE_NODES = 3000
+
+
+def weymouth_coefficient(diameter, length, gas_gravity, temperature, efficiency=1.0) -> np.ndarray:
+    """Pipe coefficient C of ``q = C * sqrt(p1**2 - p2**2)`` in Mscf/day per psia."""
+    return WEYMOUTH_CONSTANT * efficiency * diameter ** (8 / 3) / np.sqrt(gas_gravity * temperature * length)
+
+
+def weymouth_flow(coefficient: np.ndarray, squared_drop: np.ndarray) -> np.ndarray:
+    """Pipe flows (Mscf/day) for the given drops in squared pressure."""
+    return coefficient * np.sign(squared_drop) * np.sqrt(np.abs(squared_drop))
+
+
+def _laplacian(free_index, pipe_from, pipe_to, weight, n_free):
+    """Weighted graph Laplacian over the free nodes, sparse when SciPy is available."""
+    i, j = free_index[pipe_from], free_index[pipe_to]
+    both = (i >= 0) & (j >= 0)
+    rows = np.concatenate([i[i >= 0], j[j >= 0], i[both], j[both]])
+    cols = np.concatenate([i[i >= 0], j[j >= 0], j[both], i[both]])
+    data = np.concatenate([weight[i >= 0], weight[j >= 0], -weight[both], -weight[both]])
+    if sparse is not None:
+        return sparse.csc_matrix((data, (rows, cols)), shape=(n_free, n_free))
+    matrix = np.zeros((n_free, n_free))
+    np.add.at(matrix, (rows, cols), data)
+    return matrix
+
+
+def _solve(matrix, rhs):
+    if sparse is not None:
+        return spsolve(matrix, rhs)
+    return np.linalg.solve(matrix, rhs)
+
+
+def check_connected(n_nodes: int, pipe_from: np.ndarray, pipe_to: np.ndarray, fixed: np.ndarray):
+    """Raise ValueError if some node has no path to a fixed-pressure node."""
+    if not fixed.any():
+        raise ValueError("At least one node needs a fixed pressure")
+    if sparse is None:
+        return
+    graph = sparse.coo_matrix((np.ones(len(pipe_from)), (pipe_from, pipe_to)), shape=(n_nodes, n_nodes))
+    _, labels = connected_components(graph, directed=False)
+    anchored = np.zeros(labels.max() + 1, dtype=bool)
+    anchored[labels[fixed]] = True
+    floating = np.flatnonzero(~anchored[labels])
+    if len(floating):
+        raise ValueError(f"{len(floating)} nodes have no path to a fixed-pressure node")
+
+
+def solve_network(
+    pipe_from: np.ndarray,
+    pipe_to: np.ndarray,
+    coefficient: np.ndarray,
+    fixed: np.ndarray,
+    pressure: np.ndarray,
+    injection: np.ndarray,
+    initial_pressure: Optional[np.ndarray] = None,
+    initial_flow: Optional[np.ndarray] = None,
+    tolerance: float = 1e-6,
+    max_iterations: int = 50
+) -> Dict[str, np.ndarray]:
+    """
+    Node pressures and pipe flows of a Weymouth network.
+
+    Nodes are numbered 0..n-1; ``pipe_from``/``pipe_to`` index them and
+    positive pipe flow runs from ``pipe_from`` to ``pipe_to``. ``pressure``
+    holds the fixed pressures (psia) where ``fixed`` is set and
+    ``injection`` the net flow into the other nodes (Mscf/day).
+
+    Each Newton step solves for pipe flows and squared pressures together
+    (the global gradient algorithm), so the returned flows balance at every
+    node and stay well-behaved for pipes with little or no flow. Iteration
+    stops when the step, the largest change in squared pressure relative to
+    the largest squared pressure or in pipe flow relative to the largest
+    flow, is within ``tolerance``, or when it stops shrinking (the solution
+    is then at the rounding floor, or not converging). A step only depends
+    on the previous flows: a warm restart passes the previous solution's
+    ``initial_flow`` (balanced, so the first step starts from a consistent
+    state), or else ``initial_pressure``, from which the flows are derived
+    with Weymouth. Without either the iteration starts from a linear-flow
+    solution of the same network.
+    """
+    n_nodes = len(fixed)
+    check_connected(n_nodes, pipe_from, pipe_to, fixed)
+    free = ~fixed
+    n_free = int(free.sum())
+    if sparse is None and n_free > MAX_DENSE_NODES:
+        raise ValueError(f"Networks over {MAX_DENSE_NODES} free nodes need SciPy for sparse solves")
+    free_index = np.full(n_nodes, -1)
+    free_index[free] = np.arange(n_free)
+
+    # Squared pressures are carried relative to the highest fixed one: the drops
+    # across lightly loaded pipes are far below the rounding of p**2 itself
+    base = (pressure[fixed] ** 2).max()
+    squared = np.where(fixed, pressure ** 2 - base, 0.0)
+
+    def solve_free(weight, rhs):
+        """Squared pressures of the free nodes from pipe weights and nodal right-hand sides."""
+        rhs = (rhs + np.bincount(pipe_to, weight * squared[pipe_from] * fixed[pipe_from], n_nodes)
+               + np.bincount(pipe_from, weight * squared[pipe_to] * fixed[pipe_to], n_nodes))
+        solution = _solve(_laplacian(free_index, pipe_from, pipe_to, weight, n_free), rhs[free])
+        if not np.all(np.isfinite(solution)):
+            raise ValueError("Network equations are singular")
+        return solution
+
+    def scale(flow):
+        return max(np.abs(flow).max(), np.abs(injection).max(), 1.0)
+
+    def inflow(flow):
+        return np.bincount(pipe_to, flow, n_nodes) - np.bincount(pipe_from, flow, n_nodes)
+
+    if initial_flow is not None:
+        pipe_flow = np.array(initial_flow, dtype=float)
+    else:
+        if initial_pressure is not None:
+            squared[free] = initial_pressure[free] ** 2 - base
+        elif n_free:
+            # Start from linear pipes, q = C * dpi / p, scaled to the largest fixed pressure
+            squared[free] = solve_free(coefficient / np.sqrt(max(base, 1.0)), injection)
+        pipe_flow = weymouth_flow(coefficient, squared[pipe_from] - squared[pipe_to])
+
+    iterations = 0
+    step = previous = np.inf
+    while n_free and iterations < max_iterations:
+        iterations += 1
+        # Newton step on dpi = q|q| / C**2 and the flow balance, with pipe flows as unknowns
+        # next to the squared pressures: q' = q / 2 + C**2 / (2|q|) * dpi', balanced at every node
+        magnitude = np.maximum(np.abs(pipe_flow), MIN_FLOW_FRACTION * max(np.abs(pipe_flow).max(), 1.0))
+        weight = coefficient ** 2 / (2 * magnitude)
+        before = squared[free]
+        squared[free] = solve_free(weight, injection + inflow(pipe_flow / 2))
+        new_flow = pipe_flow / 2 + weight * (squared[pipe_from] - squared[pipe_to])
+        step = max(np.abs(squared[free] - before).max() / base,
+                   np.abs(new_flow - pipe_flow).max() / scale(new_flow))
+        pipe_flow = new_flow
+        if step <= tolerance or step >= previous:
+            break
+        previous = step
+
+    if np.any(squared <= -base):
+        raise ValueError("Demand exceeds what the network can deliver: node pressures fall to zero")
+    balance = injection + inflow(pipe_flow)
+    return {
+        "pressure": np.sqrt(squared + base),
+        "flow": pipe_flow,
+        "node_flow": injection - balance,
+        "residual": np.abs(balance[free]).max() / scale(pipe_flow) if n_free else 0.0,
+        "step": step if n_free else 0.0,
+        "iterations": iterations,
+        "converged": not n_free or step <= tolerance,
+    }
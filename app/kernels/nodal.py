@@ -0,0 +1,128 @@
+"""
+Vectorized nodal analysis.
+
+The vertical lift performance (VLP) of a well is found by integrating the
+Beggs-Brill pressure gradient from the wellhead down to the perforations;
+gas density and in-situ gas rate follow the local pressure. The operating
+point is where the VLP meets the Vogel IPR, found per well with a bracketed
+root-finder. Every step works on arrays of wells (and rates) at once.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from app.kernels.production import multiphase_flow_beggs_brill, vogel_bottomhole_pressure
+
+# psia * lb-mol / (ft3 * °R) over the molecular weight of air, for gas density
+GAS_DENSITY_FACTOR = 2.7
+# Gas formation volume factor constant, ft3/scf = 0.02827 z T / p
+GAS_FVF_FACTOR = 0.02827
+
+
+def vlp_bottomhole_pressure(well: Dict[str, np.ndarray], liquid_rate: np.ndarray, steps: int = 50) -> np.ndarray:
+    """
+    Flowing bottomhole pressure (psia) of a vertical well at ``liquid_rate`` (STB/day).
+
+    ``well`` holds ``wellhead_pressure``, ``depth``, ``tubing_diameter``,
+    ``gas_liquid_ratio``, ``liquid_density``, ``gas_gravity``,
+    ``liquid_viscosity``, ``gas_viscosity``, ``temperature`` and
+    ``z_factor`` arrays that broadcast against ``liquid_rate``. The gradient
+    is integrated over ``steps`` depth increments with Heun's method.
+    """
+    temperature_r = well["temperature"] + 459.67
+    gas_surface_rate = liquid_rate * well["gas_liquid_ratio"] / 1000
+    dz = well["depth"] / steps
+
+    def gradient(pressure):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            gas_fvf = GAS_FVF_FACTOR * well["z_factor"] * temperature_r / pressure
+            gas_density = GAS_DENSITY_FACTOR * well["gas_gravity"] * pressure / (well["z_factor"] * temperature_r)
+        return multiphase_flow_beggs_brill(
+            liquid_rate, gas_surface_rate * gas_fvf, well["tubing_diameter"], 90.0,
+            well["liquid_density"], gas_density, well["liquid_viscosity"], well["gas_viscosity"]
+        )[0]
+
+    pressure = np.broadcast_to(well["wellhead_pressure"], np.broadcast(liquid_rate, well["wellhead_pressure"]).shape)
+    for _ in range(steps):
+        k1 = gradient(pressure)
+        k2 = gradient(pressure + k1 * dz)
+        pressure = pressure + 0.5 * (k1 + k2) * dz
+    return pressure
+
+
+def nodal_analysis(
+    well: Dict[str, np.ndarray],
+    rate_points: int = 30,
+    depth_steps: int = 50,
+    tolerance: float = 0.1,
+    rate_tolerance: float = 0.01,
+    max_iterations: int = 60
+) -> Dict[str, np.ndarray]:
+    """
+    Operating point of every well: the highest rate where the VLP meets the IPR.
+
+    ``well`` holds 1-D ``reservoir_pressure`` and ``maximum_oil_rate`` arrays
+    plus the inputs of ``vlp_bottomhole_pressure``. Both curves are sampled
+    at ``rate_points`` rates up to qmax; the last interval where the IPR
+    pressure drops below the VLP brackets the stable solution, which is then
+    refined with the Illinois (modified regula falsi) method until the
+    pressures agree within ``tolerance`` psi or the bracket is narrower than
+    ``rate_tolerance`` STB/day; the simplified Beggs-Brill gradient jumps at
+    its holdup and flow regime limits, so some crossings are a step rather
+    than a root. Wells without a crossing do not flow and get NaN.
+    """
+    column = {name: np.asarray(values, dtype=float)[:, None] for name, values in well.items()}
+    pr = column["reservoir_pressure"]
+    qmax = column["maximum_oil_rate"]
+
+    def mismatch(rate, wells):
+        subset = {name: values[wells] for name, values in column.items()}
+        vlp = vlp_bottomhole_pressure(subset, rate[:, None], depth_steps)[:, 0]
+        return vlp - vogel_bottomhole_pressure(pr[wells, 0], rate, qmax[wells, 0])
+
+    rates = qmax * np.linspace(0.01, 1.0, rate_points)
+    vlp = vlp_bottomhole_pressure(column, rates, depth_steps)
+    ipr = vogel_bottomhole_pressure(pr, rates, qmax)
+    difference = vlp - ipr
+
+    # Last rate where the IPR is still above the VLP; the next one is below it
+    below = difference < 0
+    flowing = below.any(axis=1) & ~below[:, -1]
+    last = np.where(flowing, rate_points - 1 - np.argmax(below[:, ::-1], axis=1), 0)
+    upper = np.minimum(last + 1, rate_points - 1)
+    rows = np.arange(len(pr))
+    a, b = rates[rows, last], rates[rows, upper]
+    fa, fb = difference[rows, last], difference[rows, upper]
+
+    rate = np.where(flowing, a, np.nan)
+    side = np.zeros(len(pr))
+    iterations = np.zeros(len(pr), dtype=int)
+    active = flowing.copy()
+    # Only wells that have not converged are evaluated again
+    while active.any() and iterations.max() < max_iterations:
+        i = np.flatnonzero(active)
+        iterations[i] += 1
+        with np.errstate(invalid="ignore", divide="ignore"):
+            c = np.where(fb[i] != fa[i], (a[i] * fb[i] - b[i] * fa[i]) / (fb[i] - fa[i]), 0.5 * (a[i] + b[i]))
+        fc = mismatch(c, i)
+        rate[i] = c
+        active[i[(np.abs(fc) <= tolerance) | (np.abs(b[i] - a[i]) <= rate_tolerance)]] = False
+
+        # Keep the bracket; halve the stale end's value when one end is retained twice
+        move_a = fc * fa[i] > 0
+        fb[i] = np.where(move_a & (side[i] == -1), fb[i] / 2, fb[i])
+        fa[i] = np.where(~move_a & (side[i] == 1), fa[i] / 2, fa[i])
+        a[i], fa[i] = np.where(move_a, c, a[i]), np.where(move_a, fc, fa[i])
+        b[i], fb[i] = np.where(move_a, b[i], c), np.where(move_a, fb[i], fc)
+        side[i] = np.where(move_a, -1, 1)
+
+    return {
+        "flowing": flowing,
+        "operating_rate": rate,
+        "operating_pressure": vogel_bottomhole_pressure(pr[:, 0], rate, qmax[:, 0]),
+        "rates": rates,
+        "vlp_pressure": vlp,
+        "ipr_pressure": ipr,
+        "iterations": iterations,
+    }
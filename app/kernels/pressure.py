@@ -0,0 +1,192 @@
+"""
+Vectorized pressure kernels: depth profiles of pore, overburden and
+fracture pressure, and the kill sheet with its pump schedule.
+
+Volumes are in barrels, lengths and depths in feet, mud weights in ppg and
+pressures in psi. ``pressure_profile`` evaluates a whole well on its depth
+grid in one pass, integrating the density log cumulatively for the
+overburden.
+
+For the kill sheet, the drillstring and the annulus are lists of sections
+in the order the mud travels through them (surface to bit, then bit to
+surface); each section has a measured length, a capacity and, for the
+drillstring, the true vertical depth it spans. ``pump_schedule`` evaluates the drillpipe
+pressure for any array of stroke counts at once.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+# Psi per ft per ppg
+PRESSURE_GRADIENT_FACTOR = 0.052
+# Capacity in bbl/ft is diameter squared (in) over this
+CAPACITY_FACTOR = 1029.4
+# Psi per ft per g/cm3 (8.345 ppg)
+DENSITY_GRADIENT_FACTOR = PRESSURE_GRADIENT_FACTOR * 8.345
+
+
+def overburden_pressure_gradient(depth: np.ndarray) -> np.ndarray:
+    """Average overburden gradient (psi/ft) to each depth, the trend of ``petrocalc.pressure``."""
+    depth = np.asarray(depth, dtype=float)
+    gradient = np.where(depth < 1000, 0.8 + 0.15 * (depth / 1000), 0.95 + 0.05 * ((depth - 1000) / 9000))
+    return np.minimum(1.1, gradient)
+
+
+def fracture_pressure(overburden: np.ndarray, pore_pressure: np.ndarray, poisson_ratio: np.ndarray) -> np.ndarray:
+    """Eaton's fracture pressure (or gradient) from overburden and pore pressure (or gradients)."""
+    k = poisson_ratio / (1 - poisson_ratio)
+    return k * (overburden - pore_pressure) + pore_pressure
+
+
+def equivalent_mud_weight(pressure: np.ndarray, depth: np.ndarray) -> np.ndarray:
+    """Equivalent mud weight (ppg) of a pressure at depth; NaN at the surface."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(depth > 0, pressure / (PRESSURE_GRADIENT_FACTOR * depth), np.nan)
+
+
+def overburden_from_density(depth: np.ndarray, bulk_density: np.ndarray) -> np.ndarray:
+    """
+    Overburden pressure (psi) integrated from a bulk density log (g/cm3) with the trapezoidal rule.
+
+    Gaps (NaN) in the log are filled by linear interpolation. Above the first
+    sample the overburden follows ``overburden_pressure_gradient``.
+    """
+    finite = np.isfinite(bulk_density)
+    if not finite.any():
+        raise ValueError("The density log has no valid samples")
+    density = np.interp(depth, depth[finite], bulk_density[finite])
+    gradient = DENSITY_GRADIENT_FACTOR * density
+    steps = np.diff(depth) * (gradient[1:] + gradient[:-1]) / 2
+    start = overburden_pressure_gradient(depth[0]) * depth[0]
+    return start + np.concatenate([[0.0], np.cumsum(steps)])
+
+
+def eaton_pore_pressure(overburden: np.ndarray, hydrostatic: np.ndarray, ratio: np.ndarray,
+                        exponent: float = 3.0) -> np.ndarray:
+    """
+    Eaton's pore pressure from the ratio of normal to observed log response.
+
+    For sonic logs the ratio is normal over observed transit time, so slow
+    (undercompacted) rock gives a ratio below one and pressure above
+    hydrostatic.
+    """
+    return overburden - (overburden - hydrostatic) * ratio ** exponent
+
+
+def pressure_profile(
+    depth: np.ndarray,
+    formation_water_density: float = 67.0,
+    poisson_ratio: np.ndarray = 0.25,
+    bulk_density: Optional[np.ndarray] = None,
+    sonic_transit_time: Optional[np.ndarray] = None,
+    normal_transit_time_surface: float = 200.0,
+    normal_transit_time_matrix: float = 55.0,
+    compaction_constant: float = 2e-4,
+    eaton_exponent: float = 3.0,
+    kick_margin: float = 0.0,
+    fracture_margin: float = 0.0
+) -> Dict[str, np.ndarray]:
+    """
+    Pore, overburden and fracture pressure and the mud-weight window along increasing true vertical depths.
+
+    Hydrostatic pressure follows the formation water gradient (``density /
+    144`` psi/ft from lb/ft3). The overburden is integrated from
+    ``bulk_density`` (g/cm3) or follows the default gradient trend. Without
+    a sonic log the pore pressure is hydrostatic; with one it follows Eaton
+    against the normal compaction trend ``matrix + (surface - matrix) *
+    exp(-compaction_constant * depth)`` (us/ft). Fracture pressure follows
+    Eaton with ``poisson_ratio`` (scalar or per depth). The window runs from
+    the pore pressure plus ``kick_margin`` to the fracture pressure less
+    ``fracture_margin`` (both ppg).
+    """
+    depth = np.asarray(depth, dtype=float)
+    hydrostatic = formation_water_density / 144 * depth
+    if bulk_density is not None:
+        overburden = overburden_from_density(depth, np.asarray(bulk_density, dtype=float))
+    else:
+        overburden = overburden_pressure_gradient(depth) * depth
+    if sonic_transit_time is not None:
+        normal = normal_transit_time_matrix + (normal_transit_time_surface - normal_transit_time_matrix) \
+            * np.exp(-compaction_constant * depth)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = normal / np.asarray(sonic_transit_time, dtype=float)
+        pore = eaton_pore_pressure(overburden, hydrostatic, ratio, eaton_exponent)
+    else:
+        pore = hydrostatic
+    fracture = fracture_pressure(overburden, pore, np.asarray(poisson_ratio, dtype=float))
+
+    pore_emw = equivalent_mud_weight(pore, depth)
+    fracture_emw = equivalent_mud_weight(fracture, depth)
+    minimum = pore_emw + kick_margin
+    maximum = fracture_emw - fracture_margin
+    return {
+        "depth": depth,
+        "hydrostatic_pressure": hydrostatic,
+        "pore_pressure": pore,
+        "overburden_pressure": overburden,
+        "fracture_pressure": fracture,
+        "pore_pressure_emw": pore_emw,
+        "overburden_emw": equivalent_mud_weight(overburden, depth),
+        "fracture_emw": fracture_emw,
+        "minimum_mud_weight": minimum,
+        "maximum_mud_weight": maximum,
+        "mud_weight_window": maximum - minimum,
+    }
+
+
+def capacity(diameter: np.ndarray, inner_diameter: np.ndarray = 0.0) -> np.ndarray:
+    """Capacity (bbl/ft) of a pipe bore, or of the annulus between a hole and a pipe."""
+    return (np.asarray(diameter, dtype=float) ** 2 - np.asarray(inner_diameter, dtype=float) ** 2) / CAPACITY_FACTOR
+
+
+def section_strokes(lengths: np.ndarray, capacities: np.ndarray, pump_output: float) -> Dict[str, np.ndarray]:
+    """Volume and pump strokes of each section, and the cumulative strokes at each section's end."""
+    volume = np.asarray(lengths, dtype=float) * np.asarray(capacities, dtype=float)
+    strokes = volume / pump_output
+    return {"volume": volume, "strokes": strokes, "cumulative_strokes": np.cumsum(strokes)}
+
+
+def pump_schedule(
+    strokes: np.ndarray,
+    string_lengths: np.ndarray,
+    string_capacities: np.ndarray,
+    string_vertical_lengths: np.ndarray,
+    pump_output: float,
+    initial_circulating_pressure: float,
+    final_circulating_pressure: float,
+    slow_pump_rate_pressure: float,
+    original_mud_weight: float,
+    balance_mud_weight: float
+) -> Dict[str, np.ndarray]:
+    """
+    Drillpipe pressure while kill mud is pumped down the drillstring (wait and weight).
+
+    At each stroke count the kill mud front sits at a measured and a true
+    vertical depth found by walking the string section by section. The
+    pressure is the initial circulating pressure less the extra hydrostatic
+    head of the kill mud above the front, plus the extra friction of the
+    heavier mud, which grows from the slow-pump-rate pressure to the final
+    circulating pressure in proportion to the string length filled. The
+    hydrostatic head is taken at ``balance_mud_weight``, the kill mud weight
+    without any trip margin, so it removes exactly the shut-in drillpipe
+    pressure at the bit and the schedule reaches the final circulating
+    pressure there. For a vertical string of one size this is the straight
+    line of ``petrocalc.pressure.pump_pressure_schedule``. Past the bit the
+    pressure stays at the final circulating pressure.
+    """
+    strokes = np.asarray(strokes, dtype=float)
+    string = section_strokes(string_lengths, string_capacities, pump_output)
+    boundaries = np.concatenate([[0.0], string["cumulative_strokes"]])
+    md = np.interp(strokes, boundaries, np.concatenate([[0.0], np.cumsum(string_lengths)]))
+    tvd = np.interp(strokes, boundaries, np.concatenate([[0.0], np.cumsum(string_vertical_lengths)]))
+    total_md = float(np.sum(string_lengths))
+    hydrostatic_gain = PRESSURE_GRADIENT_FACTOR * (balance_mud_weight - original_mud_weight) * tvd
+    friction_gain = (final_circulating_pressure - slow_pump_rate_pressure) * md / total_md
+    return {
+        "strokes": strokes,
+        "measured_depth": md,
+        "true_vertical_depth": tvd,
+        "section": np.minimum(np.searchsorted(boundaries, strokes, side="right") - 1, len(boundaries) - 2),
+        "pressure": initial_circulating_pressure - hydrostatic_gain + friction_gain,
+    }
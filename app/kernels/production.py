@@ -0,0 +1,90 @@
+"""
+Vectorized production engineering correlations.
+
+Each kernel mirrors the scalar function of the same name in
+``petrocalc.production`` and accepts NumPy arrays of equal or broadcastable
+shape.
+"""
+
+import numpy as np
+
+
+def productivity_index(
+    flow_rate: np.ndarray,
+    reservoir_pressure: np.ndarray,
+    bottomhole_pressure: np.ndarray
+) -> np.ndarray:
+    """Productivity index (STB/day/psi); NaN where the drawdown is not positive."""
+    drawdown = reservoir_pressure - bottomhole_pressure
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(drawdown > 0, flow_rate / drawdown, np.nan)
+
+
+def vogel_maximum_rate(
+    flow_rate: np.ndarray,
+    reservoir_pressure: np.ndarray,
+    bottomhole_pressure: np.ndarray
+) -> np.ndarray:
+    """
+    Vogel's maximum oil rate (STB/day) whose IPR passes through a test point.
+
+    ``qmax = q / (1 - 0.2 x - 0.8 x²)`` with ``x = Pwf / Pr``; NaN where the
+    test pressure is not below reservoir pressure.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = bottomhole_pressure / reservoir_pressure
+        return np.where(ratio < 1, flow_rate / (1 - 0.2 * ratio - 0.8 * ratio**2), np.nan)
+
+
+def vogel_ipr(
+    reservoir_pressure: np.ndarray,
+    bottomhole_pressure: np.ndarray,
+    maximum_oil_rate: np.ndarray
+) -> np.ndarray:
+    """Oil rate (STB/day) from Vogel's IPR, clipped at zero above reservoir pressure."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = bottomhole_pressure / reservoir_pressure
+        return np.maximum(0, maximum_oil_rate * (1 - 0.2 * ratio - 0.8 * ratio**2))
+
+
+def vogel_bottomhole_pressure(
+    reservoir_pressure: np.ndarray,
+    flow_rate: np.ndarray,
+    maximum_oil_rate: np.ndarray
+) -> np.ndarray:
+    """Bottomhole flowing pressure (psia) giving ``flow_rate`` on Vogel's IPR (its inverse)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        deficit = 1 - np.clip(flow_rate / maximum_oil_rate, 0, 1)
+        return reservoir_pressure * (np.sqrt(0.04 + 3.2 * deficit) - 0.2) / 1.6
+
+
+def multiphase_flow_beggs_brill(
+    liquid_rate: np.ndarray,
+    gas_rate: np.ndarray,
+    pipe_diameter: np.ndarray,
+    pipe_inclination: np.ndarray,
+    liquid_density: np.ndarray,
+    gas_density: np.ndarray,
+    liquid_viscosity: np.ndarray,
+    gas_viscosity: np.ndarray
+):
+    """Pressure gradient (psi/ft) and liquid holdup from petrocalc's simplified Beggs-Brill."""
+    ql = liquid_rate / 86400
+    qg = gas_rate * 1000 / 86400
+    d = pipe_diameter / 12
+    area = np.pi * d**2 / 4
+    vsl = ql / area
+    vsg = qg / area
+    vm = vsl + vsg
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lambda_l = np.where(vm > 0, vsl / vm, 0.0)
+        holdup = np.where(lambda_l < 0.01, lambda_l, 0.845 * lambda_l**0.351)
+        rho_m = holdup * liquid_density + (1 - holdup) * gas_density
+        hydrostatic = rho_m * np.sin(np.radians(pipe_inclination)) / 144
+
+        rho_ns = lambda_l * liquid_density + (1 - lambda_l) * gas_density
+        mu_ns = lambda_l * liquid_viscosity + (1 - lambda_l) * gas_viscosity
+        re = rho_ns * vm * d / (mu_ns * 6.72e-4)
+        friction_factor = np.where(re < 2100, 16 / re, 0.0791 / re**0.25)
+        friction = 2 * friction_factor * rho_ns * vm**2 / (32.174 * d * 144)
+    return hydrostatic + friction, holdup
@@ -0,0 +1,252 @@
+"""
+Vectorized reservoir PVT correlations.
+
+Each kernel mirrors the scalar function of the same name in
+``petrocalc.reservoir`` (or ``petrocalc.fluids``) and accepts NumPy arrays
+of equal or broadcastable shape. ``pvt_table`` combines them into full
+black-oil tables; ``arps_forecast`` evaluates decline curves of many wells
+over a time grid.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+
+def api_to_specific_gravity(oil_gravity: np.ndarray) -> np.ndarray:
+    """Convert API gravity to oil specific gravity."""
+    return 141.5 / (oil_gravity + 131.5)
+
+
+def oil_formation_volume_factor_standing(
+    gas_oil_ratio: np.ndarray,
+    gas_gravity: np.ndarray,
+    oil_gravity: np.ndarray,
+    temperature: np.ndarray,
+    pressure: np.ndarray
+) -> np.ndarray:
+    """Oil formation volume factor (res bbl/STB) using Standing's correlation."""
+    gamma_o = api_to_specific_gravity(oil_gravity)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlating = gas_oil_ratio * np.sqrt(gas_gravity / gamma_o) + 1.25 * temperature
+        return 0.9759 + 0.000120 * correlating**1.2
+
+
+def solution_gas_oil_ratio_standing(
+    pressure: np.ndarray,
+    temperature: np.ndarray,
+    gas_gravity: np.ndarray,
+    oil_gravity: np.ndarray
+) -> np.ndarray:
+    """Solution gas-oil ratio (scf/STB) using Standing's correlation."""
+    with np.errstate(over="ignore"):
+        return gas_gravity * ((pressure / 18.2) + 1.4) * 10**(0.0125 * oil_gravity - 0.00091 * temperature)
+
+
+def bubble_point_pressure_standing(
+    gas_oil_ratio: np.ndarray,
+    gas_gravity: np.ndarray,
+    oil_gravity: np.ndarray,
+    temperature: np.ndarray
+) -> np.ndarray:
+    """Bubble point pressure (psia) using Standing's correlation."""
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        return 18.2 * ((gas_oil_ratio / gas_gravity)**0.83 * 10**(0.00091 * temperature - 0.0125 * oil_gravity) - 1.4)
+
+
+def solution_gas_oil_ratio_below_bubble_point(
+    pressure: np.ndarray,
+    temperature: np.ndarray,
+    gas_gravity: np.ndarray,
+    oil_gravity: np.ndarray
+) -> np.ndarray:
+    """
+    Solution gas-oil ratio (scf/STB) of saturated oil from Standing's correlation.
+
+    This is ``bubble_point_pressure_standing`` solved for the gas-oil ratio,
+    so it returns exactly the solution GOR at the bubble point and the
+    table has no jump there.
+    """
+    with np.errstate(invalid="ignore", over="ignore"):
+        return gas_gravity * ((pressure / 18.2 + 1.4) * 10**(0.0125 * oil_gravity - 0.00091 * temperature))**(1 / 0.83)
+
+
+def oil_viscosity_beggs_robinson(
+    oil_gravity: np.ndarray,
+    temperature: np.ndarray,
+    gas_oil_ratio: np.ndarray
+) -> np.ndarray:
+    """Saturated oil viscosity (cp) using the Beggs-Robinson correlation."""
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        dead_oil = 10**(10**(3.0324 - 0.02023 * oil_gravity) * temperature**-1.163) - 1
+        a = 10.715 * (gas_oil_ratio + 100)**-0.515
+        b = 5.44 * (gas_oil_ratio + 150)**-0.338
+        return np.where(gas_oil_ratio > 0, a * dead_oil**b, dead_oil)
+
+
+def isothermal_oil_compressibility_vasquez_beggs(
+    solution_gor: np.ndarray,
+    gas_gravity: np.ndarray,
+    oil_gravity: np.ndarray,
+    temperature: np.ndarray,
+    pressure: np.ndarray
+) -> np.ndarray:
+    """Undersaturated oil compressibility (1/psi) using the Vasquez-Beggs correlation."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        numerator = -1433 + 5 * solution_gor + 17.2 * temperature - 1180 * gas_gravity + 12.61 * oil_gravity
+        return np.maximum(0, numerator / (pressure * 1e5))
+
+
+def oil_viscosity_vasquez_beggs_above_pb(
+    viscosity_at_bubble_point: np.ndarray,
+    bubble_point_pressure: np.ndarray,
+    pressure: np.ndarray
+) -> np.ndarray:
+    """Undersaturated oil viscosity (cp) using the Vasquez-Beggs correlation."""
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        m = 2.6 * pressure**1.187 * np.exp(-11.513 - 8.98e-5 * pressure)
+        return viscosity_at_bubble_point * (pressure / bubble_point_pressure)**m
+
+
+def pvt_table(
+    gas_oil_ratio: np.ndarray,
+    gas_gravity: np.ndarray,
+    oil_gravity: np.ndarray,
+    temperature: np.ndarray,
+    pressures: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Black-oil PVT tables for several fluids over a common pressure grid.
+
+    Fluids are given by their solution GOR at the bubble point, gas and oil
+    gravity and reservoir temperature (1-D arrays of equal length). Each
+    fluid's bubble point is inserted into the grid, so the returned
+    ``pressure``, ``solution_gor``, ``oil_fvf``, ``oil_viscosity`` and
+    ``saturated`` arrays have shape ``(fluids, len(pressures) + 1)`` and are
+    sorted by pressure along each row. Below the bubble point Rs, Bo and
+    viscosity follow Standing and Beggs-Robinson; above it Rs is constant and
+    Bo and viscosity follow Vasquez-Beggs.
+    """
+    rsb, gamma_g, api, t = (np.asarray(a, dtype=float)[:, None]
+                            for a in (gas_oil_ratio, gas_gravity, oil_gravity, temperature))
+    pb = bubble_point_pressure_standing(rsb, gamma_g, api, t)
+    grid = np.broadcast_to(np.asarray(pressures, dtype=float), (pb.shape[0], len(pressures)))
+    pressure = np.sort(np.concatenate([grid, pb], axis=1), axis=1)
+    saturated = pressure <= pb
+
+    rs = np.where(saturated, np.minimum(solution_gas_oil_ratio_below_bubble_point(pressure, t, gamma_g, api), rsb), rsb)
+    bo_saturated = oil_formation_volume_factor_standing(rs, gamma_g, api, t, pressure)
+    viscosity_saturated = oil_viscosity_beggs_robinson(api, t, rs)
+
+    bob = oil_formation_volume_factor_standing(rsb, gamma_g, api, t, pb)
+    viscosity_bubble_point = oil_viscosity_beggs_robinson(api, t, rsb)
+    compressibility = isothermal_oil_compressibility_vasquez_beggs(rsb, gamma_g, api, t, pressure)
+    with np.errstate(over="ignore"):
+        bo_undersaturated = bob * np.exp(compressibility * (pb - pressure))
+    viscosity_undersaturated = oil_viscosity_vasquez_beggs_above_pb(viscosity_bubble_point, pb, pressure)
+
+    return {
+        "bubble_point_pressure": pb[:, 0],
+        "pressure": pressure,
+        "solution_gor": rs,
+        "oil_fvf": np.where(saturated, bo_saturated, bo_undersaturated),
+        "oil_viscosity": np.where(saturated, viscosity_saturated, viscosity_undersaturated),
+        "saturated": saturated,
+    }
+
+
+# Decline exponents within this distance of 0 or 1 are treated as exponential or harmonic
+DECLINE_EXPONENT_TOLERANCE = 1e-6
+
+
+def arps_decline_curve(
+    initial_rate: np.ndarray,
+    time: np.ndarray,
+    decline_rate: np.ndarray,
+    decline_exponent: np.ndarray
+) -> np.ndarray:
+    """Production rate from the Arps decline curve (exponential for b = 0)."""
+    qi, t, di, b = np.broadcast_arrays(*(np.asarray(a, dtype=float)
+                                          for a in (initial_rate, time, decline_rate, decline_exponent)))
+    exponential = np.abs(b) < DECLINE_EXPONENT_TOLERANCE
+    b_safe = np.where(exponential, 1.0, b)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        return np.where(exponential, qi * np.exp(-di * t), qi / (1 + b_safe * di * t) ** (1 / b_safe))
+
+
+def cumulative_production_arps(
+    initial_rate: np.ndarray,
+    time: np.ndarray,
+    decline_rate: np.ndarray,
+    decline_exponent: np.ndarray
+) -> np.ndarray:
+    """Cumulative production from the Arps decline curve: exponential, harmonic or hyperbolic."""
+    qi, t, di, b = np.broadcast_arrays(*(np.asarray(a, dtype=float)
+                                          for a in (initial_rate, time, decline_rate, decline_exponent)))
+    exponential = np.abs(b) < DECLINE_EXPONENT_TOLERANCE
+    harmonic = np.abs(b - 1) < DECLINE_EXPONENT_TOLERANCE
+    b_safe = np.where(exponential | harmonic, 0.5, b)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        cumulative = np.select(
+            [exponential, harmonic],
+            [qi / di * -np.expm1(-di * t), qi / di * np.log1p(di * t)],
+            qi / ((1 - b_safe) * di) * (1 - (1 + b_safe * di * t) ** (1 - 1 / b_safe))
+        )
+    # No decline: constant rate (adding zero turns the -0.0 of hyperbolic wells at t = 0 into 0.0)
+    return np.where(di == 0, qi * t, cumulative) + 0.0
+
+
+def terminal_switch_time(
+    decline_rate: np.ndarray,
+    decline_exponent: np.ndarray,
+    terminal_decline_rate: np.ndarray
+) -> np.ndarray:
+    """
+    Time at which a hyperbolic decline falls to the terminal decline rate.
+
+    The instantaneous decline of a hyperbolic well is ``Di / (1 + b Di t)``.
+    Exponential wells, wells without a terminal rate (zero) and wells
+    already declining at or below it never switch (infinity).
+    """
+    di, b, dlim = np.broadcast_arrays(*(np.asarray(a, dtype=float)
+                                        for a in (decline_rate, decline_exponent, terminal_decline_rate)))
+    switches = (b >= DECLINE_EXPONENT_TOLERANCE) & (dlim > 0) & (di > dlim)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(switches, (di / dlim - 1) / (b * di), np.inf)
+
+
+def arps_forecast(
+    initial_rate: np.ndarray,
+    decline_rate: np.ndarray,
+    decline_exponent: np.ndarray,
+    terminal_decline_rate: np.ndarray,
+    time: np.ndarray,
+    quantities=("rate", "cumulative")
+) -> Dict[str, np.ndarray]:
+    """
+    Modified-hyperbolic forecasts of many wells over a common time grid.
+
+    Well parameters are 1-D arrays; the results have shape ``(wells,
+    len(time))``. Each well follows its Arps curve until its decline falls
+    to ``terminal_decline_rate`` (see ``terminal_switch_time``) and declines
+    exponentially at that rate afterwards. Rates are in the units of
+    ``initial_rate``; decline rates are nominal, per unit of ``time``.
+    Only the requested ``quantities`` are computed.
+    """
+    qi, di, b, dlim = (np.asarray(a, dtype=float)[:, None]
+                       for a in (initial_rate, decline_rate, decline_exponent, terminal_decline_rate))
+    t = np.asarray(time, dtype=float)[None, :]
+    switch = terminal_switch_time(di, b, dlim)
+    switched = t > switch
+    arps_time = np.minimum(t, switch)
+    with np.errstate(invalid="ignore", over="ignore"):
+        terminal = np.where(switched, np.exp(-dlim * (t - switch)), 1.0)
+    rate = arps_decline_curve(qi, arps_time, di, b)
+    result = {}
+    if "rate" in quantities:
+        result["rate"] = rate * terminal
+    if "cumulative" in quantities:
+        cumulative = cumulative_production_arps(qi, arps_time, di, b)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result["cumulative"] = np.where(switched, cumulative + rate * (1 - terminal) / dlim, cumulative)
+    return result
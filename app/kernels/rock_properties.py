@@ -0,0 +1,175 @@
+"""
+Vectorized petrophysics kernels for whole well logs.
+
+The porosity, saturation and permeability kernels mirror the scalar
+functions of the same name in ``petrocalc.rock_properties`` (inputs outside
+their domain give NaN instead of raising). ``evaluate_log`` chains them over
+one block of depth samples and ``PaySummary`` integrates the results over
+depth block by block, so a log of any length is evaluated in chunks.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+
+def porosity_from_density_log(bulk_density: np.ndarray, matrix_density: float, fluid_density: float) -> np.ndarray:
+    """Density porosity (fraction), clipped to [0, 1]."""
+    return np.clip((matrix_density - bulk_density) / (matrix_density - fluid_density), 0, 1)
+
+
+def porosity_from_logs(neutron_porosity: np.ndarray, density_porosity: np.ndarray,
+                       shale_volume: np.ndarray = 0.0) -> np.ndarray:
+    """Effective porosity (fraction) from neutron and density porosity with a shale correction."""
+    average = (neutron_porosity + density_porosity) / 2
+    return np.maximum(0, average - shale_volume * average)
+
+
+def water_saturation_archie(
+    formation_resistivity: np.ndarray,
+    water_resistivity: float,
+    porosity: np.ndarray,
+    cementation_factor: float = 2.0,
+    saturation_exponent: float = 2.0,
+    tortuosity_factor: float = 1.0
+) -> np.ndarray:
+    """Archie water saturation (fraction), clipped to [0, 1]; NaN where porosity is not positive."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sw = ((tortuosity_factor * water_resistivity) / (formation_resistivity * porosity**cementation_factor)) \
+            ** (1 / saturation_exponent)
+    return np.where(porosity > 0, np.clip(sw, 0, 1), np.nan)
+
+
+def permeability_timur_correlation(porosity: np.ndarray, irreducible_water_saturation: np.ndarray) -> np.ndarray:
+    """Timur permeability (md); NaN where porosity or saturation is not positive."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        k = 0.136 * porosity**4.4 / irreducible_water_saturation**2
+    return np.where((porosity > 0) & (irreducible_water_saturation > 0), k, np.nan)
+
+
+def shale_volume_linear(gamma_ray: np.ndarray, clean: float, shale: float) -> np.ndarray:
+    """Shale volume (fraction) from the linear gamma-ray index, clipped to [0, 1]."""
+    return np.clip((gamma_ray - clean) / (shale - clean), 0, 1)
+
+
+def evaluate_log(
+    curves: Dict[str, np.ndarray],
+    matrix_density: float = 2.65,
+    fluid_density: float = 1.0,
+    water_resistivity: float = 0.05,
+    cementation_factor: float = 2.0,
+    saturation_exponent: float = 2.0,
+    tortuosity_factor: float = 1.0,
+    gamma_ray_clean: Optional[float] = None,
+    gamma_ray_shale: Optional[float] = None,
+    irreducible_water_saturation: Optional[float] = None,
+    porosity_cutoff: float = 0.08,
+    water_saturation_cutoff: float = 0.5,
+    shale_volume_cutoff: float = 0.4
+) -> Dict[str, np.ndarray]:
+    """
+    Shale volume, porosity, water saturation, permeability, bulk volume oil and pay flag of each sample.
+
+    ``curves`` holds ``resistivity`` and ``density`` and/or ``neutron``
+    (fraction) arrays, optionally ``shale_volume`` or ``gamma_ray`` (used
+    with the clean and shale gamma-ray values). Porosity is the shale
+    corrected neutron-density average, or the single porosity log available.
+    Permeability uses Timur with the given irreducible water saturation, or
+    with each sample's own saturation. A sample is pay when it meets all
+    three cutoffs. Missing input samples (NaN) give NaN results and no pay.
+    """
+    n_samples = len(curves["resistivity"])
+    if "shale_volume" in curves:
+        vsh = np.clip(curves["shale_volume"], 0, 1)
+    elif "gamma_ray" in curves and gamma_ray_clean is not None and gamma_ray_shale is not None:
+        vsh = shale_volume_linear(curves["gamma_ray"], gamma_ray_clean, gamma_ray_shale)
+    else:
+        vsh = np.zeros(n_samples)
+
+    density_porosity = (porosity_from_density_log(curves["density"], matrix_density, fluid_density)
+                        if "density" in curves else None)
+    neutron_porosity = curves.get("neutron")
+    if density_porosity is None:
+        density_porosity = neutron_porosity
+    if neutron_porosity is None:
+        neutron_porosity = density_porosity
+    porosity = porosity_from_logs(neutron_porosity, density_porosity, vsh)
+
+    sw = water_saturation_archie(curves["resistivity"], water_resistivity, porosity,
+                                 cementation_factor, saturation_exponent, tortuosity_factor)
+    swirr = sw if irreducible_water_saturation is None else np.full(n_samples, irreducible_water_saturation)
+    with np.errstate(invalid="ignore"):
+        pay = (porosity >= porosity_cutoff) & (sw <= water_saturation_cutoff) & (vsh <= shale_volume_cutoff)
+    return {
+        "shale_volume": vsh,
+        "porosity": porosity,
+        "water_saturation": sw,
+        "permeability": permeability_timur_correlation(porosity, swirr),
+        "bulk_volume_oil": porosity * (1 - sw),
+        "pay": pay.astype(float),
+    }
+
+
+class PaySummary:
+    """
+    Depth integrals of a log evaluation, accumulated block by block.
+
+    Each interval between consecutive samples contributes its length times
+    the mean of its two end values (the trapezoidal rule), so a block only
+    needs the last sample of the previous one.
+    """
+
+    def __init__(self):
+        self.samples = 0
+        self.gross = 0.0
+        self.net = 0.0
+        self.porosity_thickness = 0.0
+        self.hydrocarbon_column = 0.0
+        self.top: Optional[float] = None
+        self.base: Optional[float] = None
+        self._last: Optional[Dict[str, np.ndarray]] = None
+
+    def add(self, depth: np.ndarray, result: Dict[str, np.ndarray]):
+        """Fold one block of samples (in depth order) into the integrals."""
+        self.samples += len(depth)
+        if not len(depth):
+            return
+        pay = np.nan_to_num(result["pay"])
+        block = {
+            "depth": depth,
+            "pay": pay,
+            "porosity": np.where(pay > 0, result["porosity"], 0.0),
+            "bulk_volume_oil": np.where(pay > 0, result["bulk_volume_oil"], 0.0),
+        }
+        if self._last is not None:
+            block = {name: np.concatenate([self._last[name], values]) for name, values in block.items()}
+        self._last = {name: values[-1:] for name, values in block.items()}
+        if self.top is None:
+            self.top = float(depth[0])
+        self.base = float(depth[-1])
+
+        length = np.abs(np.diff(block["depth"]))
+        length = np.where(np.isfinite(length), length, 0.0)
+
+        def integral(values: np.ndarray) -> float:
+            return float(np.sum(length * (values[1:] + values[:-1]) / 2))
+
+        self.gross += float(length.sum())
+        self.net += integral(block["pay"])
+        self.porosity_thickness += integral(block["porosity"])
+        self.hydrocarbon_column += integral(block["bulk_volume_oil"])
+
+    def result(self) -> Dict[str, float]:
+        """Gross and net thickness, net-to-gross, pay averages and hydrocarbon column."""
+        porosity = self.porosity_thickness / self.net if self.net > 0 else np.nan
+        return {
+            "top": self.top,
+            "base": self.base,
+            "gross_thickness": self.gross,
+            "net_pay": self.net,
+            "net_to_gross": min(max(self.net / self.gross, 0.0), 1.0) if self.gross > 0 else np.nan,
+            "average_porosity": porosity,
+            "average_water_saturation": (1 - self.hydrocarbon_column / self.porosity_thickness
+                                         if self.porosity_thickness > 0 else np.nan),
+            "hydrocarbon_column": self.hydrocarbon_column,
+        }
@@ -0,0 +1,135 @@
+"""
+Streaming pressure-transient kernels for long gauge records.
+
+A buildup recorded by a permanent gauge can hold millions of samples. The
+``LogTimeBinner`` folds samples into fixed logarithmic bins of shut-in time
+as they arrive, keeping per-bin sums only, so memory depends on the number
+of bins and not on the length of the record. The binned series feeds the
+Bourdet derivative and a least-squares Horner straight line.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+# Shut-in times covered by the bins, in hours (1e-6 h is 3.6 ms)
+MIN_LOG_TIME = -6
+MAX_LOG_TIME = 6
+
+
+class LogTimeBinner:
+    """Accumulate (shut-in time, pressure) samples into log-spaced time bins."""
+
+    def __init__(self, bins_per_cycle: int = 20):
+        self.bins_per_cycle = bins_per_cycle
+        n_bins = (MAX_LOG_TIME - MIN_LOG_TIME) * bins_per_cycle
+        self.count = np.zeros(n_bins, dtype=np.int64)
+        self.time_sum = np.zeros(n_bins)
+        self.pressure_sum = np.zeros(n_bins)
+        self.samples = 0
+        self.out_of_range = 0
+        # Last pressure recorded at or before shut-in: the flowing pressure
+        self.shut_in_time: Optional[float] = None
+        self.shut_in_pressure: Optional[float] = None
+
+    def add(self, delta_time: np.ndarray, pressure: np.ndarray):
+        """Fold a chunk of samples into the bins; non-finite samples are dropped."""
+        finite = np.isfinite(delta_time) & np.isfinite(pressure)
+        delta_time, pressure = delta_time[finite], pressure[finite]
+        self.samples += len(delta_time)
+
+        flowing = delta_time <= 0
+        if flowing.any():
+            last = np.argmax(np.where(flowing, delta_time, -np.inf))
+            if self.shut_in_time is None or delta_time[last] >= self.shut_in_time:
+                self.shut_in_time = float(delta_time[last])
+                self.shut_in_pressure = float(pressure[last])
+
+        delta_time, pressure = delta_time[~flowing], pressure[~flowing]
+        index = np.floor((np.log10(delta_time) - MIN_LOG_TIME) * self.bins_per_cycle).astype(np.int64)
+        inside = (index >= 0) & (index < len(self.count))
+        self.out_of_range += int((~inside).sum())
+        index, delta_time, pressure = index[inside], delta_time[inside], pressure[inside]
+        n_bins = len(self.count)
+        self.count += np.bincount(index, minlength=n_bins)
+        self.time_sum += np.bincount(index, delta_time, minlength=n_bins)
+        self.pressure_sum += np.bincount(index, pressure, minlength=n_bins)
+
+    def series(self) -> Dict[str, np.ndarray]:
+        """Mean shut-in time and pressure of every non-empty bin, in time order."""
+        filled = self.count > 0
+        count = self.count[filled]
+        return {
+            "delta_time": self.time_sum[filled] / count,
+            "pressure": self.pressure_sum[filled] / count,
+            "samples": count,
+        }
+
+
+def bourdet_derivative(delta_time: np.ndarray, delta_pressure: np.ndarray) -> np.ndarray:
+    """
+    Bourdet derivative d(dp)/d(ln dt) with the three-point weighted central difference.
+
+    End points use one-sided differences; a single point has no derivative.
+    """
+    derivative = np.full(len(delta_time), np.nan)
+    if len(delta_time) < 2:
+        return derivative
+    x = np.log(delta_time)
+    slope = np.diff(delta_pressure) / np.diff(x)
+    dx = np.diff(x)
+    derivative[0], derivative[-1] = slope[0], slope[-1]
+    if len(delta_time) > 2:
+        left, right = dx[:-1], dx[1:]
+        derivative[1:-1] = (slope[:-1] * right + slope[1:] * left) / (left + right)
+    return derivative
+
+
+def horner_analysis(
+    delta_time: np.ndarray,
+    pressure: np.ndarray,
+    flowing_pressure: float,
+    production_time: float,
+    flow_rate: float,
+    porosity: float,
+    viscosity: float,
+    total_compressibility: float,
+    formation_volume_factor: float,
+    thickness: float,
+    wellbore_radius: float
+) -> Dict[str, float]:
+    """
+    Least-squares Horner straight line p = p* - m log10((tp + dt) / dt) and its interpretation.
+
+    Permeability follows from the slope ``m`` (psi per log cycle) as
+    ``162.6 q mu B / (m h)``; skin from the line's pressure at one hour of
+    shut-in, ``1.151 ((p1hr - pwf) / m - log10(k / (phi mu ct rw^2)) + 3.23)``.
+    Fewer than two points, or a flat line, give NaN.
+    """
+    nan = {key: np.nan for key in ("slope", "extrapolated_pressure", "r_squared", "pressure_1hr",
+                                   "permeability", "skin")}
+    if len(pressure) < 2:
+        return nan
+    x = np.log10((production_time + delta_time) / delta_time)
+    coefficients = np.polyfit(x, pressure, 1)
+    slope, extrapolated = -coefficients[0], coefficients[1]
+    if slope == 0:
+        return nan
+    residual = pressure - np.polyval(coefficients, x)
+    total = np.sum((pressure - pressure.mean()) ** 2)
+    permeability = 162.6 * flow_rate * viscosity * formation_volume_factor / (abs(slope) * thickness)
+    pressure_1hr = extrapolated - slope * np.log10(production_time + 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        skin = 1.151 * (
+            (pressure_1hr - flowing_pressure) / slope
+            - np.log10(permeability / (porosity * viscosity * total_compressibility * wellbore_radius ** 2))
+            + 3.23
+        )
+    return {
+        "slope": slope,
+        "extrapolated_pressure": extrapolated,
+        "r_squared": 1 - np.sum(residual ** 2) / total if total > 0 else np.nan,
+        "pressure_1hr": pressure_1hr,
+        "permeability": permeability,
+        "skin": skin,
+    }
@@ -0,0 +1,207 @@
+"""
+Streaming reader and writer for LAS 2.0 well log files.
+
+A LAS file is a text header in ``~`` sections (version, well, curve,
+parameter and other information) followed by the ``~A`` section: one row of
+whitespace-separated values per depth sample, one value per curve.
+``LasReader`` parses the header line by line, then yields the data in
+2-D blocks as the body arrives, so memory depends on the chunk size and not
+on the length of the log. Wrapped files (``WRAP. YES``) are read the same
+way, since rows are rebuilt from the stream of values.
+"""
+
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_NULL = -999.25
+# Longest header line accepted before the ~A section
+MAX_HEADER_LINE_BYTES = 64 * 1024
+
+
+class LasItem:
+    """One header line: ``MNEM.UNIT  VALUE : DESCRIPTION``."""
+
+    def __init__(self, mnemonic: str, unit: str = "", value: str = "", description: str = ""):
+        self.mnemonic = mnemonic
+        self.unit = unit
+        self.value = value
+        self.description = description
+
+    @classmethod
+    def parse(cls, line: str) -> "LasItem":
+        name, dot, rest = line.partition(".")
+        if not dot:
+            raise ValueError(f"Header line without a '.' after the mnemonic: {line.strip()!r}")
+        # The unit runs up to the first space; the description follows the last colon
+        unit, _, rest = rest.partition(" ")
+        value, colon, description = rest.rpartition(":")
+        if not colon:
+            value, description = rest, ""
+        return cls(name.strip(), unit.strip(), value.strip(), description.strip())
+
+    def format(self) -> str:
+        return f" {self.mnemonic + '.' + self.unit:<16}{self.value:>18} : {self.description}"
+
+
+class LasHeader:
+    """Parsed header sections, keyed by their letter (``V``, ``W``, ``C``, ``P``, ``O``)."""
+
+    def __init__(self):
+        self.sections: Dict[str, List[LasItem]] = {}
+        self.other: List[str] = []
+
+    def items(self, section: str) -> List[LasItem]:
+        return self.sections.get(section, [])
+
+    def value(self, section: str, mnemonic: str) -> Optional[str]:
+        for item in self.items(section):
+            if item.mnemonic.upper() == mnemonic.upper():
+                return item.value
+        return None
+
+    @property
+    def curves(self) -> List[LasItem]:
+        return self.items("C")
+
+    @property
+    def null_value(self) -> float:
+        value = self.value("W", "NULL")
+        try:
+            return float(value) if value else DEFAULT_NULL
+        except ValueError:
+            return DEFAULT_NULL
+
+    def find_curve(self, names: Sequence[str]) -> Optional[int]:
+        """Index of the first curve whose mnemonic matches one of ``names`` (case-insensitive)."""
+        mnemonics = [curve.mnemonic.upper() for curve in self.curves]
+        for name in names:
+            if name.upper() in mnemonics:
+                return mnemonics.index(name.upper())
+        return None
+
+    def check(self):
+        """Reject files this reader cannot interpret."""
+        version = self.value("V", "VERS")
+        if version is not None and not version.startswith(("1.2", "2.0", "2")):
+            raise ValueError(f"Only LAS 1.2 and 2.0 files are supported, not version {version}")
+        if not self.curves:
+            raise ValueError("The file has no ~Curve section")
+
+
+class LasReader:
+    """Read a LAS file from an async stream of byte chunks."""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks.__aiter__()
+        self._buffer = b""
+        self.header: Optional[LasHeader] = None
+
+    async def _next_chunk(self) -> Optional[bytes]:
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    async def read_header(self) -> LasHeader:
+        """Parse every section up to the ``~A`` line; the data that follows stays buffered."""
+        header = LasHeader()
+        section = None
+        while True:
+            end = self._buffer.find(b"\n")
+            if end < 0:
+                chunk = await self._next_chunk()
+                if chunk is None:
+                    raise ValueError("The file has no ~A (data) section")
+                self._buffer += chunk
+                if len(self._buffer) > MAX_HEADER_LINE_BYTES and b"\n" not in self._buffer:
+                    raise ValueError(f"Header line longer than {MAX_HEADER_LINE_BYTES} bytes")
+                continue
+            raw, self._buffer = self._buffer[:end], self._buffer[end + 1:]
+            line = raw.decode("utf-8", errors="replace").rstrip("\r")
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            if stripped.startswith("~"):
+                section = stripped[1:2].upper()
+                if section == "A":
+                    break
+                header.sections.setdefault(section, [])
+                continue
+            if section == "O" or section is None:
+                header.other.append(line)
+            else:
+                header.sections[section].append(LasItem.parse(line))
+        header.check()
+        self.header = header
+        return header
+
+    async def blocks(self) -> AsyncIterator[np.ndarray]:
+        """
+        Yield the data section as float arrays of shape (rows, curves).
+
+        Null values become NaN. Values are split on whitespace, so rows may
+        wrap over several lines; only complete rows are yielded per block.
+        """
+        if self.header is None:
+            await self.read_header()
+        n_curves = len(self.header.curves)
+        null = self.header.null_value
+        carry = np.empty(0)
+        buffer, self._buffer = self._buffer, b""
+        while True:
+            chunk = await self._next_chunk()
+            if chunk is not None:
+                buffer += chunk
+                # Only whole values: keep a trailing partial number for the next chunk
+                end = max(buffer.rfind(b"\n"), buffer.rfind(b" "), buffer.rfind(b"\t")) + 1
+                block, buffer = buffer[:end], buffer[end:]
+            else:
+                block, buffer = buffer, b""
+            if block.strip():
+                try:
+                    values = np.array(block.split(), dtype=float)
+                except ValueError as e:
+                    raise ValueError(f"Invalid value in the ~A section: {e}")
+                values = np.concatenate([carry, values]) if len(carry) else values
+                complete = len(values) - len(values) % n_curves
+                rows, carry = values[:complete].reshape(-1, n_curves), values[complete:]
+                if len(rows):
+                    rows[rows == null] = np.nan
+                    yield rows
+            if chunk is None:
+                break
+        if len(carry):
+            raise ValueError(f"The last data row has {len(carry)} of {n_curves} values")
+
+
+def write_las(header: LasHeader, curves: List[LasItem], data: np.ndarray,
+              parameters: List[LasItem], precision: int = 4) -> str:
+    """
+    Write a LAS 2.0 file with the well section of ``header`` and the given curves and parameters.
+
+    ``data`` has one column per curve; NaN is written as the null value.
+    """
+    null = header.null_value
+    well = {item.mnemonic.upper(): item for item in header.items("W")}
+    if len(data):
+        well["STRT"] = LasItem("STRT", curves[0].unit, f"{data[0, 0]:.{precision}f}", "START DEPTH")
+        well["STOP"] = LasItem("STOP", curves[0].unit, f"{data[-1, 0]:.{precision}f}", "STOP DEPTH")
+    well["NULL"] = LasItem("NULL", "", f"{null}", "NULL VALUE")
+
+    lines = [
+        "~Version Information",
+        LasItem("VERS", "", "2.0", "CWLS LOG ASCII STANDARD - VERSION 2.0").format(),
+        LasItem("WRAP", "", "NO", "ONE LINE PER DEPTH STEP").format(),
+        "~Well Information",
+        *(item.format() for item in well.values()),
+        "~Curve Information",
+        *(item.format() for item in curves),
+        "~Parameter Information",
+        *(item.format() for item in parameters),
+        "~A " + " ".join(f"{curve.mnemonic:>{precision + 8}}" for curve in curves),
+    ]
+    values = np.where(np.isfinite(data), data, null)
+    row_format = " ".join([f"%{precision + 8}.{precision}f"] * data.shape[1])
+    lines.extend(row_format % tuple(row) for row in values.tolist())
+    return "\n".join(lines) + "\n"
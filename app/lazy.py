@@ -0,0 +1,120 @@
+"""
+Lazy loading of calculation routers and petrocalc modules.
+
+Importing every router (and with it petrocalc and numpy) dominates the start
+up time of a worker. Routers are instead registered as placeholders that
+import and include the real router the first time one of their paths is
+requested, and routers refer to petrocalc modules through proxies that
+import the module on first attribute access.
+"""
+
+import importlib
+import importlib.util
+from collections.abc import Mapping
+from types import ModuleType
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi import APIRouter, FastAPI
+from starlette.routing import BaseRoute, Match, NoMatchFound
+from starlette.types import Receive, Scope, Send
+
+
+class LazyModule(ModuleType):
+    """Module proxy that imports the real module on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._module: Optional[ModuleType] = None
+
+    def __getattr__(self, attr: str) -> Any:
+        if self._module is None:
+            self._module = importlib.import_module(self.__name__)
+        return getattr(self._module, attr)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Return a proxy for module ``name`` without importing it yet.
+
+    Raises ImportError straight away if the top-level package is not
+    installed, so a missing dependency is still reported at start up.
+    """
+    if importlib.util.find_spec(name.partition(".")[0]) is None:
+        raise ImportError(f"No module named '{name.partition('.')[0]}'")
+    return LazyModule(name)
+
+
+class LazyRouterRoute(BaseRoute):
+    """Placeholder route that loads a router when its prefix is first requested."""
+
+    def __init__(self, routers: "LazyRouters", prefix: str):
+        self.routers = routers
+        self.prefix = prefix
+
+    def matches(self, scope: Scope):
+        path = scope.get("path", "")
+        if scope["type"] == "http" and (path == self.prefix or path.startswith(self.prefix + "/")):
+            return Match.FULL, {}
+        return Match.NONE, {}
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.routers[self.prefix]
+        # Route the request again now that the real routes are in place
+        await scope["router"](scope, receive, send)
+
+    def url_path_for(self, name: str, /, **path_params: Any):
+        raise NoMatchFound(name, path_params)
+
+
+class LazyRouters(Mapping):
+    """
+    Calculation routers keyed by API prefix, imported and included on first access.
+
+    Reading a router (``routers[prefix]``, ``routers.items()``) loads it, so
+    code that walks every route keeps working; ``loaded`` holds the routers
+    imported so far.
+    """
+
+    def __init__(self, app: FastAPI, modules: Dict[str, str]):
+        self.app = app
+        self.modules = modules
+        self.loaded: Dict[str, APIRouter] = {}
+        self._placeholders: Dict[str, LazyRouterRoute] = {}
+
+    def install(self):
+        """Register a placeholder route for every router that is not loaded yet."""
+        for prefix in self.modules:
+            if prefix not in self.loaded and prefix not in self._placeholders:
+                placeholder = LazyRouterRoute(self, prefix)
+                self._placeholders[prefix] = placeholder
+                self.app.router.routes.append(placeholder)
+
+    def load(self, prefix: str) -> APIRouter:
+        """Import a router module and include its router in the application."""
+        router = self.loaded.get(prefix)
+        if router is None:
+            router = importlib.import_module(self.modules[prefix]).router
+            placeholder = self._placeholders.pop(prefix, None)
+            if placeholder is not None:
+                self.app.router.routes.remove(placeholder)
+            self.app.include_router(router, prefix=prefix, tags=[prefix.rsplit("/", 1)[-1]])
+            self.loaded[prefix] = router
+            router_prefixes = getattr(self.app.state, "router_prefixes", None)
+            if router_prefixes is not None:
+                router_prefixes[prefix] = [router]
+            # A schema generated before this router was loaded is incomplete
+            self.app.openapi_schema = None
+        return router
+
+    def load_all(self):
+        for prefix in self.modules:
+            self.load(prefix)
+
+    def __getitem__(self, prefix: str) -> APIRouter:
+        return self.load(prefix)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.modules)
+
+    def __len__(self) -> int:
+        return len(self.modules)
@@ -10,11 +10,17 @@ Supports both pip-installed and local petrocalc packages.
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 import uvicorn
 
+from app import dispatch
+from app.cache import get_cache
 from app.config import get_config
-from app.routers import drilling, fluids, reservoir, production, economics, completion, flow, pressure, rock_properties, thermodynamics
+from app.executor import AdmissionMiddleware, get_executor
+from app.metrics import METRICS_MEDIA_TYPE, MetricsMiddleware, get_metrics
+from app.lazy import LazyRouters
+from app.responses import ResponseModeMiddleware
+from app.routers import batch, bulk, sensitivity, sweep
 
 # Get configuration
 config = get_config()
@@ -28,24 +34,50 @@ app = FastAPI(
     redoc_url="/api/redoc"
 )
 
+# Record request counts and latencies for /api/metrics
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ResponseModeMiddleware)
+# Admit each request to the calculation pool once, however many calls it makes
+app.add_middleware(AdmissionMiddleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 # Setup templates
 templates = Jinja2Templates(directory="app/templates")
 
+# Calculation router modules, keyed by their API prefix
+CALCULATION_ROUTERS = {
+    "/api/drilling": "app.routers.drilling",
+    "/api/fluids": "app.routers.fluids",
+    "/api/reservoir": "app.routers.reservoir",
+    "/api/production": "app.routers.production",
+    "/api/economics": "app.routers.economics",
+    "/api/completion": "app.routers.completion",
+    "/api/flow": "app.routers.flow",
+    "/api/pressure": "app.routers.pressure",
+    "/api/rock_properties": "app.routers.rock_properties",
+    "/api/thermodynamics": "app.routers.thermodynamics",
+}
+
 # Include routers only if petrocalc is available
 if config.is_petrocalc_available():
-    app.include_router(drilling.router, prefix="/api/drilling", tags=["drilling"])
-    app.include_router(fluids.router, prefix="/api/fluids", tags=["fluids"])
-    app.include_router(reservoir.router, prefix="/api/reservoir", tags=["reservoir"])
-    app.include_router(production.router, prefix="/api/production", tags=["production"])
-    app.include_router(economics.router, prefix="/api/economics", tags=["economics"])
-    app.include_router(completion.router, prefix="/api/completion", tags=["completion"])
-    app.include_router(flow.router, prefix="/api/flow", tags=["flow"])
-    app.include_router(pressure.router, prefix="/api/pressure", tags=["pressure"])
-    app.include_router(rock_properties.router, prefix="/api/rock_properties", tags=["rock_properties"])
-    app.include_router(thermodynamics.router, prefix="/api/thermodynamics", tags=["thermodynamics"])
+    app.include_router(batch.router, prefix="/api", tags=["batch"])
+    app.include_router(sensitivity.router, prefix="/api", tags=["sensitivity"])
+    app.include_router(sweep.router, prefix="/api", tags=["sweep"])
+    app.include_router(bulk.router, prefix="/api/bulk", tags=["bulk"])
+    app.state.router_prefixes = {"/api": [batch.router, sensitivity.router, sweep.router], "/api/bulk": [bulk.router]}
+    # Calculation routers are imported on the first request to their prefix
+    calculation_routers = LazyRouters(app, CALCULATION_ROUTERS)
+    calculation_routers.install()
+    app.state.calculation_routers = calculation_routers
+
+    def openapi() -> dict:
+        """Load every router before generating the schema."""
+        calculation_routers.load_all()
+        return FastAPI.openapi(app)
+
+    app.openapi = openapi
 else:
     print("⚠️  API endpoints disabled - petrocalc not available")
     print(config.get_import_instructions())
@@ -58,10 +90,32 @@ async def get_status():
         "app_status": "running",
         "petrocalc_available": config.is_petrocalc_available(),
         "config": config.get_status_info(),
+        "executor": get_executor().get_status(),
+        "cache": get_cache().get_status(),
         "installation_instructions": config.get_import_instructions() if not config.is_petrocalc_available() else None
     })
 
 
+@app.get("/api/calculations")
+async def list_calculations():
+    """Calculations declared in the registry, with their inputs, units, output and routes."""
+    calculations = {}
+    for path, route in dispatch.get_route_table(app).items():
+        calculation = getattr(route.endpoint, "calculation", None)
+        if calculation is not None:
+            calculations[path] = {
+                **calculation.describe(),
+                "routes": {"scalar": path, "batch": path + "/batch", "bulk": "/api/bulk" + path[len("/api"):]},
+            }
+    return {"calculations": calculations, "count": len(calculations)}
+
+
+@app.get("/api/metrics")
+async def get_metrics_text():
+    """Request counts, errors and latency histograms in the Prometheus text format."""
+    return Response(content=get_metrics().render(), media_type=METRICS_MEDIA_TYPE)
+
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Home page with navigation to different calculation modules."""
@@ -0,0 +1,261 @@
+"""
+Request metrics for the API.
+
+``MetricsMiddleware`` counts requests and errors and records latency
+histograms per route template. Each request also gets a ``RequestTimings``
+record in a context variable, which the calculation layer fills in, so the
+time spent validating the request, inside petrocalc and serializing the
+response is recorded separately. Everything is exposed in the Prometheus
+text format on ``/api/metrics``.
+
+Metrics are only updated from the event loop thread, so plain integers and
+lists are enough; no locks are taken on the request path. Each server worker
+process keeps its own metrics.
+"""
+
+import bisect
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+PHASES = ("validation", "compute", "serialization")
+
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Fixed-bucket histogram; bucket counts are cumulated when exported."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterable[Tuple[str, int]]:
+        """``(le, count)`` pairs, ending with ``+Inf``."""
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield repr(bound), total
+        yield "+Inf", total + self.counts[-1]
+
+
+class RouteMetrics:
+    """Counters and histograms for one method and route template."""
+
+    __slots__ = ("statuses", "latency", "phases")
+
+    def __init__(self):
+        self.statuses: Dict[int, int] = {}
+        self.latency = Histogram()
+        self.phases = {phase: Histogram() for phase in PHASES}
+
+    @property
+    def errors(self) -> int:
+        return sum(count for status, count in self.statuses.items() if status >= 400)
+
+
+class RequestTimings:
+    """Timestamps for one request, filled in as it moves through the layers."""
+
+    __slots__ = ("start", "handler_start", "handler_end", "compute", "response_start")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.handler_start: Optional[float] = None
+        self.handler_end: Optional[float] = None
+        self.compute = 0.0
+        self.response_start: Optional[float] = None
+
+
+_timings: ContextVar[Optional[RequestTimings]] = ContextVar("petrocalc_request_timings", default=None)
+
+
+def mark_handler_start():
+    """Record that request validation finished and the handler was entered."""
+    timings = _timings.get()
+    # Batch requests enter several handlers; the first one ends validation
+    if timings is not None and timings.handler_start is None:
+        timings.handler_start = time.perf_counter()
+
+
+def mark_handler_end():
+    """Record that the handler returned and serialization starts."""
+    timings = _timings.get()
+    if timings is not None:
+        timings.handler_end = time.perf_counter()
+
+
+def add_compute_time(seconds: float):
+    """Add time spent in a petrocalc call to the current request."""
+    timings = _timings.get()
+    if timings is not None:
+        timings.compute += seconds
+
+
+class MetricsRegistry:
+    """Per-route request metrics."""
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self.started = time.time()
+
+    def record(self, method: str, route: str, status: int, timings: RequestTimings, end: float):
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics()
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+        metrics.latency.observe(end - timings.start)
+
+        # Phases are only known for handlers that report them (every cached
+        # calculation endpoint does); others only contribute to the latency
+        if timings.handler_start is not None:
+            metrics.phases["validation"].observe(timings.handler_start - timings.start)
+            metrics.phases["compute"].observe(timings.compute)
+            if timings.handler_end is not None and timings.response_start is not None:
+                metrics.phases["serialization"].observe(timings.response_start - timings.handler_end)
+        elif timings.compute:
+            metrics.phases["compute"].observe(timings.compute)
+
+    def reset(self):
+        self.routes.clear()
+        self.started = time.time()
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        routes = sorted(self.routes.items())
+
+        lines += [
+            "# HELP petrocalc_requests_total Requests handled, by route and status code.",
+            "# TYPE petrocalc_requests_total counter",
+        ]
+        for (method, route), metrics in routes:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(f'petrocalc_requests_total{{{_labels(method, route)},status="{status}"}} {count}')
+
+        lines += [
+            "# HELP petrocalc_request_errors_total Requests answered with a 4xx or 5xx status.",
+            "# TYPE petrocalc_request_errors_total counter",
+        ]
+        for (method, route), metrics in routes:
+            lines.append(f"petrocalc_request_errors_total{{{_labels(method, route)}}} {metrics.errors}")
+
+        lines += [
+            "# HELP petrocalc_request_duration_seconds Time from receiving a request to the end of its response.",
+            "# TYPE petrocalc_request_duration_seconds histogram",
+        ]
+        for (method, route), metrics in routes:
+            lines += _histogram_lines("petrocalc_request_duration_seconds", _labels(method, route), metrics.latency)
+
+        lines += [
+            "# HELP petrocalc_phase_duration_seconds Time spent in request validation, petrocalc and serialization.",
+            "# TYPE petrocalc_phase_duration_seconds histogram",
+        ]
+        for (method, route), metrics in routes:
+            for phase, histogram in metrics.phases.items():
+                if histogram.count:
+                    labels = f'{_labels(method, route)},phase="{phase}"'
+                    lines += _histogram_lines("petrocalc_phase_duration_seconds", labels, histogram)
+
+        lines += [
+            "# HELP petrocalc_start_time_seconds Unix time the metrics were started or reset.",
+            "# TYPE petrocalc_start_time_seconds gauge",
+            f"petrocalc_start_time_seconds {self.started}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(method: str, route: str) -> str:
+    return f'method="{method}",route="{_escape(route)}"'
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram) -> List[str]:
+    lines = [f'{name}_bucket{{{labels},le="{le}"}} {count}' for le, count in histogram.cumulative()]
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+# Global metrics registry
+registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the global metrics registry."""
+    return registry
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording metrics for every ``/api`` request.
+
+    Requests are labelled by route template rather than by raw path, so
+    the number of series stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp, prefix: str = "/api", exclude: Iterable[str] = ("/api/metrics",)):
+        self.app = app
+        self.prefix = prefix
+        self.exclude = set(exclude)
+        self._route_paths: Optional[Dict[int, str]] = None
+        self._route_paths_size = 0
+
+    def _route_label(self, scope: Scope) -> str:
+        route = scope.get("route")
+        if route is None:
+            return "unmatched"
+        # Included routes keep their path relative to the router prefix;
+        # routers may be loaded lazily, so rebuild when more are included
+        prefixes = getattr(scope["app"].state, "router_prefixes", {})
+        if self._route_paths is None or self._route_paths_size != len(prefixes):
+            self._route_paths = {
+                id(router_route): prefix + router_route.path
+                for prefix, routers in prefixes.items()
+                for router in routers
+                for router_route in router.routes
+            }
+            self._route_paths_size = len(prefixes)
+        return self._route_paths.get(id(route), getattr(route, "path", "unmatched"))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith(self.prefix) or path in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(time.perf_counter())
+        token = _timings.set(timings)
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                timings.response_start = time.perf_counter()
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _timings.reset(token)
+            registry.record(scope["method"], self._route_label(scope), status, timings, time.perf_counter())
@@ -0,0 +1,367 @@
+"""
+Declarative calculation registry.
+
+Most calculation endpoints call one petrocalc function with the fields of
+their request and return its result next to the echoed inputs. A router
+describes such a calculation once, as a ``Calculation`` (function, inputs
+with units, output), and ``include_calculations`` generates its routes:
+
+* ``POST /<path>``: the scalar endpoint, with a generated Pydantic request
+  model and the result cache, so batch dispatch, sweeps and sensitivity
+  analysis can call it like any hand-written endpoint;
+* ``POST /<path>/batch``: columns of inputs in one JSON body, checked by
+  the calculation's fast-path column validator instead of a Pydantic model
+  and evaluated in chunks in the executor pool.
+
+``/api/bulk`` streams record files through the same validators and
+evaluator when the target endpoint was generated here.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from pydantic import create_model
+
+from app.cache import cached
+from app.executor import get_executor, map_calculation, run_calculation
+from app.kernels import RowErrors, broadcast_columns, split_columns, to_column
+from app.responses import encode
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+REQUIRED = ...
+# Rows per /batch request and rows evaluated per pool task
+MAX_BATCH_ROWS = 1_000_000
+BATCH_CHUNK_ROWS = 10_000
+
+
+class Input:
+    """
+    One input of a calculation.
+
+    ``unit`` names the unit in the echoed result key (``depth`` ->
+    ``depth_ft``) unless ``echo`` gives the key; ``type`` is ``float`` or
+    ``str``.
+    """
+
+    def __init__(self, name: str, unit: Optional[str] = None, default: Any = REQUIRED,
+                 type: type = float, echo: Optional[str] = None):
+        self.name = name
+        self.unit = unit
+        self.default = default
+        self.type = type
+        self.echo = echo or (f"{name}_{unit}" if unit else name)
+
+    @property
+    def required(self) -> bool:
+        return self.default is REQUIRED
+
+
+def _is_unit_key(key: str) -> bool:
+    return key == "unit" or key.endswith("_unit")
+
+
+def evaluate_rows(function: Callable, arguments: Sequence[Sequence[Any]]) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """
+    Call a scalar function once per row of argument columns.
+
+    Returns the results as a float array and a per-row error message (None
+    for rows that succeeded); a failing row does not stop the others.
+    """
+    n_rows = len(arguments[0]) if arguments else 1
+    values = np.full(n_rows, np.nan)
+    errors: List[Optional[str]] = [None] * n_rows
+    rows = zip(*(column.tolist() if isinstance(column, np.ndarray) else column for column in arguments)) \
+        if arguments else [()]
+    for index, row in enumerate(rows):
+        try:
+            result = function(*row)
+        except Exception as e:
+            errors[index] = str(e)
+            continue
+        if isinstance(result, bool) or not isinstance(result, (int, float)):
+            errors[index] = "calculation returned a non-numeric result"
+            continue
+        values[index] = result
+    return values, errors
+
+
+class Calculation:
+    """
+    A calculation endpoint described by its petrocalc function, inputs and output.
+
+    ``function`` is the name of the function in ``module`` (a petrocalc
+    module proxy), by default the path with dashes as underscores; it is
+    looked up on first use so petrocalc still loads lazily. The result is
+    returned under ``output`` with the ``extra`` constants (unit labels) and
+    the echoed inputs, after them or, with ``echo_first``, before them.
+    ``kernel`` optionally names a vectorized version used by the batch and
+    bulk modes.
+    """
+
+    def __init__(self, path: str, module: Any, description: str, inputs: Sequence[Input], output: str,
+                 function: Optional[str] = None, extra: Optional[Dict[str, Any]] = None,
+                 echo_first: bool = False, kernel: Optional[Callable] = None):
+        self.path = path
+        self.module = module
+        self.function_name = function or path.replace("-", "_")
+        self.inputs = list(inputs)
+        self.output = output
+        self.description = description
+        self.extra = extra or {}
+        self.echo_first = echo_first
+        self.kernel = kernel
+        self._function: Optional[Callable] = None
+        self._numeric = [spec for spec in self.inputs if spec.type is not str]
+        self._text = [spec for spec in self.inputs if spec.type is str]
+        self.model = create_model(
+            "".join(part.title() for part in self.function_name.split("_")) + "Request",
+            **{spec.name: (spec.type, spec.default) for spec in self.inputs}
+        )
+
+    @property
+    def function(self) -> Callable:
+        if self._function is None:
+            self._function = getattr(self.module, self.function_name)
+        return self._function
+
+    def respond(self, values: Dict[str, Any], result: Any, slim: bool = False) -> dict:
+        """The endpoint's response for one set of inputs; ``slim`` keeps only outputs and units."""
+        echoes = {spec.echo: values[spec.name] for spec in self.inputs if not slim or _is_unit_key(spec.echo)}
+        outputs = {self.output: result, **self.extra}
+        return {**echoes, **outputs} if self.echo_first else {**outputs, **echoes}
+
+    def describe(self) -> dict:
+        """Inputs, units, defaults and output, for listings."""
+        return {
+            "function": f"{getattr(self.module, '__name__', '')}.{self.function_name}",
+            "description": self.description,
+            "inputs": [
+                {"name": spec.name, "type": spec.type.__name__, "unit": spec.unit,
+                 "required": spec.required, "default": None if spec.required else spec.default}
+                for spec in self.inputs
+            ],
+            "output": self.output,
+            **self.extra,
+        }
+
+    # Fast-path validators: plain type checks over whole columns, no model per row
+
+    def columns(self, payload: Any) -> Tuple[Dict[str, np.ndarray], int]:
+        """
+        Check a columnar body (each input a value or a list) and convert it to arrays.
+
+        Numeric columns become float arrays broadcast to a common length;
+        text inputs may be one string or one per row. Unknown keys are
+        ignored, as by the request model. Raises ValueError.
+        """
+        if not isinstance(payload, dict):
+            raise ValueError("The body must be a JSON object")
+        for spec in self.inputs:
+            if spec.required and payload.get(spec.name) is None:
+                raise ValueError(f"{spec.name} is required")
+        try:
+            columns, n_rows = broadcast_columns({
+                spec.name: payload.get(spec.name, spec.default) for spec in self._numeric
+            })
+        except TypeError:
+            raise ValueError("Numeric inputs must be numbers or lists of numbers")
+        for spec in self._text:
+            value = payload.get(spec.name, spec.default)
+            values = value if isinstance(value, list) else [value]
+            if not all(isinstance(item, str) for item in values):
+                raise ValueError(f"{spec.name} must be a string or a list of strings")
+            if len(values) not in (1, n_rows):
+                if n_rows != 1:
+                    raise ValueError(f"{spec.name} has {len(values)} values for {n_rows} rows")
+                n_rows = len(values)
+                columns = {name: np.broadcast_to(column, (n_rows,)) for name, column in columns.items()}
+            columns[spec.name] = np.array(values * (n_rows // len(values)), dtype=object)
+        return columns, n_rows
+
+    def record_columns(self, records: Sequence[Any]) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray]:
+        """
+        Convert a chunk of dict records (as parsed from CSV or NDJSON) to columns.
+
+        Missing values take the input's default. Returns the columns, each
+        row's status (200, 400 for an unparsable record, 422 for invalid
+        inputs) and error message.
+        """
+        n_rows = len(records)
+        status = np.full(n_rows, 200)
+        messages = np.full(n_rows, None, dtype=object)
+        for index, record in enumerate(records):
+            if not isinstance(record, dict):
+                status[index] = 400
+                messages[index] = str(record)
+        dicts = [record if isinstance(record, dict) else {} for record in records]
+
+        def invalid(index: int, message: str):
+            if status[index] == 200:
+                status[index] = 422
+                messages[index] = message
+
+        columns = {}
+        for spec in self.inputs:
+            raw = [record.get(spec.name) for record in dicts]
+            if spec.required:
+                for index, value in enumerate(raw):
+                    if value is None:
+                        invalid(index, f"{spec.name}: Field required")
+            default = None if spec.required else spec.default
+            if spec.type is str:
+                column = np.array([default if value is None else value for value in raw], dtype=object)
+                for index, value in enumerate(column):
+                    if value is not None and not isinstance(value, str):
+                        invalid(index, f"{spec.name}: Input should be a valid string")
+            else:
+                filled = [np.nan if value is None else value for value in raw] if default is None \
+                    else [default if value is None else value for value in raw]
+                try:
+                    if any(isinstance(value, bool) for value in filled):
+                        raise ValueError
+                    column = np.array(filled, dtype=float)
+                except (TypeError, ValueError):
+                    column = np.full(n_rows, np.nan)
+                    for index, value in enumerate(filled):
+                        try:
+                            if isinstance(value, (list, dict)):
+                                raise TypeError
+                            column[index] = float(value)
+                        except (TypeError, ValueError):
+                            invalid(index, f"{spec.name}: Input should be a valid number")
+            columns[spec.name] = column
+        return columns, status, messages
+
+    async def evaluate(self, columns: Dict[str, np.ndarray], n_rows: int) -> Tuple[np.ndarray, List[Optional[str]]]:
+        """
+        Evaluate columns of inputs: through the kernel, or row by row in chunks in the executor pool.
+
+        Chunks go through ``map_calculation``, which keeps at most
+        ``max_workers`` of them in flight, so a batch of ``MAX_BATCH_ROWS``
+        rows never overruns the executor queue.
+        """
+        arguments = [columns[spec.name] for spec in self.inputs]
+        if self.kernel is not None:
+            values = await run_calculation(self.kernel, *arguments)
+            values = np.broadcast_to(np.asarray(values, dtype=float), (n_rows,))
+            return values, [None if np.isfinite(value) else "calculation produced a non-finite result"
+                            for value in values.tolist()]
+        if n_rows < get_executor().offload_min_items:
+            return evaluate_rows(self.function, arguments)
+        chunks = split_columns(dict(enumerate(arguments)), BATCH_CHUNK_ROWS)
+        results = await map_calculation(_evaluate_chunk, chunks, function=self.function)
+        return (np.concatenate([values for values, _ in results]),
+                [error for _, errors in results for error in errors])
+
+    async def evaluate_records(self, first_row: int, records: Sequence[Any], slim: bool = False) -> List[dict]:
+        """Result rows (as ``/api/bulk`` writes them) for a chunk of records."""
+        columns, status, messages = self.record_columns(records)
+        valid = np.flatnonzero(status == 200)
+        values, errors = await self.evaluate({name: column[valid] for name, column in columns.items()}, len(valid))
+        results = {}
+        for position, index in enumerate(valid.tolist()):
+            if errors[position] is not None:
+                status[index], messages[index] = 400, errors[position]
+            else:
+                results[index] = float(values[position])
+        python_columns = {name: column.tolist() for name, column in columns.items()}
+        rows = []
+        for index in range(len(records)):
+            if index in results:
+                inputs = {name: column[index] for name, column in python_columns.items()}
+                rows.append({"row": first_row + index, "status": 200,
+                             **self.respond(inputs, results[index], slim)})
+            else:
+                rows.append({"row": first_row + index, "status": int(status[index]), "error": messages[index]})
+        return rows
+
+
+def _evaluate_chunk(chunk: Dict[int, np.ndarray], function: Callable) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """Pool task: ``evaluate_rows`` on one chunk of argument columns keyed by position."""
+    return evaluate_rows(function, [chunk[position] for position in sorted(chunk)])
+
+
+def _scalar_endpoint(calculation: Calculation, module: str) -> Callable:
+    """The cached single-request endpoint of a calculation."""
+
+    async def endpoint(request):
+        try:
+            values = {spec.name: getattr(request, spec.name) for spec in calculation.inputs}
+            result = await run_calculation(calculation.function, *values.values())
+            return calculation.respond(values, result)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    endpoint.__annotations__ = {"request": calculation.model}
+    endpoint.__module__ = module
+    endpoint.__name__ = endpoint.__qualname__ = f"calculate_{calculation.function_name}"
+    endpoint.__doc__ = calculation.description
+    endpoint.calculation = calculation
+    return cached(endpoint)
+
+
+def _batch_endpoint(calculation: Calculation, module: str) -> Callable:
+    """The columnar endpoint of a calculation, validated without a request model."""
+
+    async def endpoint(request: Request):
+        body = await request.body()
+        try:
+            payload = orjson.loads(body) if orjson is not None else json.loads(body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+        try:
+            columns, n_rows = calculation.columns(payload)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if n_rows > MAX_BATCH_ROWS:
+            raise HTTPException(status_code=400, detail=f"Batch has {n_rows} rows; the limit is {MAX_BATCH_ROWS}")
+
+        errors = RowErrors(n_rows)
+        errors.check_finite({spec.name: columns[spec.name] for spec in calculation._numeric})
+        valid = np.flatnonzero(errors.valid)
+        values, messages = await calculation.evaluate(
+            {name: column[valid] for name, column in columns.items()}, len(valid)
+        )
+        result = np.full(n_rows, np.nan)
+        result[valid] = values
+        failed = np.array([message is not None for message in messages], dtype=bool)
+        errors.messages[valid[failed]] = np.array(messages, dtype=object)[failed]
+        errors.valid[valid[failed]] = False
+        return Response(encode({
+            "rows": n_rows,
+            "invalid_rows": errors.invalid_count,
+            calculation.output: to_column(result, errors.valid),
+            "valid": errors.valid.tolist(),
+            "error": errors.messages.tolist(),
+            **calculation.extra
+        }), media_type="application/json")
+
+    endpoint.__module__ = module
+    endpoint.__name__ = endpoint.__qualname__ = f"calculate_{calculation.function_name}_batch"
+    endpoint.__doc__ = (
+        f"{calculation.description.rstrip('.')} for columns of inputs.\n\n"
+        "Each input is a value or a list; values are broadcast against the "
+        "lists. Rows that fail are returned as null with a message in the "
+        "``error`` column instead of failing the whole request."
+    )
+    return endpoint
+
+
+def include_calculations(router: APIRouter, calculations: Sequence[Calculation], module: str):
+    """Add the scalar and batch routes of each calculation to ``router`` (``module`` is the router's)."""
+    for calculation in calculations:
+        path = "/" + calculation.path
+        router.add_api_route(path, _scalar_endpoint(calculation, module), methods=["POST"],
+                             description=calculation.description)
+        router.add_api_route(path + "/batch", _batch_endpoint(calculation, module), methods=["POST"],
+                             openapi_extra={"requestBody": {"content": {"application/json": {
+                                 "schema": {"type": "object"}}}, "required": True}})
@@ -0,0 +1,119 @@
+"""
+Slim responses for calculation endpoints.
+
+Calculation endpoints echo every input back next to their results. Clients
+that only need the results can ask for a slim response, either with the
+``?response=slim`` query parameter or with an ``Accept`` header naming
+``application/vnd.petrocalc.slim+json``. Echoed inputs are then dropped
+(units are kept) and the response is encoded with orjson when it is
+installed, skipping FastAPI's generic encoder.
+"""
+
+import functools
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Tuple, Type
+from urllib.parse import parse_qsl
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from pydantic import BaseModel
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+SLIM_MEDIA_TYPE = "application/vnd.petrocalc.slim+json"
+
+_slim: ContextVar[bool] = ContextVar("petrocalc_slim_response", default=False)
+
+
+def is_slim() -> bool:
+    """Whether the current request asked for a slim response."""
+    return _slim.get()
+
+
+@contextmanager
+def response_mode(slim: bool) -> Iterator[None]:
+    """Override the response mode, e.g. for endpoints called by batch jobs."""
+    token = _slim.set(slim)
+    try:
+        yield
+    finally:
+        _slim.reset(token)
+
+
+def wants_slim(scope: Scope) -> bool:
+    """Whether a request selects slim mode by query parameter or ``Accept`` header."""
+    query_string = scope.get("query_string", b"")
+    if b"response=" in query_string and ("response", "slim") in parse_qsl(query_string.decode("latin-1")):
+        return True
+    for name, value in scope.get("headers", ()):
+        if name == b"accept" and SLIM_MEDIA_TYPE.encode() in value:
+            return True
+    return False
+
+
+@functools.lru_cache(maxsize=1024)
+def _echo_candidates(model: Type[BaseModel], keys: Tuple[str, ...]) -> Dict[str, str]:
+    """Map result keys named after a request field (or field plus unit suffix) to that field."""
+    fields = sorted(model.model_fields, key=len, reverse=True)
+    candidates = {}
+    for key in keys:
+        if key == "unit" or key.endswith("_unit"):
+            continue
+        for field in fields:
+            if key == field or key.startswith(field + "_"):
+                candidates[key] = field
+                break
+    return candidates
+
+
+def slim_result(request: BaseModel, result: Any) -> Any:
+    """
+    Drop the inputs a handler echoed back from its result.
+
+    A result key is an echo if it is named after a request field, possibly
+    with a unit suffix (``porosity`` -> ``porosity_fraction``), and holds
+    that field's value unchanged. Unit labels are always kept.
+    """
+    if not isinstance(result, dict):
+        return result
+    candidates = _echo_candidates(type(request), tuple(result))
+    if not candidates:
+        return result
+    return {
+        key: value for key, value in result.items()
+        if key not in candidates or getattr(request, candidates[key]) != value
+    }
+
+
+def encode(content: Any) -> bytes:
+    """Encode JSON with orjson, falling back to the standard library."""
+    if orjson is not None:
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(jsonable_encoder(content), separators=(",", ":")).encode()
+
+
+def slim_response(request: BaseModel, result: Any) -> Any:
+    """Encode the slim form of a handler result; ``Response`` objects pass through."""
+    if isinstance(result, Response):
+        return result
+    return Response(encode(slim_result(request, result)), media_type=SLIM_MEDIA_TYPE)
+
+
+class ResponseModeMiddleware:
+    """ASGI middleware selecting the response mode for each HTTP request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not wants_slim(scope):
+            await self.app(scope, receive, send)
+            return
+        with response_mode(True):
+            await self.app(scope, receive, send)
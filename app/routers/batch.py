@@ -0,0 +1,70 @@
+"""
+Batch dispatch API endpoint.
+
+Runs several calculation requests, possibly across different modules, in a
+single HTTP round trip.
+"""
+
+import asyncio
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from app import dispatch
+from app.config import get_config
+from app.responses import SLIM_MEDIA_TYPE, encode, is_slim
+
+router = APIRouter()
+config = get_config()
+
+
+# Request Models
+class BatchItem(BaseModel):
+    endpoint: str
+    payload: Dict[str, Any] = {}
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+
+
+async def _run_item(app, index: int, item: BatchItem, slim: bool = False) -> dict:
+    """Run one batch item, converting failures into a per-item status."""
+    try:
+        result = await dispatch.dispatch(app, item.endpoint, item.payload, slim=slim)
+        return {"index": index, "endpoint": item.endpoint, "status": 200, "result": result}
+    except dispatch.DispatchError as e:
+        return {"index": index, "endpoint": item.endpoint, "status": e.status_code, "error": e.detail}
+
+
+# API Endpoints
+@router.post("/batch")
+async def run_batch(request: BatchRequest, http_request: Request):
+    """
+    Run a list of ``{endpoint, payload}`` items concurrently.
+
+    Each payload is validated against the target endpoint's request model.
+    Results are returned in request order with a per-item HTTP-style status,
+    so one failing item does not fail the batch. In slim mode
+    (``?response=slim``) each result only holds the computed outputs.
+    """
+    if len(request.items) > config.batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch has {len(request.items)} items; the limit is {config.batch_max_items}"
+        )
+    slim = is_slim()
+    results = await asyncio.gather(*(
+        _run_item(http_request.app, index, item, slim) for index, item in enumerate(request.items)
+    ))
+    failed = sum(1 for result in results if result["status"] != 200)
+    response = {
+        "results": results,
+        "succeeded": len(results) - failed,
+        "failed": failed
+    }
+    if slim:
+        return Response(encode(response), media_type=SLIM_MEDIA_TYPE)
+    return response
@@ -0,0 +1,113 @@
+"""
+Bulk record-file API endpoints.
+
+Streams a CSV or NDJSON file of request records through any calculation
+endpoint and streams the results back, one chunk of rows at a time.
+"""
+
+from typing import AsyncIterator
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app import dispatch
+from app.config import get_config
+from app.responses import is_slim
+from app.streaming import (
+    DuplexStreamingResponse, RowWriter, detect_format, iter_lines, iter_records, spool_chunks, upload_chunks
+)
+
+router = APIRouter()
+config = get_config()
+
+
+async def _evaluate(route: dispatch.CalculationRoute, index: int, record, slim: bool = False) -> dict:
+    """Evaluate one record, returning a flat result row with its status."""
+    if isinstance(record, Exception):
+        return {"row": index, "status": 400, "error": str(record)}
+    try:
+        result = await dispatch.call(route, dispatch.validate(route, record), use_cache=False, slim=slim)
+    except dispatch.DispatchError as e:
+        return {"row": index, "status": e.status_code, "error": e.detail}
+    return {"row": index, "status": 200, **result}
+
+
+async def _stream_results(route, chunks, input_format: str, writer: RowWriter,
+                          slim: bool = False) -> AsyncIterator[str]:
+    """Parse, evaluate and serialize records one chunk of rows at a time."""
+    chunk_rows = config.bulk_chunk_rows
+    # Endpoints generated by app.registry evaluate whole chunks without a request model per row
+    calculation = getattr(route.endpoint, "calculation", None)
+    records = []
+    rows = []
+    index = 0
+    async for record in iter_records(iter_lines(chunks), input_format):
+        if calculation is not None:
+            records.append(record)
+        else:
+            rows.append(await _evaluate(route, index, record, slim))
+        index += 1
+        if len(records) >= chunk_rows:
+            yield writer.write(await calculation.evaluate_records(index - len(records), records, slim))
+            records = []
+        if len(rows) >= chunk_rows:
+            yield writer.write(rows)
+            rows = []
+    if records:
+        yield writer.write(await calculation.evaluate_records(index - len(records), records, slim))
+    if rows:
+        yield writer.write(rows)
+    yield writer.close()
+
+
+# API Endpoints
+@router.post("/{endpoint:path}")
+async def run_bulk(
+    endpoint: str,
+    request: Request,
+    output_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$")
+):
+    """
+    Evaluate every record of an uploaded CSV or NDJSON file against a calculation.
+
+    ``endpoint`` is the calculation path without ``/api``, e.g.
+    ``/api/bulk/fluids/water-viscosity``. The body is the raw file
+    (``Content-Type: text/csv`` or ``application/x-ndjson``) or a multipart
+    form with a ``file`` field. CSV files start with a header row naming
+    the request fields.
+
+    Rows are parsed, evaluated and written back in chunks of
+    ``PETROCALC_BULK_CHUNK_ROWS`` while a raw upload is still arriving, so
+    memory stays flat regardless of the file size. Results are produced only
+    as fast as the client reads them; the unprocessed part of the upload
+    waits in a temporary file. Multipart forms are spooled before streaming.
+    Calculations declared in ``app.registry`` check and evaluate each chunk
+    as columns, without a request model per row.
+    With ``?response=slim`` rows only hold the computed outputs.
+    """
+    try:
+        route = dispatch.resolve(request.app, endpoint)
+    except dispatch.DispatchError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        # The form is parsed (and spooled to disk) before streaming starts
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            await form.close()
+            raise HTTPException(status_code=400, detail="Multipart uploads must include a 'file' field")
+        input_format = detect_format(upload.content_type or "", upload.filename or "")
+        chunks = upload_chunks(form, upload)
+        response_class = StreamingResponse
+    else:
+        input_format = detect_format(content_type)
+        chunks = spool_chunks(request.stream())
+        response_class = DuplexStreamingResponse
+
+    writer = RowWriter(output_format, buffer_rows=config.bulk_chunk_rows)
+    return response_class(
+        _stream_results(route, chunks, input_format, writer, slim=is_slim()),
+        media_type=writer.media_type
+    )
@@ -6,12 +6,17 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional
 
-# Import petrocalc from pip-installed package
+from app.lazy import lazy_import
+
+# Import petrocalc from pip-installed package (loaded on first use)
 try:
-    from petrocalc import completion
+    completion = lazy_import("petrocalc.completion")
 except ImportError:
     raise ImportError("petrocalc package not found. Please install it using: pip install petrocalc")
 
+from app.cache import cached
+from app.executor import run_calculation
+
 router = APIRouter()
 
 
@@ -56,10 +61,12 @@ class AcidizingVolumeRequest(BaseModel):
 
 # API Endpoints
 @router.post("/perforation_flow_efficiency")
+@cached
 async def calculate_perforation_flow_efficiency(request: PerforationFlowEfficiencyRequest):
     """Calculate perforation flow efficiency."""
     try:
-        result = completion.perforation_flow_efficiency(
+        result = await run_calculation(
+            completion.perforation_flow_efficiency,
             request.perforation_diameter,
             request.wellbore_diameter,
             request.shots_per_foot,
@@ -74,11 +81,14 @@ async def calculate_perforation_flow_efficiency(request: PerforationFlowEfficien
             "penetration_depth_inches": request.penetration_depth,
             "phasing_angle_degrees": request.phasing_angle
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/hydraulic_fracturing_productivity")
+@cached
 async def calculate_hydraulic_fracturing_productivity(request: HydraulicFracturingRequest):
     """Calculate productivity improvement from hydraulic fracturing."""
     try:
@@ -105,6 +115,7 @@ async def calculate_hydraulic_fracturing_productivity(request: HydraulicFracturi
 
 
 @router.post("/proppant_concentration")
+@cached
 async def calculate_proppant_concentration(request: ProppantConcentrationRequest):
     """Calculate proppant concentration in fracturing fluid."""
     try:
@@ -122,6 +133,7 @@ async def calculate_proppant_concentration(request: ProppantConcentrationRequest
 
 
 @router.post("/fracture_width")
+@cached
 async def calculate_fracture_width(request: FractureWidthRequest):
     """Calculate fracture width during injection."""
     try:
@@ -147,6 +159,7 @@ async def calculate_fracture_width(request: FractureWidthRequest):
 
 
 @router.post("/acidizing_volume")
+@cached
 async def calculate_acidizing_volume(request: AcidizingVolumeRequest):
     """Calculate acid volume required for matrix acidizing."""
     try:
@@ -2,141 +2,49 @@
 Drilling calculations API endpoints.
 """
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter
 
-# Import petrocalc from pip-installed package
+from app.lazy import lazy_import
+
+# Import petrocalc from pip-installed package (loaded on first use)
 try:
-    from petrocalc import drilling
+    drilling = lazy_import("petrocalc.drilling")
 except ImportError:
     raise ImportError("petrocalc package not found. Please install it using: pip install petrocalc")
 
-router = APIRouter()
-
-
-class MudWeightRequest(BaseModel):
-    mud_weight: float
-    unit: str = "ppg"
-
-
-class HydrostaticPressureRequest(BaseModel):
-    mud_weight: float
-    depth: float
-    unit: str = "ppg"
-
-
-class AnnularVelocityRequest(BaseModel):
-    flow_rate: float
-    hole_diameter: float
-    pipe_diameter: float
-
-
-class PipeVelocityRequest(BaseModel):
-    flow_rate: float
-    pipe_inner_diameter: float
+from app.registry import Calculation, Input, include_calculations
 
-
-class ReynoldsNumberRequest(BaseModel):
-    velocity: float
-    diameter: float
-    density: float
-    viscosity: float
-
-
-@router.post("/mud-weight-to-pressure-gradient")
-async def mud_weight_to_pressure_gradient(request: MudWeightRequest):
-    """Convert mud weight to pressure gradient."""
-    try:
-        result = drilling.mud_weight_to_pressure_gradient(
-            request.mud_weight, 
-            request.unit
-        )
-        return {
-            "mud_weight": request.mud_weight,
-            "unit": request.unit,
-            "pressure_gradient": result,
-            "pressure_gradient_unit": "psi/ft"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-
-@router.post("/hydrostatic-pressure")
-async def hydrostatic_pressure(request: HydrostaticPressureRequest):
-    """Calculate hydrostatic pressure at depth."""
-    try:
-        result = drilling.hydrostatic_pressure(
-            request.mud_weight,
-            request.depth,
-            request.unit
-        )
-        return {
-            "mud_weight": request.mud_weight,
-            "depth": request.depth,
-            "unit": request.unit,
-            "hydrostatic_pressure": result,
-            "pressure_unit": "psi"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-
-@router.post("/annular-velocity")
-async def annular_velocity(request: AnnularVelocityRequest):
-    """Calculate annular velocity."""
-    try:
-        result = drilling.annular_velocity(
-            request.flow_rate,
-            request.hole_diameter,
-            request.pipe_diameter
-        )
-        return {
-            "flow_rate": request.flow_rate,
-            "hole_diameter": request.hole_diameter,
-            "pipe_diameter": request.pipe_diameter,
-            "annular_velocity": result,
-            "velocity_unit": "ft/min"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-
-@router.post("/pipe-velocity")
-async def pipe_velocity(request: PipeVelocityRequest):
-    """Calculate pipe velocity."""
-    try:
-        result = drilling.pipe_velocity(
-            request.flow_rate,
-            request.pipe_inner_diameter
-        )
-        return {
-            "flow_rate": request.flow_rate,
-            "pipe_inner_diameter": request.pipe_inner_diameter,
-            "pipe_velocity": result,
-            "velocity_unit": "ft/min"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+router = APIRouter()
 
 
-@router.post("/reynolds-number")
-async def reynolds_number(request: ReynoldsNumberRequest):
-    """Calculate Reynolds number."""
-    try:
-        result = drilling.reynolds_number(
-            request.velocity,
-            request.diameter,
-            request.density,
-            request.viscosity
-        )
-        return {
-            "velocity": request.velocity,
-            "diameter": request.diameter,
-            "density": request.density,
-            "viscosity": request.viscosity,
-            "reynolds_number": result,
-            "unit": "dimensionless"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+# Calculations (see app.registry for the generated routes)
+CALCULATIONS = [
+    Calculation(
+        "mud-weight-to-pressure-gradient", drilling, "Convert mud weight to pressure gradient.",
+        inputs=[Input("mud_weight"), Input("unit", default="ppg", type=str)],
+        output="pressure_gradient", extra={"pressure_gradient_unit": "psi/ft"}, echo_first=True
+    ),
+    Calculation(
+        "hydrostatic-pressure", drilling, "Calculate hydrostatic pressure at depth.",
+        inputs=[Input("mud_weight"), Input("depth"), Input("unit", default="ppg", type=str)],
+        output="hydrostatic_pressure", extra={"pressure_unit": "psi"}, echo_first=True
+    ),
+    Calculation(
+        "annular-velocity", drilling, "Calculate annular velocity.",
+        inputs=[Input("flow_rate"), Input("hole_diameter"), Input("pipe_diameter")],
+        output="annular_velocity", extra={"velocity_unit": "ft/min"}, echo_first=True
+    ),
+    Calculation(
+        "pipe-velocity", drilling, "Calculate pipe velocity.",
+        inputs=[Input("flow_rate"), Input("pipe_inner_diameter")],
+        output="pipe_velocity", extra={"velocity_unit": "ft/min"}, echo_first=True
+    ),
+    Calculation(
+        "reynolds-number", drilling, "Calculate Reynolds number.",
+        inputs=[Input("velocity"), Input("diameter"), Input("density"), Input("viscosity")],
+        output="reynolds_number", extra={"unit": "dimensionless"}, echo_first=True
+    ),
+]
+
+# API Endpoints
+include_calculations(router, CALCULATIONS, __name__)
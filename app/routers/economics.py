@@ -2,18 +2,49 @@
 Economics calculations API endpoints.
 """
 
+import math
+from typing import List, Optional, Union
+
+import numpy as np
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
 from pydantic import BaseModel
-from typing import List
 
-# Import petrocalc from pip-installed package
+from app.kernels import RowErrors, to_column
+from app.kernels import economics as economics_kernels
+from app.lazy import lazy_import
+
+# Import petrocalc from pip-installed package (loaded on first use)
 try:
-    from petrocalc import economics
+    economics = lazy_import("petrocalc.economics")
 except ImportError:
     raise ImportError("petrocalc package not found. Please install it using: pip install petrocalc")
 
+from app.cache import cached
+from app.executor import map_calculation, run_calculation
+from app.responses import encode
+
 router = APIRouter()
 
+# Monte Carlo: trials per request and trials per pool task (and seed stream)
+MAX_MONTE_CARLO_TRIALS = 1_000_000
+MONTE_CARLO_CHUNK_TRIALS = 25_000
+# Monte Carlo: years of cash flow per trial and bins per histogram
+MAX_PROJECT_LIFE = 100
+MAX_HISTOGRAM_BINS = 1000
+
+# Batched IRR: cash-flow values (projects x periods) per request
+MAX_IRR_BATCH_VALUES = 5_000_000
+
+# Parameters each input distribution needs
+DISTRIBUTION_PARAMETERS = {
+    "fixed": ("value",),
+    "uniform": ("low", "high"),
+    "triangular": ("low", "mode", "high"),
+    "normal": ("mean", "std"),
+    "lognormal": ("mean", "std"),
+}
+
 
 # Request Models
 class NPVRequest(BaseModel):
@@ -72,6 +103,15 @@ class AbandonmentCostRequest(BaseModel):
     offshore: bool = False
 
 
+class IRRBatchRequest(BaseModel):
+    cash_flows: List[List[float]]
+    initial_investment: Union[List[float], float]
+    tolerance: float = 1e-10
+    min_rate: float = -0.99
+    max_rate: float = 10.0
+    grid_points: int = 200
+
+
 class BreakEvenOilPriceRequest(BaseModel):
     initial_investment: float
     annual_production: float
@@ -81,12 +121,39 @@ class BreakEvenOilPriceRequest(BaseModel):
     project_life: int = 20
 
 
+class Distribution(BaseModel):
+    distribution: str
+    value: Optional[float] = None
+    low: Optional[float] = None
+    mode: Optional[float] = None
+    high: Optional[float] = None
+    mean: Optional[float] = None
+    std: Optional[float] = None
+
+
+class MonteCarloRequest(BaseModel):
+    oil_price: Union[float, Distribution]
+    initial_rate: Union[float, Distribution]
+    decline_rate: Union[float, Distribution] = 0.0
+    operating_cost_per_barrel: Union[float, Distribution] = 15
+    fixed_operating_cost: Union[float, Distribution] = 0
+    capital_cost: Union[float, Distribution]
+    discount_rate: Union[float, Distribution] = 0.1
+    royalty_rate: float = 0.125
+    project_life: int = 20
+    trials: int = 100_000
+    seed: int = 0
+    histogram_bins: int = 50
+
+
 # API Endpoints
 @router.post("/net_present_value")
+@cached
 async def calculate_npv(request: NPVRequest):
     """Calculate Net Present Value (NPV) of a project."""
     try:
-        result = economics.net_present_value(
+        result = await run_calculation(
+            economics.net_present_value,
             request.cash_flows,
             request.discount_rate,
             request.initial_investment
@@ -97,15 +164,19 @@ async def calculate_npv(request: NPVRequest):
             "discount_rate": request.discount_rate,
             "initial_investment": request.initial_investment
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/internal_rate_of_return")
+@cached
 async def calculate_irr(request: IRRRequest):
     """Calculate Internal Rate of Return (IRR)."""
     try:
-        result = economics.internal_rate_of_return(
+        result = await run_calculation(
+            economics.internal_rate_of_return,
             request.cash_flows,
             request.initial_investment,
             request.tolerance
@@ -117,15 +188,102 @@ async def calculate_irr(request: IRRRequest):
             "initial_investment": request.initial_investment,
             "tolerance": request.tolerance
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/internal_rate_of_return_batch")
+async def calculate_irr_batch(request: IRRBatchRequest):
+    """
+    Calculate the IRR of many projects at once.
+
+    ``cash_flows`` is a matrix of projects by periods; ``initial_investment``
+    is one value per project or a scalar. All projects are solved together
+    by safeguarded Newton iteration on ``[min_rate, max_rate]``. Projects
+    whose cash flows change sign more than once may have several IRRs: they
+    are scanned on ``grid_points`` rates and each root is solved; ``irr``
+    holds the lowest and ``roots`` lists them all. ``status`` is ``ok``,
+    ``multiple_roots`` or ``no_root``; invalid projects are null with a
+    message in the ``error`` column.
+    """
+    n_projects = len(request.cash_flows)
+    periods = len(request.cash_flows[0]) if n_projects else 0
+    if n_projects == 0 or periods == 0:
+        raise HTTPException(status_code=400, detail="cash_flows must have at least one project and one period")
+    if any(len(row) != periods for row in request.cash_flows):
+        raise HTTPException(status_code=400, detail="Every project needs the same number of cash-flow periods")
+    if n_projects * periods > MAX_IRR_BATCH_VALUES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Request has {n_projects * periods} cash-flow values; the limit is {MAX_IRR_BATCH_VALUES}"
+        )
+    if not -1 < request.min_rate < request.max_rate:
+        raise HTTPException(status_code=400, detail="-1 < min_rate < max_rate is required")
+    if not 2 <= request.grid_points <= 10_000 or request.tolerance <= 0:
+        raise HTTPException(status_code=400, detail="grid_points must be 2-10000 and tolerance positive")
+    investment = np.asarray(request.initial_investment, dtype=float)
+    if investment.ndim and len(investment) != n_projects:
+        raise HTTPException(status_code=400, detail="initial_investment needs one value per project")
+
+    cash_flows = np.array(request.cash_flows, dtype=float)
+    investment = np.broadcast_to(investment, (n_projects,))
+    errors = RowErrors(n_projects)
+    errors.flag(~np.all(np.isfinite(cash_flows), axis=1) | ~np.isfinite(investment), "values must be finite")
+
+    # Invalid projects are left out of the solve
+    solvable = np.flatnonzero(errors.valid)
+    solved = await run_calculation(
+        economics_kernels.irr_roots, cash_flows[solvable], investment[solvable],
+        tolerance=request.tolerance, min_rate=request.min_rate, max_rate=request.max_rate,
+        grid_points=request.grid_points
+    )
+    irr = np.full(n_projects, np.nan)
+    irr[solvable] = solved["irr"]
+    status = np.full(n_projects, None, dtype=object)
+    status[solvable] = solved["status"]
+    root_count = np.zeros(n_projects, dtype=int)
+    root_count[solvable] = solved["root_count"]
+    sign_changes = np.zeros(n_projects, dtype=int)
+    sign_changes[solvable] = solved["sign_changes"]
+    iterations = np.zeros(n_projects, dtype=int)
+    iterations[solvable] = solved["iterations"]
+    roots = [None] * n_projects
+    for row, rates in solved["roots"].items():
+        roots[int(solvable[row])] = rates
+
+    found = np.isfinite(irr)
+    result = {
+        "projects": n_projects,
+        "periods": periods,
+        "invalid_projects": errors.invalid_count,
+        "projects_with_multiple_roots": int((status == "multiple_roots").sum()),
+        "projects_without_root": int((status == "no_root").sum()),
+        "internal_rate_of_return": to_column(irr, found),
+        "internal_rate_of_return_percent": to_column(irr * 100, found),
+        "status": status.tolist(),
+        "root_count": root_count.tolist(),
+        "roots": roots,
+        "sign_changes": sign_changes.tolist(),
+        "iterations": iterations.tolist(),
+        "valid": errors.valid.tolist(),
+        "error": errors.messages.tolist(),
+        "min_rate": request.min_rate,
+        "max_rate": request.max_rate,
+        "tolerance": request.tolerance
+    }
+    # Thousands of projects make a large body, so skip the generic encoder
+    return Response(encode(result), media_type="application/json")
+
+
 @router.post("/discounted_payback_period")
+@cached
 async def calculate_discounted_payback(request: DiscountedPaybackRequest):
     """Calculate discounted payback period."""
     try:
-        result = economics.discounted_payback_period(
+        result = await run_calculation(
+            economics.discounted_payback_period,
             request.cash_flows,
             request.discount_rate,
             request.initial_investment
@@ -136,15 +294,19 @@ async def calculate_discounted_payback(request: DiscountedPaybackRequest):
             "discount_rate": request.discount_rate,
             "initial_investment": request.initial_investment
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/profitability_index")
+@cached
 async def calculate_profitability_index(request: ProfitabilityIndexRequest):
     """Calculate Profitability Index (PI)."""
     try:
-        result = economics.profitability_index(
+        result = await run_calculation(
+            economics.profitability_index,
             request.cash_flows,
             request.discount_rate,
             request.initial_investment
@@ -155,15 +317,19 @@ async def calculate_profitability_index(request: ProfitabilityIndexRequest):
             "discount_rate": request.discount_rate,
             "initial_investment": request.initial_investment
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/oil_revenue")
+@cached
 async def calculate_oil_revenue(request: OilRevenueRequest):
     """Calculate annual oil revenue."""
     try:
-        result = economics.oil_revenue_calculation(
+        result = await run_calculation(
+            economics.oil_revenue_calculation,
             request.production_rate,
             request.oil_price,
             request.royalty_rate,
@@ -177,15 +343,19 @@ async def calculate_oil_revenue(request: OilRevenueRequest):
             "operating_cost_per_barrel": request.operating_cost_per_barrel,
             "annual_production_bbl": request.production_rate * 365
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/gas_revenue")
+@cached
 async def calculate_gas_revenue(request: GasRevenueRequest):
     """Calculate annual gas revenue."""
     try:
-        result = economics.gas_revenue_calculation(
+        result = await run_calculation(
+            economics.gas_revenue_calculation,
             request.production_rate,
             request.gas_price,
             request.royalty_rate,
@@ -199,15 +369,19 @@ async def calculate_gas_revenue(request: GasRevenueRequest):
             "operating_cost_per_mcf": request.operating_cost_per_mcf,
             "annual_production_mscf": request.production_rate * 365
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/drilling_cost")
+@cached
 async def estimate_drilling_cost(request: DrillingCostRequest):
     """Estimate drilling cost for a well."""
     try:
-        result = economics.drilling_cost_estimation(
+        result = await run_calculation(
+            economics.drilling_cost_estimation,
             request.well_depth,
             request.hole_diameter,
             request.day_rate,
@@ -221,15 +395,19 @@ async def estimate_drilling_cost(request: DrillingCostRequest):
             "drilling_days_per_1000ft": request.drilling_days_per_1000ft,
             "estimated_drilling_days": (request.well_depth / 1000) * request.drilling_days_per_1000ft
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/completion_cost")
+@cached
 async def estimate_completion_cost(request: CompletionCostRequest):
     """Estimate completion cost for a well."""
     try:
-        result = economics.completion_cost_estimation(
+        result = await run_calculation(
+            economics.completion_cost_estimation,
             request.well_depth,
             request.completion_type,
             request.number_of_stages
@@ -240,15 +418,19 @@ async def estimate_completion_cost(request: CompletionCostRequest):
             "completion_type": request.completion_type,
             "number_of_stages": request.number_of_stages
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/abandonment_cost")
+@cached
 async def estimate_abandonment_cost(request: AbandonmentCostRequest):
     """Estimate well abandonment cost."""
     try:
-        result = economics.abandonment_cost_estimation(
+        result = await run_calculation(
+            economics.abandonment_cost_estimation,
             request.well_depth,
             request.offshore
         )
@@ -257,15 +439,19 @@ async def estimate_abandonment_cost(request: AbandonmentCostRequest):
             "well_depth_ft": request.well_depth,
             "offshore": request.offshore
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/break_even_oil_price")
+@cached
 async def calculate_break_even_oil_price(request: BreakEvenOilPriceRequest):
     """Calculate break-even oil price for a project."""
     try:
-        result = economics.break_even_oil_price(
+        result = await run_calculation(
+            economics.break_even_oil_price,
             request.initial_investment,
             request.annual_production,
             request.operating_cost_per_barrel,
@@ -282,5 +468,123 @@ async def calculate_break_even_oil_price(request: BreakEvenOilPriceRequest):
             "discount_rate": request.discount_rate,
             "project_life_years": request.project_life
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _distribution_spec(name: str, value: Union[float, Distribution]):
+    """Check one Monte Carlo input and convert it to the kernel's spec (a number or dict)."""
+    if not isinstance(value, Distribution):
+        return value
+    required = DISTRIBUTION_PARAMETERS.get(value.distribution)
+    if required is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{name}: distribution must be one of {', '.join(DISTRIBUTION_PARAMETERS)}"
+        )
+    spec = value.model_dump(exclude_none=True)
+    missing = [parameter for parameter in required if parameter not in spec]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"{name}: {value.distribution} needs {', '.join(missing)}")
+    if spec.get("low", -math.inf) > spec.get("mode", spec.get("high", math.inf)) or \
+            spec.get("mode", -math.inf) > spec.get("high", math.inf):
+        raise HTTPException(status_code=400, detail=f"{name}: low <= mode <= high is required")
+    if spec.get("std", 0) < 0 or (value.distribution == "lognormal" and spec["mean"] <= 0):
+        raise HTTPException(status_code=400, detail=f"{name}: std must not be negative and lognormal means positive")
+    return spec
+
+
+def _percentiles(values: np.ndarray, bins: int) -> dict:
+    """P10/P50/P90 (P10 the high case), mean and histogram of the finite values."""
+    finite = values[np.isfinite(values)]
+    if not len(finite):
+        return {"trials": 0, "p10": None, "p50": None, "p90": None, "mean": None, "histogram": None}
+    p90, p50, p10 = np.percentile(finite, [10, 50, 90])
+    counts, edges = np.histogram(finite, bins=bins)
+    return {
+        "trials": int(len(finite)),
+        "p10": float(p10),
+        "p50": float(p50),
+        "p90": float(p90),
+        "mean": float(finite.mean()),
+        "histogram": {"edges": edges.tolist(), "counts": counts.tolist()},
+    }
+
+
+@router.post("/monte_carlo")
+@cached
+async def calculate_monte_carlo(request: MonteCarloRequest):
+    """
+    Probabilistic NPV, IRR and discounted payback of an oil project.
+
+    Each input is a number or a distribution (``fixed``, ``uniform``,
+    ``triangular``, ``normal`` or ``lognormal``). Trials are split into
+    chunks evaluated in the worker pool; chunk seeds are spawned from
+    ``seed``, so a request gives the same result however the pool runs it.
+    Percentiles follow the exceedance convention (P10 is the high case).
+    The tornado swings each uncertain input between its P90 and P10 values
+    with the others at their medians, ranked by the NPV swing.
+    """
+    try:
+        if not 1 <= request.trials <= MAX_MONTE_CARLO_TRIALS:
+            raise HTTPException(status_code=400, detail=f"trials must be between 1 and {MAX_MONTE_CARLO_TRIALS}")
+        if not 1 <= request.project_life <= MAX_PROJECT_LIFE:
+            raise HTTPException(status_code=400, detail=f"project_life must be between 1 and {MAX_PROJECT_LIFE}")
+        if not 1 <= request.histogram_bins <= MAX_HISTOGRAM_BINS:
+            raise HTTPException(status_code=400, detail=f"histogram_bins must be between 1 and {MAX_HISTOGRAM_BINS}")
+        specs = {
+            name: _distribution_spec(name, getattr(request, name))
+            for name in economics_kernels.MONTE_CARLO_VARIABLES
+        }
+
+        sizes = [MONTE_CARLO_CHUNK_TRIALS] * (request.trials // MONTE_CARLO_CHUNK_TRIALS)
+        if request.trials % MONTE_CARLO_CHUNK_TRIALS:
+            sizes.append(request.trials % MONTE_CARLO_CHUNK_TRIALS)
+        seeds = np.random.SeedSequence(request.seed).spawn(len(sizes))
+        chunks = await map_calculation(
+            economics_kernels.monte_carlo_chunk, list(zip(seeds, sizes)),
+            specs=specs, years=request.project_life, royalty_rate=request.royalty_rate
+        )
+        npv, irr, payback = (np.concatenate([chunk[name] for chunk in chunks]) for name in ("npv", "irr", "payback"))
+
+        # Tornado: one input at a time at its P90 (low) and P10 (high) values
+        uncertain = [name for name, spec in specs.items() if isinstance(spec, dict) and spec["distribution"] != "fixed"]
+        base = {name: economics_kernels.quantile(spec, 0.5) for name, spec in specs.items()}
+        cases = {name: np.full(1 + 2 * len(uncertain), value) for name, value in base.items()}
+        for i, name in enumerate(uncertain):
+            cases[name][1 + 2 * i] = economics_kernels.quantile(specs[name], 0.1)
+            cases[name][2 + 2 * i] = economics_kernels.quantile(specs[name], 0.9)
+        case_npv = economics_kernels.evaluate_project(
+            cases, request.project_life, request.royalty_rate, metrics=["npv"]
+        )["npv"]
+        tornado = sorted((
+            {
+                "variable": name,
+                "low_input": float(cases[name][1 + 2 * i]),
+                "high_input": float(cases[name][2 + 2 * i]),
+                "npv_at_low_input": float(case_npv[1 + 2 * i]),
+                "npv_at_high_input": float(case_npv[2 + 2 * i]),
+                "swing": float(abs(case_npv[2 + 2 * i] - case_npv[1 + 2 * i])),
+            }
+            for i, name in enumerate(uncertain)
+        ), key=lambda bar: bar["swing"], reverse=True)
+
+        return {
+            "trials": request.trials,
+            "seed": request.seed,
+            "net_present_value": _percentiles(npv, request.histogram_bins),
+            "internal_rate_of_return": _percentiles(irr, request.histogram_bins),
+            "discounted_payback_years": _percentiles(payback, request.histogram_bins),
+            "probability_positive_npv": float((npv > 0).mean()),
+            "probability_of_payback": float(np.isfinite(payback).mean()),
+            "base_case_npv": float(case_npv[0]),
+            "tornado": tornado,
+            "royalty_rate": request.royalty_rate,
+            "project_life_years": request.project_life
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
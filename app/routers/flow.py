@@ -2,18 +2,31 @@
 Flow calculations API endpoints.
 """
 
+import numpy as np
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
 from pydantic import BaseModel
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
-# Import petrocalc from pip-installed package
+from app.kernels import broadcast_columns
+from app.kernels import network as network_kernels
+from app.lazy import lazy_import
+
+# Import petrocalc from pip-installed package (loaded on first use)
 try:
-    from petrocalc import flow
+    flow = lazy_import("petrocalc.flow")
 except ImportError:
     raise ImportError("petrocalc package not found. Please install it using: pip install petrocalc")
 
+from app.cache import cached
+from app.executor import run_calculation
+from app.responses import encode
+
 router = APIRouter()
 
+# Largest number of pipes in a /gas_network request
+MAX_NETWORK_PIPES = 200_000
+
 
 # Request Models
 class MoodyFrictionFactorRequest(BaseModel):
@@ -40,6 +53,22 @@ class GasFlowRateWeymouthRequest(BaseModel):
     efficiency: float = 1.0
 
 
+class GasNetworkRequest(BaseModel):
+    pipe_from: List[Union[str, int]]
+    pipe_to: List[Union[str, int]]
+    pipe_diameter: Union[List[float], float]
+    pipe_length: Union[List[float], float]
+    gas_gravity: Union[List[float], float]
+    temperature: Union[List[float], float]
+    efficiency: Union[List[float], float] = 1.0
+    fixed_pressures: Dict[str, float]
+    node_flows: Dict[str, float] = {}
+    initial_pressures: Optional[Dict[str, float]] = None
+    initial_pipe_flows: Optional[List[float]] = None
+    tolerance: float = 1e-6
+    max_iterations: int = 50
+
+
 class OilFlowRateHazenWilliamsRequest(BaseModel):
     pressure_drop: float
     pipe_diameter: float
@@ -88,10 +117,12 @@ class PumpHeadCalculationRequest(BaseModel):
 
 # API Endpoints
 @router.post("/moody_friction_factor")
+@cached
 async def calculate_moody_friction_factor(request: MoodyFrictionFactorRequest):
     """Calculate friction factor using Moody chart correlation."""
     try:
-        result = flow.moody_friction_factor(
+        result = await run_calculation(
+            flow.moody_friction_factor,
             request.reynolds_number,
             request.relative_roughness
         )
@@ -100,15 +131,19 @@ async def calculate_moody_friction_factor(request: MoodyFrictionFactorRequest):
             "reynolds_number": request.reynolds_number,
             "relative_roughness": request.relative_roughness
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/pressure_drop_horizontal_pipe")
+@cached
 async def calculate_pressure_drop_horizontal_pipe(request: PressureDropHorizontalPipeRequest):
     """Calculate pressure drop in horizontal pipe due to friction."""
     try:
-        result = flow.pressure_drop_horizontal_pipe(
+        result = await run_calculation(
+            flow.pressure_drop_horizontal_pipe,
             request.flow_rate,
             request.pipe_diameter,
             request.pipe_length,
@@ -125,15 +160,19 @@ async def calculate_pressure_drop_horizontal_pipe(request: PressureDropHorizonta
             "fluid_viscosity_cp": request.fluid_viscosity,
             "pipe_roughness_ft": request.pipe_roughness
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/gas_flow_rate_weymouth")
+@cached
 async def calculate_gas_flow_rate_weymouth(request: GasFlowRateWeymouthRequest):
     """Calculate gas flow rate using Weymouth equation."""
     try:
-        result = flow.gas_flow_rate_weymouth(
+        result = await run_calculation(
+            flow.gas_flow_rate_weymouth,
             request.upstream_pressure,
             request.downstream_pressure,
             request.pipe_diameter,
@@ -152,15 +191,121 @@ async def calculate_gas_flow_rate_weymouth(request: GasFlowRateWeymouthRequest):
             "temperature_rankine": request.temperature,
             "efficiency": request.efficiency
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _network_nodes(request: GasNetworkRequest) -> Dict[str, int]:
+    """Number the nodes in order of first appearance and check boundary names."""
+    nodes = {name: i for i, name in enumerate(dict.fromkeys(map(str, request.pipe_from + request.pipe_to)))}
+    for field in ("fixed_pressures", "node_flows"):
+        unknown = [name for name in getattr(request, field) if name not in nodes]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"{field} names nodes without pipes: {unknown[:10]}")
+    both = set(request.fixed_pressures) & set(request.node_flows)
+    if both:
+        raise HTTPException(status_code=400, detail=f"Nodes with both a fixed pressure and a flow: {sorted(both)[:10]}")
+    return nodes
+
+
+@router.post("/gas_network")
+async def solve_gas_network(request: GasNetworkRequest):
+    """
+    Solve a gas gathering network of Weymouth pipes.
+
+    Pipes are given as columns (``pipe_from``, ``pipe_to`` and their
+    Weymouth parameters). Nodes in ``fixed_pressures`` hold their pressure
+    (psia); every other node takes its ``node_flows`` entry (Mscf/day,
+    supply positive, offtake negative, zero if absent). Pass the returned
+    ``pipe_flow_mscf_per_day`` as ``initial_pipe_flows`` to warm-start a
+    related case from a balanced state, or ``pressures_psia`` as
+    ``initial_pressures`` to derive the starting flows from them.
+    """
+    try:
+        if len(request.pipe_from) != len(request.pipe_to) or not request.pipe_from:
+            raise HTTPException(status_code=400, detail="pipe_from and pipe_to must be non-empty and of equal length")
+        if len(request.pipe_from) > MAX_NETWORK_PIPES:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_NETWORK_PIPES} pipes per request")
+        nodes = _network_nodes(request)
+        n_pipes = len(request.pipe_from)
+        try:
+            columns, n_rows = broadcast_columns({
+                "pipe_diameter": request.pipe_diameter,
+                "pipe_length": request.pipe_length,
+                "gas_gravity": request.gas_gravity,
+                "temperature": request.temperature,
+                "efficiency": request.efficiency,
+            })
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if n_rows not in (1, n_pipes):
+            raise HTTPException(status_code=400, detail=f"Pipe columns must have {n_pipes} values or one")
+        for name, values in columns.items():
+            if not np.all(np.isfinite(values)) or np.any(values <= 0):
+                raise HTTPException(status_code=400, detail=f"{name} must be finite and positive")
+
+        pipe_from = np.fromiter((nodes[str(name)] for name in request.pipe_from), int, n_pipes)
+        pipe_to = np.fromiter((nodes[str(name)] for name in request.pipe_to), int, n_pipes)
+        fixed = np.zeros(len(nodes), dtype=bool)
+        pressure = np.zeros(len(nodes))
+        injection = np.zeros(len(nodes))
+        for name, value in request.fixed_pressures.items():
+            fixed[nodes[name]] = True
+            pressure[nodes[name]] = value
+        for name, value in request.node_flows.items():
+            injection[nodes[name]] = value
+        if np.any(pressure[fixed] <= 0):
+            raise HTTPException(status_code=400, detail="Fixed pressures must be positive")
+        initial = None
+        if request.initial_pressures is not None:
+            initial = pressure.copy()
+            initial[~fixed] = np.nan
+            for name, value in request.initial_pressures.items():
+                if name in nodes and not fixed[nodes[name]]:
+                    initial[nodes[name]] = value
+            if not np.all(np.isfinite(initial)):
+                raise HTTPException(status_code=400, detail="initial_pressures must cover every free node")
+        initial_flow = None
+        if request.initial_pipe_flows is not None:
+            initial_flow = np.asarray(request.initial_pipe_flows, dtype=float)
+            if len(initial_flow) != n_pipes or not np.all(np.isfinite(initial_flow)):
+                raise HTTPException(status_code=400, detail=f"initial_pipe_flows must have {n_pipes} finite values")
+
+        coefficient = np.broadcast_to(network_kernels.weymouth_coefficient(
+            columns["pipe_diameter"], columns["pipe_length"], columns["gas_gravity"],
+            columns["temperature"], columns["efficiency"]
+        ), (n_pipes,))
+        result = await run_calculation(
+            network_kernels.solve_network, pipe_from, pipe_to, coefficient, fixed, pressure, injection,
+            initial_pressure=initial, initial_flow=initial_flow, tolerance=request.tolerance, max_iterations=request.max_iterations
+        )
+        names = list(nodes)
+        return Response(encode({
+            "converged": bool(result["converged"]),
+            "iterations": result["iterations"],
+            "relative_step": result["step"],
+            "relative_imbalance": result["residual"],
+            "node_count": len(names),
+            "pipe_count": n_pipes,
+            "pressures_psia": dict(zip(names, result["pressure"].tolist())),
+            "node_flows_mscf_per_day": dict(zip(names, result["node_flow"].tolist())),
+            "pipe_flow_mscf_per_day": result["flow"].tolist(),
+        }), media_type="application/json")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/oil_flow_rate_hazen_williams")
+@cached
 async def calculate_oil_flow_rate_hazen_williams(request: OilFlowRateHazenWilliamsRequest):
     """Calculate oil flow rate using Hazen-Williams equation."""
     try:
-        result = flow.oil_flow_rate_hazen_williams(
+        result = await run_calculation(
+            flow.oil_flow_rate_hazen_williams,
             request.pressure_drop,
             request.pipe_diameter,
             request.pipe_length,
@@ -173,15 +318,19 @@ async def calculate_oil_flow_rate_hazen_williams(request: OilFlowRateHazenWillia
             "pipe_length_ft": request.pipe_length,
             "hazen_williams_coefficient": request.hazen_williams_coefficient
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/critical_flow_velocity")
+@cached
 async def calculate_critical_flow_velocity(request: CriticalFlowVelocityRequest):
     """Calculate critical velocity for liquid carryover in gas flow."""
     try:
-        result = flow.critical_flow_velocity(
+        result = await run_calculation(
+            flow.critical_flow_velocity,
             request.liquid_density,
             request.gas_density,
             request.surface_tension
@@ -192,15 +341,19 @@ async def calculate_critical_flow_velocity(request: CriticalFlowVelocityRequest)
             "gas_density_lb_per_ft3": request.gas_density,
             "surface_tension_dynes_per_cm": request.surface_tension
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/terminal_settling_velocity")
+@cached
 async def calculate_terminal_settling_velocity(request: TerminalSettlingVelocityRequest):
     """Calculate terminal settling velocity of particles in fluid."""
     try:
-        result = flow.terminal_settling_velocity(
+        result = await run_calculation(
+            flow.terminal_settling_velocity,
             request.particle_diameter,
             request.particle_density,
             request.fluid_density,
@@ -213,15 +366,19 @@ async def calculate_terminal_settling_velocity(request: TerminalSettlingVelocity
             "fluid_density_lb_per_ft3": request.fluid_density,
             "fluid_viscosity_cp": request.fluid_viscosity
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/flow_through_orifice")
+@cached
 async def calculate_flow_through_orifice(request: FlowThroughOrificeRequest):
     """Calculate flow rate through an orifice."""
     try:
-        result = flow.flow_through_orifice(
+        result = await run_calculation(
+            flow.flow_through_orifice,
             request.upstream_pressure,
             request.downstream_pressure,
             request.orifice_diameter,
@@ -236,15 +393,19 @@ async def calculate_flow_through_orifice(request: FlowThroughOrificeRequest):
             "fluid_density_lb_per_ft3": request.fluid_density,
             "discharge_coefficient": request.discharge_coefficient
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/multiphase_flow_pressure_drop")
+@cached
 async def calculate_multiphase_flow_pressure_drop(request: MultiphaseFlowPressureDropRequest):
     """Calculate pressure drop in multiphase flow using simplified correlation."""
     try:
-        pressure_gradient, liquid_holdup = flow.multiphase_flow_pressure_drop(
+        pressure_gradient, liquid_holdup = await run_calculation(
+            flow.multiphase_flow_pressure_drop,
             request.liquid_superficial_velocity,
             request.gas_superficial_velocity,
             request.pipe_diameter,
@@ -268,15 +429,19 @@ async def calculate_multiphase_flow_pressure_drop(request: MultiphaseFlowPressur
             "gas_viscosity_cp": request.gas_viscosity,
             "surface_tension_dynes_per_cm": request.surface_tension
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/pump_head_calculation")
+@cached
 async def calculate_pump_head(request: PumpHeadCalculationRequest):
     """Calculate required pump power."""
     try:
-        result = flow.pump_head_calculation(
+        result = await run_calculation(
+            flow.pump_head_calculation,
             request.flow_rate,
             request.total_dynamic_head,
             request.pump_efficiency
@@ -287,5 +452,7 @@ async def calculate_pump_head(request: PumpHeadCalculationRequest):
             "total_dynamic_head_ft": request.total_dynamic_head,
             "pump_efficiency": request.pump_efficiency
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
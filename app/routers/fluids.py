@@ -2,118 +2,44 @@
 Fluids calculations API endpoints.
 """
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional
+from fastapi import APIRouter
 
-# Import petrocalc from pip-installed package
+from app.lazy import lazy_import
+
+# Import petrocalc from pip-installed package (loaded on first use)
 try:
-    from petrocalc import fluids
+    fluids = lazy_import("petrocalc.fluids")
 except ImportError:
     raise ImportError("petrocalc package not found. Please install it using: pip install petrocalc")
 
-router = APIRouter()
-
-
-class WaterFormationVolumeFactorRequest(BaseModel):
-    temperature: float
-    pressure: float
-    salinity: float = 0
-
-
-class WaterCompressibilityRequest(BaseModel):
-    temperature: float
-    pressure: float
-    salinity: float = 0
-
-
-class GasFormationVolumeFactorRequest(BaseModel):
-    temperature: float
-    pressure: float
-    z_factor: float = 1.0
+from app.registry import Calculation, Input, include_calculations
 
-
-class WaterViscosityRequest(BaseModel):
-    temperature: float
-    pressure: float
-    salinity: float = 0
-
-
-@router.post("/water-formation-volume-factor")
-async def water_formation_volume_factor(request: WaterFormationVolumeFactorRequest):
-    """Calculate water formation volume factor."""
-    try:
-        result = fluids.water_formation_volume_factor(
-            request.temperature,
-            request.pressure,
-            request.salinity
-        )
-        return {
-            "temperature": request.temperature,
-            "pressure": request.pressure,
-            "salinity": request.salinity,
-            "water_fvf": result,
-            "unit": "res bbl/STB"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-
-@router.post("/water-compressibility")
-async def water_compressibility(request: WaterCompressibilityRequest):
-    """Calculate water compressibility."""
-    try:
-        result = fluids.water_compressibility(
-            request.temperature,
-            request.pressure,
-            request.salinity
-        )
-        return {
-            "temperature": request.temperature,
-            "pressure": request.pressure,
-            "salinity": request.salinity,
-            "water_compressibility": result,
-            "unit": "1/psi"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-
-@router.post("/gas-formation-volume-factor")
-async def gas_formation_volume_factor(request: GasFormationVolumeFactorRequest):
-    """Calculate gas formation volume factor."""
-    try:
-        result = fluids.gas_formation_volume_factor(
-            request.temperature,
-            request.pressure,
-            request.z_factor
-        )
-        return {
-            "temperature": request.temperature,
-            "pressure": request.pressure,
-            "z_factor": request.z_factor,
-            "gas_fvf": result,
-            "unit": "res ft³/scf"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+router = APIRouter()
 
 
-@router.post("/water-viscosity")
-async def water_viscosity(request: WaterViscosityRequest):
-    """Calculate water viscosity."""
-    try:
-        result = fluids.water_viscosity(
-            request.temperature,
-            request.pressure,
-            request.salinity
-        )
-        return {
-            "temperature": request.temperature,
-            "pressure": request.pressure,
-            "salinity": request.salinity,
-            "water_viscosity": result,
-            "unit": "cp"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+# Calculations (see app.registry for the generated routes)
+CALCULATIONS = [
+    Calculation(
+        "water-formation-volume-factor", fluids, "Calculate water formation volume factor.",
+        inputs=[Input("temperature"), Input("pressure"), Input("salinity", default=0)],
+        output="water_fvf", extra={"unit": "res bbl/STB"}, echo_first=True
+    ),
+    Calculation(
+        "water-compressibility", fluids, "Calculate water compressibility.",
+        inputs=[Input("temperature"), Input("pressure"), Input("salinity", default=0)],
+        output="water_compressibility", extra={"unit": "1/psi"}, echo_first=True
+    ),
+    Calculation(
+        "gas-formation-volume-factor", fluids, "Calculate gas formation volume factor.",
+        inputs=[Input("temperature"), Input("pressure"), Input("z_factor", default=1.0)],
+        output="gas_fvf", extra={"unit": "res ft³/scf"}, echo_first=True
+    ),
+    Calculation(
+        "water-viscosity", fluids, "Calculate water viscosity.",
+        inputs=[Input("temperature"), Input("pressure"), Input("salinity", default=0)],
+        output="water_viscosity", extra={"unit": "cp"}, echo_first=True
+    ),
+]
+
+# API Endpoints
+include_calculations(router, CALCULATIONS, __name__)
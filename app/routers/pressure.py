@@ -2,17 +2,37 @@
 Pressure calculations and analysis API endpoints.
 """
 
-from fastapi import APIRouter, HTTPException
+import csv
+import io
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 
-# Import petrocalc from pip-installed package
+from app.kernels import pressure as pressure_kernels
+from app.lazy import lazy_import
+
+# Import petrocalc from pip-installed package (loaded on first use)
 try:
-    from petrocalc import pressure
+    pressure = lazy_import("petrocalc.pressure")
 except ImportError:
     raise ImportError("petrocalc package not found. Please install it using: pip install petrocalc")
 
+from app.cache import cached
+from app.executor import run_calculation
+from app.responses import encode
+from app.streaming import CSV_MEDIA_TYPE
+
 router = APIRouter()
 
+# Kill sheet schedule: rows per request and rows per streamed CSV chunk
+MAX_KILL_SHEET_ROWS = 1_000_000
+KILL_SHEET_CHUNK_ROWS = 10_000
+# Pressure profiles: depth samples per request, over all wells
+MAX_PROFILE_SAMPLES = 5_000_000
+
 
 # Request Models
 class FormationPressureGradientRequest(BaseModel):
@@ -86,12 +106,71 @@ class LostCirculationPressureRequest(BaseModel):
     safety_margin: float = 50
 
 
+class DrillstringSection(BaseModel):
+    length: float
+    inner_diameter: Optional[float] = None
+    capacity: Optional[float] = None
+    vertical_length: Optional[float] = None
+    name: Optional[str] = None
+
+
+class AnnulusSection(BaseModel):
+    length: float
+    hole_diameter: Optional[float] = None
+    pipe_outer_diameter: Optional[float] = None
+    capacity: Optional[float] = None
+    name: Optional[str] = None
+
+
+class KillSheetRequest(BaseModel):
+    original_mud_weight: float
+    shut_in_drillpipe_pressure: float
+    shut_in_casing_pressure: Optional[float] = None
+    true_vertical_depth: float
+    slow_pump_rate_pressure: float
+    pump_output: float
+    slow_pump_rate: Optional[float] = None
+    drillstring: List[DrillstringSection]
+    annulus: List[AnnulusSection] = []
+    shoe_true_vertical_depth: Optional[float] = None
+    fracture_pressure: Optional[float] = None
+    leak_off_mud_weight: Optional[float] = None
+    kill_mud_weight_margin: float = 0.0
+    stroke_interval: float = 1.0
+    include_annulus: bool = True
+
+
+class PressureProfileWell(BaseModel):
+    name: Optional[str] = None
+    depth: Optional[List[float]] = None
+    bulk_density: Optional[List[Optional[float]]] = None
+    sonic_transit_time: Optional[List[Optional[float]]] = None
+    poisson_ratio: Optional[Union[float, List[float]]] = None
+
+
+class PressureProfileRequest(BaseModel):
+    wells: List[PressureProfileWell]
+    top_depth: float = 0.0
+    base_depth: Optional[float] = None
+    depth_step: float = 1.0
+    formation_water_density: float = 67.0
+    poisson_ratio: float = 0.25
+    normal_transit_time_surface: float = 200.0
+    normal_transit_time_matrix: float = 55.0
+    compaction_constant: float = 2e-4
+    eaton_exponent: float = 3.0
+    kick_margin: float = 0.0
+    fracture_margin: float = 0.0
+
+
 # API Endpoints
 @router.post("/formation_pressure_gradient")
+@cached
 async def calculate_formation_pressure_gradient(request: FormationPressureGradientRequest):
     """Calculate formation pressure gradient."""
     try:
-        result = pressure.formation_pressure_gradient(
+        result = await run_calculation(
+            pressure.formation_pressure_gradient,
             request.formation_water_density,
             request.salinity,
             request.temperature
@@ -102,15 +181,19 @@ async def calculate_formation_pressure_gradient(request: FormationPressureGradie
             "salinity_ppm": request.salinity,
             "temperature_fahrenheit": request.temperature
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/overburden_pressure_gradient")
+@cached
 async def calculate_overburden_pressure_gradient(request: OverburdenPressureGradientRequest):
     """Calculate overburden pressure gradient."""
     try:
-        result = pressure.overburden_pressure_gradient(
+        result = await run_calculation(
+            pressure.overburden_pressure_gradient,
             request.depth,
             request.surface_density
         )
@@ -119,15 +202,19 @@ async def calculate_overburden_pressure_gradient(request: OverburdenPressureGrad
             "depth_ft": request.depth,
             "surface_density_lb_per_ft3": request.surface_density
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/fracture_pressure_gradient")
+@cached
 async def calculate_fracture_pressure_gradient(request: FracturePressureGradientRequest):
     """Calculate fracture pressure gradient using Eaton's method."""
     try:
-        result = pressure.fracture_pressure_gradient(
+        result = await run_calculation(
+            pressure.fracture_pressure_gradient,
             request.overburden_gradient,
             request.pore_pressure_gradient,
             request.poisson_ratio
@@ -138,15 +225,19 @@ async def calculate_fracture_pressure_gradient(request: FracturePressureGradient
             "pore_pressure_gradient_psi_per_ft": request.pore_pressure_gradient,
             "poisson_ratio": request.poisson_ratio
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/equivalent_mud_weight")
+@cached
 async def calculate_equivalent_mud_weight(request: EquivalentMudWeightRequest):
     """Calculate equivalent mud weight from pressure and depth."""
     try:
-        result = pressure.equivalent_mud_weight(
+        result = await run_calculation(
+            pressure.equivalent_mud_weight,
             request.pressure,
             request.depth
         )
@@ -155,15 +246,19 @@ async def calculate_equivalent_mud_weight(request: EquivalentMudWeightRequest):
             "pressure_psi": request.pressure,
             "depth_ft": request.depth
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/kick_tolerance")
+@cached
 async def calculate_kick_tolerance(request: KickToleranceRequest):
     """Calculate kick tolerance for well control."""
     try:
-        result = pressure.kick_tolerance(
+        result = await run_calculation(
+            pressure.kick_tolerance,
             request.casing_shoe_depth,
             request.formation_pressure,
             request.fracture_pressure,
@@ -176,15 +271,19 @@ async def calculate_kick_tolerance(request: KickToleranceRequest):
             "fracture_pressure_psi": request.fracture_pressure,
             "current_mud_weight_ppg": request.current_mud_weight
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/kill_mud_weight")
+@cached
 async def calculate_kill_mud_weight(request: KillMudWeightRequest):
     """Calculate kill mud weight for well control."""
     try:
-        result = pressure.kill_mud_weight(
+        result = await run_calculation(
+            pressure.kill_mud_weight,
             request.original_mud_weight,
             request.shut_in_drillpipe_pressure,
             request.true_vertical_depth
@@ -195,15 +294,19 @@ async def calculate_kill_mud_weight(request: KillMudWeightRequest):
             "shut_in_drillpipe_pressure_psi": request.shut_in_drillpipe_pressure,
             "true_vertical_depth_ft": request.true_vertical_depth
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/initial_circulating_pressure")
+@cached
 async def calculate_initial_circulating_pressure(request: InitialCirculatingPressureRequest):
     """Calculate initial circulating pressure for well control."""
     try:
-        result = pressure.initial_circulating_pressure(
+        result = await run_calculation(
+            pressure.initial_circulating_pressure,
             request.shut_in_drillpipe_pressure,
             request.slow_pump_rate_pressure
         )
@@ -212,15 +315,19 @@ async def calculate_initial_circulating_pressure(request: InitialCirculatingPres
             "shut_in_drillpipe_pressure_psi": request.shut_in_drillpipe_pressure,
             "slow_pump_rate_pressure_psi": request.slow_pump_rate_pressure
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/final_circulating_pressure")
+@cached
 async def calculate_final_circulating_pressure(request: FinalCirculatingPressureRequest):
     """Calculate final circulating pressure for well control."""
     try:
-        result = pressure.final_circulating_pressure(
+        result = await run_calculation(
+            pressure.final_circulating_pressure,
             request.slow_pump_rate_pressure,
             request.original_mud_weight,
             request.kill_mud_weight
@@ -231,15 +338,19 @@ async def calculate_final_circulating_pressure(request: FinalCirculatingPressure
             "original_mud_weight_ppg": request.original_mud_weight,
             "kill_mud_weight_ppg": request.kill_mud_weight
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/maximum_allowable_annular_surface_pressure")
+@cached
 async def calculate_maximum_allowable_annular_surface_pressure(request: MaxAllowableAnnularSurfacePressureRequest):
     """Calculate maximum allowable annular surface pressure."""
     try:
-        result = pressure.maximum_allowable_annular_surface_pressure(
+        result = await run_calculation(
+            pressure.maximum_allowable_annular_surface_pressure,
             request.fracture_pressure,
             request.mud_weight,
             request.shoe_depth
@@ -250,15 +361,19 @@ async def calculate_maximum_allowable_annular_surface_pressure(request: MaxAllow
             "mud_weight_ppg": request.mud_weight,
             "shoe_depth_ft": request.shoe_depth
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/pit_gain_calculation")
+@cached
 async def calculate_pit_gain(request: PitGainCalculationRequest):
     """Calculate pit gain during gas kick migration."""
     try:
-        result = pressure.pit_gain_calculation(
+        result = await run_calculation(
+            pressure.pit_gain_calculation,
             request.kick_volume,
             request.formation_gas_gradient,
             request.mud_gradient
@@ -269,15 +384,19 @@ async def calculate_pit_gain(request: PitGainCalculationRequest):
             "formation_gas_gradient_psi_per_ft": request.formation_gas_gradient,
             "mud_gradient_psi_per_ft": request.mud_gradient
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/pump_pressure_schedule")
+@cached
 async def calculate_pump_pressure_schedule(request: PumpPressureScheduleRequest):
     """Calculate pump pressure for kill operation."""
     try:
-        result = pressure.pump_pressure_schedule(
+        result = await run_calculation(
+            pressure.pump_pressure_schedule,
             request.initial_circulating_pressure,
             request.final_circulating_pressure,
             request.total_pump_strokes,
@@ -290,15 +409,19 @@ async def calculate_pump_pressure_schedule(request: PumpPressureScheduleRequest)
             "total_pump_strokes": request.total_pump_strokes,
             "current_stroke": request.current_stroke
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/lost_circulation_pressure")
+@cached
 async def calculate_lost_circulation_pressure(request: LostCirculationPressureRequest):
     """Calculate pressure at which lost circulation may occur."""
     try:
-        result = pressure.lost_circulation_pressure(
+        result = await run_calculation(
+            pressure.lost_circulation_pressure,
             request.formation_pressure,
             request.hydrostatic_pressure,
             request.safety_margin
@@ -309,5 +432,395 @@ async def calculate_lost_circulation_pressure(request: LostCirculationPressureRe
             "hydrostatic_pressure_psi": request.hydrostatic_pressure,
             "safety_margin_psi": request.safety_margin
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _section_capacities(sections: list, kind: str) -> np.ndarray:
+    """Capacity (bbl/ft) of each section: given, or from its diameters."""
+    capacities = []
+    for index, section in enumerate(sections, start=1):
+        if section.capacity is not None:
+            value = section.capacity
+        elif kind == "drillstring" and section.inner_diameter is not None:
+            value = float(pressure_kernels.capacity(section.inner_diameter))
+        elif kind == "annulus" and section.hole_diameter is not None and section.pipe_outer_diameter is not None:
+            value = float(pressure_kernels.capacity(section.hole_diameter, section.pipe_outer_diameter))
+        else:
+            needs = "inner_diameter" if kind == "drillstring" else "hole_diameter and pipe_outer_diameter"
+            raise HTTPException(status_code=400, detail=f"{kind} section {index} needs a capacity or {needs}")
+        if not value > 0 or not section.length > 0:
+            raise HTTPException(status_code=400, detail=f"{kind} section {index} needs a positive length and capacity")
+        capacities.append(value)
+    return np.array(capacities)
+
+
+def _kill_sheet_rows(sheet: dict, strokes: np.ndarray) -> dict:
+    """Schedule columns for an array of stroke counts, down the drillstring and up the annulus."""
+    string = sheet["drillstring"]
+    rows = pressure_kernels.pump_schedule(
+        strokes, string["length"], string["capacity"], string["vertical_length"], sheet["pump_output"],
+        sheet["initial_circulating_pressure"], sheet["final_circulating_pressure"],
+        sheet["slow_pump_rate_pressure"], sheet["original_mud_weight"], sheet["balance_mud_weight"]
+    )
+    in_annulus = strokes > sheet["strokes_to_bit"]
+    section_names = np.array(string["name"], dtype=object)[rows["section"]]
+    annulus = sheet["annulus"]
+    if annulus["length"]:
+        # Kill mud rising from the bit: position counted up from the bit, then as depth from surface
+        boundaries = np.concatenate([[0.0], np.cumsum(annulus["strokes"])])
+        climbed = np.interp(strokes - sheet["strokes_to_bit"], boundaries,
+                            np.concatenate([[0.0], np.cumsum(annulus["length"])]))
+        annulus_md = np.maximum(sheet["measured_depth"] - climbed, 0.0)
+        string_md = np.concatenate([[0.0], np.cumsum(string["length"])])
+        string_tvd = np.concatenate([[0.0], np.cumsum(string["vertical_length"])])
+        section = np.minimum(np.searchsorted(boundaries, strokes - sheet["strokes_to_bit"], side="right") - 1,
+                             len(boundaries) - 2)
+        rows["measured_depth"] = np.where(in_annulus, annulus_md, rows["measured_depth"])
+        rows["true_vertical_depth"] = np.where(
+            in_annulus, np.interp(annulus_md, string_md, string_tvd), rows["true_vertical_depth"]
+        )
+        section_names = np.where(in_annulus, np.array(annulus["name"], dtype=object)[section], section_names)
+    rows["location"] = np.where(in_annulus, "annulus", "drillstring")
+    rows["section"] = section_names
+    rows["volume"] = strokes * sheet["pump_output"]
+    if sheet["slow_pump_rate"]:
+        rows["time"] = strokes / sheet["slow_pump_rate"]
+    return rows
+
+
+KILL_SHEET_COLUMNS = (
+    ("strokes", "stroke"),
+    ("volume", "volume_bbl"),
+    ("time", "time_min"),
+    ("location", "location"),
+    ("section", "section"),
+    ("measured_depth", "kill_mud_measured_depth_ft"),
+    ("true_vertical_depth", "kill_mud_true_vertical_depth_ft"),
+    ("pressure", "drillpipe_pressure_psi"),
+)
+
+
+async def _stream_kill_sheet_csv(sheet: dict, strokes: np.ndarray) -> AsyncIterator[bytes]:
+    """Write the schedule as CSV, computing it a chunk of rows at a time."""
+    columns = [(key, name) for key, name in KILL_SHEET_COLUMNS if key != "time" or sheet["slow_pump_rate"]]
+    yield (",".join(name for _, name in columns) + "\n").encode()
+    for start in range(0, len(strokes), KILL_SHEET_CHUNK_ROWS):
+        rows = _kill_sheet_rows(sheet, strokes[start:start + KILL_SHEET_CHUNK_ROWS])
+        out = io.StringIO()
+        csv.writer(out, lineterminator="\n").writerows(zip(*(
+            rows[key].tolist() if rows[key].dtype == object or key == "location" else np.round(rows[key], 2).tolist()
+            for key, _ in columns
+        )))
+        yield out.getvalue().encode()
+
+
+@router.post("/kill_sheet")
+async def generate_kill_sheet(
+    request: KillSheetRequest,
+    output_format: str = Query("json", alias="format", pattern="^(json|csv)$")
+):
+    """
+    Generate a wait-and-weight kill sheet with the full stroke-by-stroke pump schedule.
+
+    Kill mud weight, initial and final circulating pressure and MAASP come
+    from the ``petrocalc.pressure`` functions; MAASP needs the shoe depth
+    and either the fracture pressure at the shoe or the leak-off test mud
+    weight. The drillstring (surface to bit) and the annulus (bit to
+    surface) are given section by section, with a capacity or diameters;
+    drillstring sections may give the vertical depth they span (by default
+    in proportion to their length). The schedule lists the drillpipe
+    pressure every ``stroke_interval`` strokes and at every section
+    boundary, computed for all strokes at once; it steps down from the
+    initial to the final circulating pressure at the bit, with
+    ``kill_mud_weight_margin`` included in the kill mud weight and FCP. ``format=csv`` streams the
+    schedule as CSV.
+    """
+    try:
+        if not request.drillstring:
+            raise HTTPException(status_code=400, detail="drillstring needs at least one section")
+        if request.pump_output <= 0 or request.stroke_interval <= 0:
+            raise HTTPException(status_code=400, detail="pump_output and stroke_interval must be positive")
+        if request.original_mud_weight <= 0 or request.true_vertical_depth <= 0:
+            raise HTTPException(status_code=400, detail="original_mud_weight and true_vertical_depth must be positive")
+
+        lengths = np.array([section.length for section in request.drillstring], dtype=float)
+        capacities = _section_capacities(request.drillstring, "drillstring")
+        measured_depth = float(lengths.sum())
+        if measured_depth < request.true_vertical_depth - 1:
+            raise HTTPException(status_code=400, detail="The drillstring is shorter than the true vertical depth")
+        vertical = np.array([
+            section.vertical_length if section.vertical_length is not None else np.nan
+            for section in request.drillstring
+        ])
+        given = np.isfinite(vertical)
+        # Sections without a vertical length share the remaining depth in proportion to their length
+        remaining = request.true_vertical_depth - vertical[given].sum()
+        if remaining < -1 or (given.all() and abs(remaining) > 1):
+            raise HTTPException(status_code=400, detail="Section vertical lengths must add up to the true vertical depth")
+        if not given.all():
+            vertical[~given] = max(remaining, 0.0) * lengths[~given] / lengths[~given].sum()
+
+        annulus_lengths = np.array([section.length for section in request.annulus], dtype=float)
+        annulus_capacities = _section_capacities(request.annulus, "annulus") if request.annulus else np.empty(0)
+
+        balance_mud_weight = pressure.kill_mud_weight(
+            request.original_mud_weight, request.shut_in_drillpipe_pressure, request.true_vertical_depth
+        )
+        kmw = balance_mud_weight + request.kill_mud_weight_margin
+        icp = pressure.initial_circulating_pressure(request.shut_in_drillpipe_pressure, request.slow_pump_rate_pressure)
+        fcp = pressure.final_circulating_pressure(request.slow_pump_rate_pressure, request.original_mud_weight, kmw)
+
+        maasp = {}
+        if request.shoe_true_vertical_depth is not None:
+            fracture = request.fracture_pressure
+            if fracture is None and request.leak_off_mud_weight is not None:
+                fracture = pressure_kernels.PRESSURE_GRADIENT_FACTOR * request.leak_off_mud_weight \
+                    * request.shoe_true_vertical_depth
+            if fracture is None:
+                raise HTTPException(status_code=400, detail="MAASP needs fracture_pressure or leak_off_mud_weight")
+            maasp = {
+                "fracture_pressure_at_shoe_psi": fracture,
+                "maasp_psi": pressure.maximum_allowable_annular_surface_pressure(
+                    fracture, request.original_mud_weight, request.shoe_true_vertical_depth),
+                "maasp_with_kill_mud_psi": pressure.maximum_allowable_annular_surface_pressure(
+                    fracture, kmw, request.shoe_true_vertical_depth),
+            }
+
+        string = pressure_kernels.section_strokes(lengths, capacities, request.pump_output)
+        annulus = pressure_kernels.section_strokes(annulus_lengths, annulus_capacities, request.pump_output)
+        strokes_to_bit = float(string["strokes"].sum())
+        bottoms_up = float(annulus["strokes"].sum())
+        sheet = {
+            "original_mud_weight": request.original_mud_weight,
+            "kill_mud_weight": kmw,
+            "balance_mud_weight": balance_mud_weight,
+            "initial_circulating_pressure": icp,
+            "final_circulating_pressure": fcp,
+            "slow_pump_rate_pressure": request.slow_pump_rate_pressure,
+            "pump_output": request.pump_output,
+            "slow_pump_rate": request.slow_pump_rate,
+            "measured_depth": measured_depth,
+            "strokes_to_bit": strokes_to_bit,
+            "drillstring": {
+                "length": lengths, "capacity": capacities, "vertical_length": vertical,
+                "name": [s.name or f"drillstring {i}" for i, s in enumerate(request.drillstring, start=1)],
+            },
+            "annulus": {
+                "length": annulus_lengths.tolist(), "strokes": annulus["strokes"],
+                "name": [s.name or f"annulus {i}" for i, s in enumerate(request.annulus, start=1)],
+            },
+        }
+
+        end = strokes_to_bit + (bottoms_up if request.include_annulus else 0.0)
+        n_rows = int(end // request.stroke_interval) + 1
+        if n_rows > MAX_KILL_SHEET_ROWS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Schedule has {n_rows} rows; the limit is {MAX_KILL_SHEET_ROWS} (raise stroke_interval)"
+            )
+        boundaries = np.concatenate([string["cumulative_strokes"],
+                                     strokes_to_bit + annulus["cumulative_strokes"] if request.include_annulus else []])
+        strokes = np.unique(np.concatenate([np.arange(n_rows) * request.stroke_interval, boundaries, [end]]))
+        strokes = strokes[strokes <= end]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if output_format == "csv":
+        return StreamingResponse(
+            _stream_kill_sheet_csv(sheet, strokes), media_type=CSV_MEDIA_TYPE,
+            headers={"Content-Disposition": 'attachment; filename="kill_sheet.csv"'}
+        )
+
+    rows = await run_calculation(_kill_sheet_rows, sheet, strokes)
+    formation_pressure = request.shut_in_drillpipe_pressure + pressure_kernels.PRESSURE_GRADIENT_FACTOR \
+        * request.original_mud_weight * request.true_vertical_depth
+
+    def sections(table: dict, names: List[str], lengths: np.ndarray, capacities: np.ndarray) -> list:
+        return [
+            {"name": name, "length_ft": float(length), "capacity_bbl_per_ft": float(cap),
+             "volume_bbl": float(volume), "strokes": float(count), "cumulative_strokes": float(total)}
+            for name, length, cap, volume, count, total in zip(
+                names, lengths, capacities, table["volume"], table["strokes"], table["cumulative_strokes"])
+        ]
+
+    return Response(encode({
+        "kill_mud_weight_ppg": kmw,
+        "initial_circulating_pressure_psi": icp,
+        "final_circulating_pressure_psi": fcp,
+        **maasp,
+        "formation_pressure_psi": formation_pressure,
+        "shut_in_casing_pressure_exceeds_maasp": (
+            request.shut_in_casing_pressure > maasp["maasp_psi"]
+            if maasp and request.shut_in_casing_pressure is not None else None
+        ),
+        "strokes_surface_to_bit": strokes_to_bit,
+        "strokes_bit_to_surface": bottoms_up,
+        "pressure_drop_per_100_strokes_psi": (icp - fcp) / strokes_to_bit * 100 if strokes_to_bit else None,
+        "drillstring_volume_bbl": float(string["volume"].sum()),
+        "annulus_volume_bbl": float(annulus["volume"].sum()),
+        "time_to_bit_min": strokes_to_bit / request.slow_pump_rate if request.slow_pump_rate else None,
+        "drillstring_sections": sections(string, sheet["drillstring"]["name"], lengths, capacities),
+        "annulus_sections": sections(annulus, sheet["annulus"]["name"], annulus_lengths,
+                                     annulus_capacities),
+        "schedule": {name: rows[key].tolist() for key, name in KILL_SHEET_COLUMNS if key in rows},
+        "original_mud_weight_ppg": request.original_mud_weight,
+        "shut_in_drillpipe_pressure_psi": request.shut_in_drillpipe_pressure,
+        "slow_pump_rate_pressure_psi": request.slow_pump_rate_pressure,
+        "true_vertical_depth_ft": request.true_vertical_depth,
+        "measured_depth_ft": measured_depth
+    }), media_type="application/json")
+
+
+PROFILE_COLUMNS = (
+    ("depth", "depth_ft"),
+    ("hydrostatic_pressure", "hydrostatic_pressure_psi"),
+    ("pore_pressure", "pore_pressure_psi"),
+    ("overburden_pressure", "overburden_pressure_psi"),
+    ("fracture_pressure", "fracture_pressure_psi"),
+    ("pore_pressure_emw", "pore_pressure_ppg"),
+    ("overburden_emw", "overburden_ppg"),
+    ("fracture_emw", "fracture_ppg"),
+    ("minimum_mud_weight", "minimum_mud_weight_ppg"),
+    ("maximum_mud_weight", "maximum_mud_weight_ppg"),
+    ("mud_weight_window", "mud_weight_window_ppg"),
+)
+
+
+def _profile_inputs(index: int, well: PressureProfileWell, request: PressureProfileRequest) -> dict:
+    """Depth grid and logs of one well as arrays, checked against each other."""
+    label = well.name or f"well {index}"
+    if well.depth is not None:
+        depth = np.array(well.depth, dtype=float)
+    elif request.base_depth is not None:
+        if request.depth_step <= 0 or request.base_depth < request.top_depth:
+            raise HTTPException(status_code=400, detail="depth_step must be positive and base_depth below top_depth")
+        n_samples = int(round((request.base_depth - request.top_depth) / request.depth_step)) + 1
+        if n_samples > MAX_PROFILE_SAMPLES:
+            raise HTTPException(status_code=400, detail=f"Depth grid has {n_samples} samples; "
+                                                        f"the limit is {MAX_PROFILE_SAMPLES}")
+        depth = request.top_depth + np.arange(n_samples) * request.depth_step
+    else:
+        raise HTTPException(status_code=400, detail=f"{label}: give depth, or base_depth for a depth grid")
+    if not len(depth) or not np.all(np.isfinite(depth)) or depth[0] < 0 or np.any(np.diff(depth) <= 0):
+        raise HTTPException(status_code=400, detail=f"{label}: depths must be non-negative and increasing")
+
+    inputs = {"depth": depth}
+    for field in ("bulk_density", "sonic_transit_time", "poisson_ratio"):
+        values = getattr(well, field)
+        if isinstance(values, list):
+            if len(values) != len(depth):
+                raise HTTPException(status_code=400,
+                                    detail=f"{label}: {field} has {len(values)} values for {len(depth)} depths")
+            values = np.array([np.nan if value is None else value for value in values], dtype=float)
+        inputs[field] = values
+    if inputs["poisson_ratio"] is None:
+        inputs["poisson_ratio"] = request.poisson_ratio
+    if np.any((np.asarray(inputs["poisson_ratio"]) <= 0) | (np.asarray(inputs["poisson_ratio"]) >= 0.5)):
+        raise HTTPException(status_code=400, detail=f"{label}: poisson_ratio must be between 0 and 0.5")
+    return inputs
+
+
+def _profile_summary(profile: Dict[str, np.ndarray]) -> dict:
+    """Mud-weight window over the whole interval and where it is narrowest."""
+    window = profile["mud_weight_window"]
+    finite = np.isfinite(window)
+    if not finite.any():
+        return {"minimum_mud_weight_ppg": None, "maximum_mud_weight_ppg": None}
+    narrowest = int(np.nanargmin(window))
+    return {
+        "minimum_mud_weight_ppg": float(np.nanmax(profile["minimum_mud_weight"])),
+        "maximum_mud_weight_ppg": float(np.nanmin(profile["maximum_mud_weight"])),
+        "narrowest_window_ppg": float(window[narrowest]),
+        "narrowest_window_depth_ft": float(profile["depth"][narrowest]),
+        "closed_window_samples": int(np.sum(window[finite] <= 0)),
+        "maximum_pore_pressure_ppg": float(np.nanmax(profile["pore_pressure_emw"])),
+    }
+
+
+async def _stream_pressure_profiles(wells: List[dict], settings: dict) -> AsyncIterator[bytes]:
+    """Write the profiles as CSV rows, one well at a time."""
+    yield ("well," + ",".join(name for _, name in PROFILE_COLUMNS) + "\n").encode()
+    for well in wells:
+        profile = await run_calculation(pressure_kernels.pressure_profile, **well["inputs"], **settings)
+        out = io.StringIO()
+        csv.writer(out, lineterminator="").writerow([well["name"]])
+        prefix = out.getvalue().encode() + b","
+        rows = np.round(np.column_stack([profile[key] for key, _ in PROFILE_COLUMNS]), 4)
+        # Every value is numeric, so the JSON array body is the CSV body; NaN (null) becomes empty
+        body = encode(rows)[2:-2].replace(b"],[", b"\n" + prefix).replace(b"null", b"")
+        yield prefix + body + b"\n"
+
+
+@router.post("/pressure_profile")
+async def calculate_pressure_profile(
+    request: PressureProfileRequest,
+    output_format: str = Query("json", alias="format", pattern="^(json|csv)$")
+):
+    """
+    Calculate pore, overburden and fracture pressure and the mud-weight window along depth for one or more wells.
+
+    Each well gives its true vertical depths (or uses the ``top_depth`` to
+    ``base_depth`` grid every ``depth_step`` ft) and optionally a bulk
+    density log (g/cm3), integrated cumulatively for the overburden, a sonic
+    log (us/ft) for Eaton pore pressure and Poisson's ratio per depth. Each
+    well is computed in one NumPy pass over its depths; without logs the
+    curves follow the ``petrocalc.pressure`` gradient functions. The window
+    runs from pore pressure plus ``kick_margin`` to fracture pressure less
+    ``fracture_margin``. ``format=csv`` streams the profiles as CSV rows.
+    """
+    try:
+        if not request.wells:
+            raise HTTPException(status_code=400, detail="wells needs at least one well")
+        if request.formation_water_density <= 0:
+            raise HTTPException(status_code=400, detail="formation_water_density must be positive")
+        wells = [
+            {"name": well.name or f"well {index}", "inputs": _profile_inputs(index, well, request)}
+            for index, well in enumerate(request.wells, start=1)
+        ]
+        n_samples = sum(len(well["inputs"]["depth"]) for well in wells)
+        if n_samples > MAX_PROFILE_SAMPLES:
+            raise HTTPException(
+                status_code=400, detail=f"Request has {n_samples} depth samples; the limit is {MAX_PROFILE_SAMPLES}"
+            )
+        settings = {
+            "formation_water_density": request.formation_water_density,
+            "normal_transit_time_surface": request.normal_transit_time_surface,
+            "normal_transit_time_matrix": request.normal_transit_time_matrix,
+            "compaction_constant": request.compaction_constant,
+            "eaton_exponent": request.eaton_exponent,
+            "kick_margin": request.kick_margin,
+            "fracture_margin": request.fracture_margin,
+        }
+
+        if output_format == "csv":
+            return StreamingResponse(
+                _stream_pressure_profiles(wells, settings), media_type=CSV_MEDIA_TYPE,
+                headers={"Content-Disposition": 'attachment; filename="pressure_profile.csv"'}
+            )
+
+        results = []
+        for well in wells:
+            profile = await run_calculation(pressure_kernels.pressure_profile, **well["inputs"], **settings)
+            results.append({
+                "name": well["name"],
+                "samples": len(profile["depth"]),
+                "summary": _profile_summary(profile),
+                "profile": {name: profile[key].tolist() for key, name in PROFILE_COLUMNS},
+            })
+        return Response(encode({
+            "wells": results,
+            "formation_water_density_lb_per_ft3": request.formation_water_density,
+            "hydrostatic_gradient_psi_per_ft": request.formation_water_density / 144,
+            "poisson_ratio": request.poisson_ratio,
+            "kick_margin_ppg": request.kick_margin,
+            "fracture_margin_ppg": request.fracture_margin
+        }), media_type="application/json")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
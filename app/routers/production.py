@@ -2,18 +2,47 @@
 Production engineering calculations API endpoints.
 """
 
-from fastapi import APIRouter, HTTPException
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional, Union
 
-# Import petrocalc from pip-installed package
+from app.kernels import RowErrors, broadcast_columns, split_columns, to_column
+from app.kernels import nodal as nodal_kernels
+from app.kernels import production as production_kernels
+from app.kernels import well_test as well_test_kernels
+from app.lazy import lazy_import
+from app import traverse
+
+# Import petrocalc from pip-installed package (loaded on first use)
 try:
-    from petrocalc import production
+    production = lazy_import("petrocalc.production")
 except ImportError:
     raise ImportError("petrocalc package not found. Please install it using: pip install petrocalc")
 
+from app.cache import cached
+from app.executor import map_calculation, run_calculation
+from app.responses import encode
+from app.streaming import detect_format, iter_arrays, upload_chunks
+
 router = APIRouter()
 
+# Largest number of points (wells x pressures) returned by /vogel_ipr_curve
+MAX_IPR_CURVE_POINTS = 2_000_000
+
+# Nodal analysis: wells per request and wells solved per pool task
+MAX_NODAL_WELLS = 50_000
+NODAL_CHUNK_WELLS = 500
+
+# Gauge time units accepted by /buildup_analysis, in hours
+TIME_UNITS = {"hours": 1.0, "minutes": 1 / 60, "seconds": 1 / 3600}
+
+NODAL_WELL_COLUMNS = (
+    "reservoir_pressure", "wellhead_pressure", "depth", "tubing_diameter", "gas_liquid_ratio",
+    "liquid_density", "gas_gravity", "liquid_viscosity", "gas_viscosity", "temperature", "z_factor"
+)
+
 
 # Request Models
 class VogelIPRRequest(BaseModel):
@@ -22,6 +51,36 @@ class VogelIPRRequest(BaseModel):
     maximum_oil_rate: float
 
 
+class VogelIPRCurveRequest(BaseModel):
+    reservoir_pressure: Union[List[float], float]
+    maximum_oil_rate: Optional[Union[List[float], float]] = None
+    test_rate: Optional[Union[List[float], float]] = None
+    test_bottomhole_pressure: Optional[Union[List[float], float]] = None
+    bottomhole_pressures: Optional[List[float]] = None
+    points: int = 21
+
+
+class NodalAnalysisRequest(BaseModel):
+    reservoir_pressure: Union[List[float], float]
+    maximum_oil_rate: Optional[Union[List[float], float]] = None
+    test_rate: Optional[Union[List[float], float]] = None
+    test_bottomhole_pressure: Optional[Union[List[float], float]] = None
+    wellhead_pressure: Union[List[float], float]
+    depth: Union[List[float], float]
+    tubing_diameter: Union[List[float], float]
+    gas_liquid_ratio: Union[List[float], float]
+    liquid_density: Union[List[float], float]
+    gas_gravity: Union[List[float], float]
+    liquid_viscosity: Union[List[float], float]
+    gas_viscosity: Union[List[float], float]
+    temperature: Union[List[float], float]
+    z_factor: Union[List[float], float] = 1.0
+    rate_points: int = 30
+    depth_steps: int = 50
+    tolerance: float = 0.1
+    include_curves: bool = False
+
+
 class ProductivityIndexRequest(BaseModel):
     flow_rate: float
     reservoir_pressure: float
@@ -70,6 +129,33 @@ class MultiphaseFlowRequest(BaseModel):
     gas_viscosity: float
 
 
+class SurveyStation(BaseModel):
+    measured_depth: float
+    inclination: float = 0.0
+    azimuth: float = 0.0
+
+
+class PressureTraverseRequest(BaseModel):
+    oil_rate: float
+    gas_oil_ratio: float
+    water_rate: float = 0.0
+    oil_gravity: float
+    gas_gravity: float
+    water_gravity: float = 1.0
+    salinity: float = 0.0
+    tubing_diameter: float
+    pressure: float
+    direction: str = "down"
+    wellhead_temperature: float
+    bottomhole_temperature: float
+    depth: Optional[float] = None
+    survey: Optional[List[SurveyStation]] = None
+    tolerance: float = 1.0
+    initial_step: float = 100.0
+    min_step: float = 1.0
+    max_step: float = 1000.0
+
+
 class WellTestHornerRequest(BaseModel):
     pressure_data: List[float]
     time_data: List[float]
@@ -82,12 +168,31 @@ class WellTestHornerRequest(BaseModel):
     thickness: float
 
 
+class BuildupAnalysisParams(BaseModel):
+    production_time: float
+    flow_rate: float
+    porosity: float
+    viscosity: float
+    total_compressibility: float
+    formation_volume_factor: float
+    thickness: float
+    wellbore_radius: float
+    shut_in_time: float = 0.0
+    time_unit: str = Query("hours", pattern="^(hours|minutes|seconds)$")
+    bins_per_cycle: int = Query(20, ge=1, le=200)
+    fit_start: Optional[float] = None
+    fit_end: Optional[float] = None
+    dtype: str = Query("float64", pattern="^(float64|float32)$")
+
+
 # API Endpoints
 @router.post("/vogel_ipr")
+@cached
 async def calculate_vogel_ipr(request: VogelIPRRequest):
     """Calculate oil production rate using Vogel's IPR correlation."""
     try:
-        result = production.vogel_ipr(
+        result = await run_calculation(
+            production.vogel_ipr,
             request.reservoir_pressure,
             request.bottomhole_pressure,
             request.maximum_oil_rate
@@ -98,15 +203,179 @@ async def calculate_vogel_ipr(request: VogelIPRRequest):
             "bottomhole_pressure_psia": request.bottomhole_pressure,
             "maximum_oil_rate_stb_per_day": request.maximum_oil_rate
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _inflow_columns(request: BaseModel, exclude: set):
+    """
+    Broadcast the per-well columns of an IPR-based request and find each well's qmax.
+
+    Wells give either ``maximum_oil_rate`` or a test point (``test_rate`` at
+    ``test_bottomhole_pressure``), from which qmax is derived so that the
+    Vogel IPR passes through the test point. Returns the columns, the row
+    errors, qmax and the test point's productivity index (None when qmax was
+    given).
+    """
+    from_test_point = request.test_rate is not None or request.test_bottomhole_pressure is not None
+    if from_test_point == (request.maximum_oil_rate is not None):
+        raise HTTPException(
+            status_code=400,
+            detail="Give either maximum_oil_rate or test_rate with test_bottomhole_pressure"
+        )
+    if from_test_point and (request.test_rate is None or request.test_bottomhole_pressure is None):
+        raise HTTPException(status_code=400, detail="test_rate and test_bottomhole_pressure must be given together")
+    try:
+        columns, n_wells = broadcast_columns(request.model_dump(exclude=exclude, exclude_none=True))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    pr = columns["reservoir_pressure"]
+    errors = RowErrors(n_wells)
+    errors.check_finite(columns)
+    errors.flag(pr <= 0, "reservoir_pressure must be positive")
+    if from_test_point:
+        errors.flag(columns["test_rate"] < 0, "test_rate must not be negative")
+        errors.flag(columns["test_bottomhole_pressure"] >= pr, "test_bottomhole_pressure must be below reservoir_pressure")
+        productivity_index = production_kernels.productivity_index(
+            columns["test_rate"], pr, columns["test_bottomhole_pressure"]
+        )
+        qmax = production_kernels.vogel_maximum_rate(columns["test_rate"], pr, columns["test_bottomhole_pressure"])
+    else:
+        errors.flag(columns["maximum_oil_rate"] < 0, "maximum_oil_rate must not be negative")
+        productivity_index = None
+        qmax = columns["maximum_oil_rate"]
+    return columns, errors, qmax, productivity_index
+
+
+def _rows(values: np.ndarray, valid: np.ndarray) -> list:
+    """2-D result to nested lists, with ``None`` for invalid wells."""
+    return [row.tolist() if ok else None for row, ok in zip(values, valid)]
+
+
+@router.post("/vogel_ipr_curve")
+async def calculate_vogel_ipr_curve(request: VogelIPRCurveRequest):
+    """
+    Calculate whole Vogel IPR curves for many wells at once.
+
+    Well inputs are columns (scalars are broadcast). Each well needs either
+    ``maximum_oil_rate`` or a test point (``test_rate`` at
+    ``test_bottomhole_pressure``), from which qmax is derived so that each
+    curve passes through its test point. Curves are evaluated at the
+    shared ``bottomhole_pressures`` or at ``points`` pressures from zero to
+    each well's reservoir pressure. Wells that fail are returned as null with
+    a message in the ``error`` column.
+    """
+    columns, errors, qmax, productivity_index = _inflow_columns(request, {"bottomhole_pressures", "points"})
+    pr = columns["reservoir_pressure"]
+    n_wells = len(pr)
+    if request.bottomhole_pressures is not None:
+        n_points = len(request.bottomhole_pressures)
+        if n_points == 0:
+            raise HTTPException(status_code=400, detail="bottomhole_pressures must not be empty")
+    else:
+        n_points = request.points
+        if n_points < 2:
+            raise HTTPException(status_code=400, detail="points must be at least 2")
+    if n_wells * n_points > MAX_IPR_CURVE_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Request has {n_wells * n_points} curve points; the limit is {MAX_IPR_CURVE_POINTS}"
+        )
+
+    if request.bottomhole_pressures is None:
+        pwf = pr[:, None] * np.linspace(0.0, 1.0, n_points)
+    else:
+        pwf = np.broadcast_to(np.asarray(request.bottomhole_pressures, dtype=float), (n_wells, n_points))
+    rate = production_kernels.vogel_ipr(pr[:, None], pwf, qmax[:, None])
+    errors.flag(~np.isfinite(qmax) | ~np.all(np.isfinite(rate), axis=1), "calculation produced a non-finite result")
+
+    result = {
+        "wells": n_wells,
+        "invalid_wells": errors.invalid_count,
+        "maximum_oil_rate_stb_per_day": to_column(qmax, errors.valid),
+        "bottomhole_pressure_psia": _rows(pwf, errors.valid),
+        "flow_rate_stb_per_day": _rows(rate, errors.valid),
+        "valid": errors.valid.tolist(),
+        "error": errors.messages.tolist()
+    }
+    if productivity_index is not None:
+        result["productivity_index_stb_per_day_per_psi"] = to_column(productivity_index, errors.valid)
+    # Curves for thousands of wells are large, so skip the generic encoder
+    return Response(encode(result), media_type="application/json")
+
+
+@router.post("/nodal_analysis")
+async def calculate_nodal_analysis(request: NodalAnalysisRequest):
+    """
+    Find the operating point of many wells, where the VLP meets the Vogel IPR.
+
+    Well inputs are columns (scalars are broadcast); qmax is given or derived
+    from a test point as for ``/vogel_ipr_curve``. The VLP of each vertical
+    well integrates the Beggs-Brill gradient from ``wellhead_pressure`` down
+    to ``depth`` for ``rate_points`` rates, with gas density and in-situ gas
+    rate following the pressure. The highest rate at which the curves cross
+    is then refined with a bracketed root-finder to within ``tolerance``
+    psi. Wells are solved in chunks on the worker pool. Wells without a
+    crossing do not flow and are reported with an error.
+    """
+    settings = {"rate_points", "depth_steps", "tolerance", "include_curves"}
+    columns, errors, qmax, _ = _inflow_columns(request, settings)
+    n_wells = len(qmax)
+    if not 3 <= request.rate_points <= 200 or not 1 <= request.depth_steps <= 500:
+        raise HTTPException(status_code=400, detail="rate_points must be 3-200 and depth_steps 1-500")
+    if n_wells > MAX_NODAL_WELLS:
+        raise HTTPException(status_code=400, detail=f"Request has {n_wells} wells; the limit is {MAX_NODAL_WELLS}")
+
+    for name in ("wellhead_pressure", "depth", "tubing_diameter", "liquid_density", "gas_gravity", "z_factor"):
+        errors.flag(columns[name] <= 0, f"{name} must be positive")
+    errors.flag(columns["gas_liquid_ratio"] < 0, "gas_liquid_ratio must not be negative")
+    errors.flag(qmax <= 0, "maximum oil rate must be positive")
+
+    # Invalid wells are left out of the solve
+    solvable = errors.valid.copy()
+    well = {name: columns[name][solvable] for name in NODAL_WELL_COLUMNS}
+    well["maximum_oil_rate"] = qmax[solvable]
+    chunks = await map_calculation(
+        nodal_kernels.nodal_analysis, split_columns(well, NODAL_CHUNK_WELLS),
+        rate_points=request.rate_points, depth_steps=request.depth_steps, tolerance=request.tolerance
+    )
+
+    def gather(name: str, width: Optional[int] = None) -> np.ndarray:
+        """Combine one result over the chunks, NaN for wells that were not solved."""
+        full = np.full((n_wells, width) if width else n_wells, np.nan)
+        if chunks:
+            full[solvable] = np.concatenate([chunk[name] for chunk in chunks])
+        return full
+
+    flowing = gather("flowing") == 1
+    errors.flag(~flowing, "no operating point: the well does not flow against this lift curve")
+
+    result = {
+        "wells": n_wells,
+        "flowing_wells": int(flowing.sum()),
+        "operating_rate_stb_per_day": to_column(gather("operating_rate"), flowing),
+        "operating_bottomhole_pressure_psia": to_column(gather("operating_pressure"), flowing),
+        "maximum_oil_rate_stb_per_day": to_column(qmax, solvable),
+        "valid": errors.valid.tolist(),
+        "error": errors.messages.tolist()
+    }
+    if request.include_curves:
+        for key, name in (("rates", "rate_stb_per_day"), ("vlp_pressure", "vlp_pressure_psia"),
+                          ("ipr_pressure", "ipr_pressure_psia")):
+            result[f"curve_{name}"] = _rows(gather(key, request.rate_points), solvable)
+    return Response(encode(result), media_type="application/json")
+
+
 @router.post("/productivity_index")
+@cached
 async def calculate_productivity_index(request: ProductivityIndexRequest):
     """Calculate productivity index for a well."""
     try:
-        result = production.productivity_index(
+        result = await run_calculation(
+            production.productivity_index,
             request.flow_rate,
             request.reservoir_pressure,
             request.bottomhole_pressure
@@ -117,15 +386,19 @@ async def calculate_productivity_index(request: ProductivityIndexRequest):
             "reservoir_pressure_psia": request.reservoir_pressure,
             "bottomhole_pressure_psia": request.bottomhole_pressure
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/darcy_radial_flow")
+@cached
 async def calculate_darcy_radial_flow(request: DarcyRadialFlowRequest):
     """Calculate flow rate using Darcy's equation for radial flow."""
     try:
-        result = production.darcy_radial_flow(
+        result = await run_calculation(
+            production.darcy_radial_flow,
             request.permeability,
             request.thickness,
             request.pressure_drop,
@@ -144,15 +417,19 @@ async def calculate_darcy_radial_flow(request: DarcyRadialFlowRequest):
             "wellbore_radius_ft": request.wellbore_radius,
             "drainage_radius_ft": request.drainage_radius
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/skin_factor")
+@cached
 async def calculate_skin_factor(request: SkinFactorRequest):
     """Calculate skin factor from productivity indices."""
     try:
-        result = production.skin_factor(
+        result = await run_calculation(
+            production.skin_factor,
             request.actual_productivity_index,
             request.ideal_productivity_index
         )
@@ -161,15 +438,19 @@ async def calculate_skin_factor(request: SkinFactorRequest):
             "actual_productivity_index": request.actual_productivity_index,
             "ideal_productivity_index": request.ideal_productivity_index
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/gas_well_deliverability")
+@cached
 async def calculate_gas_well_deliverability(request: GasWellDeliverabilityRequest):
     """Calculate gas well deliverability using Rawlins-Schellhardt equation."""
     try:
-        result = production.gas_well_deliverability_rawlins_schellhardt(
+        result = await run_calculation(
+            production.gas_well_deliverability_rawlins_schellhardt,
             request.absolute_open_flow_potential,
             request.flowing_bottomhole_pressure,
             request.reservoir_pressure,
@@ -182,15 +463,19 @@ async def calculate_gas_well_deliverability(request: GasWellDeliverabilityReques
             "reservoir_pressure_psia": request.reservoir_pressure,
             "flow_exponent": request.flow_exponent
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/choke_flow_rate_gas")
+@cached
 async def calculate_choke_flow_rate_gas(request: ChokeFlowRateGasRequest):
     """Calculate gas flow rate through a choke."""
     try:
-        result = production.choke_flow_rate_gas(
+        result = await run_calculation(
+            production.choke_flow_rate_gas,
             request.upstream_pressure,
             request.downstream_pressure,
             request.choke_diameter,
@@ -207,15 +492,19 @@ async def calculate_choke_flow_rate_gas(request: ChokeFlowRateGasRequest):
             "temperature_rankine": request.temperature,
             "discharge_coefficient": request.discharge_coefficient
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/multiphase_flow_beggs_brill")
+@cached
 async def calculate_multiphase_flow(request: MultiphaseFlowRequest):
     """Calculate pressure gradient using Beggs-Brill correlation."""
     try:
-        pressure_gradient, liquid_holdup = production.multiphase_flow_beggs_brill(
+        pressure_gradient, liquid_holdup = await run_calculation(
+            production.multiphase_flow_beggs_brill,
             request.liquid_rate,
             request.gas_rate,
             request.pipe_diameter,
@@ -237,15 +526,83 @@ async def calculate_multiphase_flow(request: MultiphaseFlowRequest):
             "liquid_viscosity_cp": request.liquid_viscosity,
             "gas_viscosity_cp": request.gas_viscosity
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/pressure_traverse")
+@cached
+async def calculate_pressure_traverse(request: PressureTraverseRequest):
+    """
+    Pressure, temperature and holdup profile along a well by adaptive-step integration.
+
+    Marches from the wellhead ``down`` or from the bottomhole ``up`` starting
+    at ``pressure``. The well path is a vertical ``depth`` or a ``survey``
+    of stations (measured depth, inclination from vertical, azimuth).
+    """
+    try:
+        if request.direction not in ("down", "up"):
+            raise HTTPException(status_code=400, detail="direction must be 'down' or 'up'")
+        if (request.depth is None) == (request.survey is None):
+            raise HTTPException(status_code=400, detail="Provide either depth or survey")
+        if request.oil_rate + request.water_rate <= 0 or request.tubing_diameter <= 0 or request.pressure <= 0:
+            raise HTTPException(status_code=400, detail="Rates, tubing diameter and pressure must be positive")
+        if not 0 < request.min_step <= request.max_step or request.tolerance <= 0:
+            raise HTTPException(status_code=400, detail="Steps and tolerance must be positive, min_step <= max_step")
+
+        if request.survey is not None:
+            survey = traverse.Survey(
+                [station.measured_depth for station in request.survey],
+                [station.inclination for station in request.survey],
+                [station.azimuth for station in request.survey],
+            )
+        else:
+            survey = traverse.Survey.vertical(request.depth)
+        fluid = traverse.BlackOilFluid(
+            request.oil_rate, request.gas_oil_ratio, request.water_rate, request.oil_gravity,
+            request.gas_gravity, request.water_gravity, request.salinity
+        )
+        result = await run_calculation(
+            traverse.pressure_traverse,
+            fluid,
+            survey,
+            request.tubing_diameter,
+            request.pressure,
+            request.wellhead_temperature,
+            request.bottomhole_temperature,
+            direction=request.direction,
+            tolerance=request.tolerance,
+            initial_step=request.initial_step,
+            min_step=request.min_step,
+            max_step=request.max_step
+        )
+        return {
+            "wellhead_pressure_psia": result["wellhead_pressure"],
+            "bottomhole_pressure_psia": result["bottomhole_pressure"],
+            "measured_depth_ft": survey.total_depth,
+            "true_vertical_depth_ft": float(survey.true_vertical_depth[-1]),
+            "direction": request.direction,
+            "steps": result["steps"],
+            "rejected_steps": result["rejected_steps"],
+            "property_lookups": result["property_lookups"],
+            "property_cache_hits": result["property_cache_hits"],
+            "profile": result["profile"],
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/well_test_horner")
+@cached
 async def analyze_well_test_horner(request: WellTestHornerRequest):
     """Analyze well test data using Horner plot method."""
     try:
-        permeability, skin = production.well_test_analysis_horner(
+        permeability, skin = await run_calculation(
+            production.well_test_analysis_horner,
             request.pressure_data,
             request.time_data,
             request.production_time,
@@ -267,5 +624,97 @@ async def analyze_well_test_horner(request: WellTestHornerRequest):
             "formation_volume_factor": request.formation_volume_factor,
             "thickness_ft": request.thickness
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/buildup_analysis")
+async def analyze_buildup(request: Request, params: BuildupAnalysisParams = Depends()):
+    """
+    Horner analysis of a pressure buildup streamed from a gauge file.
+
+    The body is the gauge record as rows of (time, pressure): packed
+    little-endian ``float64``/``float32`` pairs (``application/octet-stream``),
+    CSV text, or a multipart form with a ``file`` field. Samples are folded
+    into ``bins_per_cycle`` logarithmic bins of shut-in time
+    (``time - shut_in_time``) as they arrive, so memory does not grow with
+    the record. A least-squares Horner line is fitted to the binned samples
+    between ``fit_start`` and ``fit_end`` hours of shut-in time for
+    permeability and skin; the binned diagnostic series (pressure change and
+    Bourdet derivative) is returned alongside. The flowing pressure is the
+    last sample at or before shut-in, else the first binned pressure.
+    """
+    try:
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("file")
+            if upload is None or isinstance(upload, str):
+                await form.close()
+                raise HTTPException(status_code=400, detail="Multipart uploads must include a 'file' field")
+            chunks = upload_chunks(form, upload)
+            content_type, filename = upload.content_type or "", upload.filename or ""
+        else:
+            chunks = request.stream()
+            filename = ""
+        binary = "octet-stream" in content_type or filename.lower().endswith((".bin", ".dat"))
+        input_format = "binary" if binary else detect_format(content_type, filename)
+        if input_format == "ndjson":
+            input_format = "csv"
+
+        binner = well_test_kernels.LogTimeBinner(params.bins_per_cycle)
+        scale = TIME_UNITS[params.time_unit]
+        dtype = "<f8" if params.dtype == "float64" else "<f4"
+        async for rows in iter_arrays(chunks, 2, input_format, dtype):
+            binner.add((rows[:, 0] - params.shut_in_time) * scale, rows[:, 1])
+        if binner.count.sum() == 0:
+            raise HTTPException(status_code=400, detail="No samples after shut-in")
+
+        series = binner.series()
+        dt, pressure = series["delta_time"], series["pressure"]
+        horner_time = (params.production_time + dt) / dt
+        pwf = binner.shut_in_pressure if binner.shut_in_pressure is not None else float(pressure[0])
+        delta_pressure = pressure - pwf
+        window = np.ones(len(dt), dtype=bool)
+        if params.fit_start is not None:
+            window &= dt >= params.fit_start
+        if params.fit_end is not None:
+            window &= dt <= params.fit_end
+        if window.sum() < 2:
+            raise HTTPException(status_code=400, detail="Fewer than two bins in the fit window")
+
+        result = well_test_kernels.horner_analysis(
+            dt[window], pressure[window], pwf, params.production_time, params.flow_rate, params.porosity,
+            params.viscosity, params.total_compressibility, params.formation_volume_factor,
+            params.thickness, params.wellbore_radius
+        )
+        return Response(encode({
+            "permeability_md": result["permeability"],
+            "skin_factor": result["skin"],
+            "horner_slope_psi_per_cycle": result["slope"],
+            "extrapolated_pressure_psia": result["extrapolated_pressure"],
+            "pressure_1hr_psia": result["pressure_1hr"],
+            "r_squared": result["r_squared"],
+            "flowing_pressure_at_shut_in_psia": pwf,
+            "samples": binner.samples,
+            "samples_out_of_range": binner.out_of_range,
+            "bins": len(dt),
+            "fit_bins": int(window.sum()),
+            "production_time_hours": params.production_time,
+            "flow_rate_stb_per_day": params.flow_rate,
+            "wellbore_radius_ft": params.wellbore_radius,
+            "diagnostics": {
+                "delta_time_hours": dt,
+                "pressure_psia": pressure,
+                "delta_pressure_psi": delta_pressure,
+                "horner_time": horner_time,
+                "bourdet_derivative_psi": well_test_kernels.bourdet_derivative(dt, delta_pressure),
+                "samples": series["samples"],
+            },
+        }), media_type="application/json")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -2,17 +2,44 @@
 Reservoir engineering calculations API endpoints.
 """
 
-from fastapi import APIRouter, HTTPException
+import csv
+import io
+import json
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import AsyncIterator, Dict, List, Optional, Union
+
+from app.kernels import RowErrors, broadcast_columns, to_column
+from app.kernels import reservoir as reservoir_kernels
+from app.lazy import lazy_import
 
-# Import petrocalc from pip-installed package
+# Import petrocalc from pip-installed package (loaded on first use)
 try:
-    from petrocalc import reservoir
+    reservoir = lazy_import("petrocalc.reservoir")
 except ImportError:
     raise ImportError("petrocalc package not found. Please install it using: pip install petrocalc")
 
+from app.cache import cached, cached_items
+from app.config import get_config
+from app.executor import run_calculation
+from app.registry import MAX_BATCH_ROWS
+from app.responses import encode
+from app.streaming import CSV_MEDIA_TYPE
+
 router = APIRouter()
+config = get_config()
+
+# Largest pressure grid accepted by /pvt-table
+MAX_PVT_PRESSURES = 2000
+
+# /decline-forecast: wells and time points per request, wells per streamed chunk
+MAX_DECLINE_WELLS = 100_000
+MAX_DECLINE_TIMES = 10_000
+DECLINE_CHUNK_WELLS = 1000
+DECLINE_WELL_COLUMNS = ("initial_rate", "initial_decline_rate", "decline_exponent", "terminal_decline_rate")
 
 
 class OilFormationVolumeFactorRequest(BaseModel):
@@ -30,11 +57,54 @@ class SolutionGasOilRatioRequest(BaseModel):
     oil_gravity: float
 
 
+class OilFormationVolumeFactorBatchRequest(BaseModel):
+    gas_oil_ratio: Union[List[float], float]
+    gas_gravity: Union[List[float], float]
+    oil_gravity: Union[List[float], float]
+    temperature: Union[List[float], float]
+    pressure: Union[List[float], float]
+
+
+class SolutionGasOilRatioBatchRequest(BaseModel):
+    pressure: Union[List[float], float]
+    temperature: Union[List[float], float]
+    gas_gravity: Union[List[float], float]
+    oil_gravity: Union[List[float], float]
+
+
+class DeclineForecastRequest(BaseModel):
+    initial_rate: Union[List[float], float]
+    initial_decline_rate: Union[List[float], float]
+    decline_exponent: Union[List[float], float] = 0.0
+    terminal_decline_rate: Union[List[float], float] = 0.0
+    time: Optional[List[float]] = None
+    time_step: float = 1.0
+    periods: int = 360
+
+
+class PVTFluid(BaseModel):
+    gas_oil_ratio: float
+    gas_gravity: float
+    oil_gravity: float
+    temperature: float
+    name: Optional[str] = None
+
+
+class PVTTableRequest(BaseModel):
+    fluids: List[PVTFluid]
+    pressures: Optional[List[float]] = None
+    min_pressure: float = 14.7
+    max_pressure: float = 5000.0
+    steps: int = 25
+
+
 @router.post("/oil-formation-volume-factor")
+@cached
 async def oil_formation_volume_factor(request: OilFormationVolumeFactorRequest):
     """Calculate oil formation volume factor using Standing's correlation."""
     try:
-        result = reservoir.oil_formation_volume_factor_standing(
+        result = await run_calculation(
+            reservoir.oil_formation_volume_factor_standing,
             request.gas_oil_ratio,
             request.gas_gravity,
             request.oil_gravity,
@@ -50,15 +120,19 @@ async def oil_formation_volume_factor(request: OilFormationVolumeFactorRequest):
             "oil_fvf": result,
             "unit": "res bbl/STB"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/solution-gas-oil-ratio")
+@cached
 async def solution_gas_oil_ratio(request: SolutionGasOilRatioRequest):
     """Calculate solution gas-oil ratio using Standing's correlation."""
     try:
-        result = reservoir.solution_gas_oil_ratio_standing(
+        result = await run_calculation(
+            reservoir.solution_gas_oil_ratio_standing,
             request.pressure,
             request.temperature,
             request.gas_gravity,
@@ -72,5 +146,373 @@ async def solution_gas_oil_ratio(request: SolutionGasOilRatioRequest):
             "solution_gor": result,
             "unit": "scf/STB"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+def _check_pvt_inputs(errors: RowErrors, columns: dict):
+    """Flag rows whose gravities fall outside the correlation's domain."""
+    errors.check_finite(columns)
+    errors.flag(columns["gas_gravity"] <= 0, "gas_gravity must be positive")
+    errors.flag(columns["oil_gravity"] <= -131.5, "oil_gravity must be greater than -131.5 API")
+
+
+@router.post("/oil-formation-volume-factor/batch")
+async def oil_formation_volume_factor_batch(request: OilFormationVolumeFactorBatchRequest):
+    """
+    Calculate oil formation volume factor for columns of inputs.
+
+    Scalar inputs are broadcast against the array columns. Rows that fail
+    are returned as null with a message in the ``error`` column instead of
+    failing the whole request.
+    """
+    try:
+        columns, n_rows = broadcast_columns(request.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if n_rows > MAX_BATCH_ROWS:
+        raise HTTPException(status_code=400, detail=f"Batch has {n_rows} rows; the limit is {MAX_BATCH_ROWS}")
+
+    errors = RowErrors(n_rows)
+    _check_pvt_inputs(errors, columns)
+    result = await run_calculation(
+        reservoir_kernels.oil_formation_volume_factor_standing,
+        columns["gas_oil_ratio"],
+        columns["gas_gravity"],
+        columns["oil_gravity"],
+        columns["temperature"],
+        columns["pressure"]
+    )
+    errors.check_result(result)
+    return {
+        "rows": n_rows,
+        "invalid_rows": errors.invalid_count,
+        "oil_fvf": to_column(result, errors.valid),
+        "valid": errors.valid.tolist(),
+        "error": errors.messages.tolist(),
+        "unit": "res bbl/STB"
+    }
+
+
+@router.post("/solution-gas-oil-ratio/batch")
+async def solution_gas_oil_ratio_batch(request: SolutionGasOilRatioBatchRequest):
+    """
+    Calculate solution gas-oil ratio for columns of inputs.
+
+    Scalar inputs are broadcast against the array columns. Rows that fail
+    are returned as null with a message in the ``error`` column instead of
+    failing the whole request.
+    """
+    try:
+        columns, n_rows = broadcast_columns(request.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if n_rows > MAX_BATCH_ROWS:
+        raise HTTPException(status_code=400, detail=f"Batch has {n_rows} rows; the limit is {MAX_BATCH_ROWS}")
+
+    errors = RowErrors(n_rows)
+    _check_pvt_inputs(errors, columns)
+    result = await run_calculation(
+        reservoir_kernels.solution_gas_oil_ratio_standing,
+        columns["pressure"],
+        columns["temperature"],
+        columns["gas_gravity"],
+        columns["oil_gravity"]
+    )
+    errors.check_result(result)
+    return {
+        "rows": n_rows,
+        "invalid_rows": errors.invalid_count,
+        "solution_gor": to_column(result, errors.valid),
+        "valid": errors.valid.tolist(),
+        "error": errors.messages.tolist(),
+        "unit": "scf/STB"
+    }
+
+
+PVT_UNITS = {
+    "pressure": "psia",
+    "bubble_point_pressure": "psia",
+    "solution_gor": "scf/STB",
+    "oil_fvf": "res bbl/STB",
+    "oil_viscosity": "cp",
+}
+
+
+def _pressure_grid(request: PVTTableRequest) -> np.ndarray:
+    """The requested pressure grid, sorted and without duplicates."""
+    if request.pressures is not None:
+        grid = np.unique(np.asarray(request.pressures, dtype=float))
+    else:
+        if not 2 <= request.steps <= MAX_PVT_PRESSURES:
+            raise ValueError(f"steps must be between 2 and {MAX_PVT_PRESSURES}")
+        if not request.max_pressure > request.min_pressure:
+            raise ValueError("max_pressure must be greater than min_pressure")
+        grid = np.linspace(request.min_pressure, request.max_pressure, request.steps)
+    if grid.size == 0 or grid.size > MAX_PVT_PRESSURES:
+        raise ValueError(f"The pressure grid must have between 1 and {MAX_PVT_PRESSURES} points")
+    if not np.all(np.isfinite(grid)) or grid[0] <= 0:
+        raise ValueError("Pressures must be positive and finite")
+    return grid
+
+
+def _pvt_tables(fluids: List[PVTFluid], grid: np.ndarray) -> List[dict]:
+    """Compute the PVT table of every fluid in one vectorized pass."""
+    columns = {
+        name: np.array([getattr(fluid, name) for fluid in fluids], dtype=float)
+        for name in ("gas_oil_ratio", "gas_gravity", "oil_gravity", "temperature")
+    }
+    errors = RowErrors(len(fluids))
+    _check_pvt_inputs(errors, columns)
+    errors.flag(columns["gas_oil_ratio"] <= 0, "gas_oil_ratio must be positive")
+    table = reservoir_kernels.pvt_table(
+        columns["gas_oil_ratio"],
+        columns["gas_gravity"],
+        columns["oil_gravity"],
+        columns["temperature"],
+        grid
+    )
+    errors.flag(table["bubble_point_pressure"] <= 0, "bubble point pressure is not positive for this fluid")
+    finite = np.ones(len(fluids), dtype=bool)
+    for name in ("solution_gor", "oil_fvf", "oil_viscosity"):
+        finite &= np.all(np.isfinite(table[name]), axis=1)
+    errors.flag(~finite, "calculation produced a non-finite result")
+    results = []
+    for i in range(len(fluids)):
+        if not errors.valid[i]:
+            results.append({"error": errors.messages[i]})
+            continue
+        results.append({
+            "bubble_point_pressure": float(table["bubble_point_pressure"][i]),
+            **{name: table[name][i].tolist()
+               for name in ("pressure", "solution_gor", "oil_fvf", "oil_viscosity", "saturated")}
+        })
+    return results
+
+
+def _pvt_csv(fluids: List[PVTFluid], tables: List[dict]) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow([
+        "fluid", "name", "pressure_psia", "solution_gor_scf_per_stb", "oil_fvf_rb_per_stb", "oil_viscosity_cp",
+        "saturated"
+    ])
+    for index, (fluid, table) in enumerate(zip(fluids, tables), start=1):
+        for row in zip(table["pressure"], table["solution_gor"], table["oil_fvf"], table["oil_viscosity"],
+                       table["saturated"]):
+            writer.writerow([index, fluid.name or "", *(f"{value:.6g}" for value in row[:4]), int(row[4])])
+    return out.getvalue()
+
+
+def _pvto(fluids: List[PVTFluid], tables: List[dict]) -> str:
+    """
+    Write the tables as an ECLIPSE-style ``PVTO`` keyword in FIELD units.
+
+    Every fluid becomes one table (PVT region). Each saturated pressure is
+    a record; the record at the bubble point carries the undersaturated
+    points, so the grid should extend above the highest bubble point.
+    """
+    lines = [
+        "-- Live oil PVT tables generated by PetroCalc Web (FIELD units)",
+        "PVTO",
+        "--      Rs        Pbub          Bo          Vo",
+        "-- Mscf/stb       psia      rb/stb          cp",
+    ]
+    for index, (fluid, table) in enumerate(zip(fluids, tables), start=1):
+        label = f" {fluid.name}" if fluid.name else ""
+        lines.append(f"-- Fluid {index}{label}: Pb = {table['bubble_point_pressure']:.2f} psia")
+        records = []
+        for rs, p, bo, mu, saturated in zip(table["solution_gor"], table["pressure"], table["oil_fvf"],
+                                           table["oil_viscosity"], table["saturated"]):
+            if saturated:
+                records.append([f"{rs / 1000:10.5f}  {p:10.2f}  {bo:10.5f}  {mu:10.5f}"])
+            else:
+                records[-1].append(f"{'':10}  {p:10.2f}  {bo:10.5f}  {mu:10.5f}")
+        for record in records:
+            lines.extend(record[:-1])
+            lines.append(record[-1] + " /")
+        lines.append("/")
+    return "\n".join(lines) + "\n"
+
+
+@router.post("/pvt-table")
+async def pvt_table(
+    request: PVTTableRequest,
+    output_format: str = Query("json", alias="format", pattern="^(json|csv|pvto)$")
+):
+    """
+    Generate black-oil PVT tables (Pb, Rs, Bo and oil viscosity against pressure) for many fluids.
+
+    Each fluid is defined by its solution gas-oil ratio at the bubble point,
+    gas and oil gravity and temperature. The grid is ``pressures`` or
+    ``steps`` points from ``min_pressure`` to ``max_pressure``; each fluid's
+    bubble point is added to it. All fluids are evaluated in one vectorized
+    pass and every table is cached per fluid definition and grid.
+
+    ``format=csv`` returns one row per fluid and pressure, ``format=pvto``
+    simulator-ready ``PVTO`` text.
+    """
+    if len(request.fluids) > config.batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Request has {len(request.fluids)} fluids; the limit is {config.batch_max_items}"
+        )
+    try:
+        grid = _pressure_grid(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def compute(fluids: List[PVTFluid]) -> List[dict]:
+        return await run_calculation(_pvt_tables, fluids, grid)
+
+    tables = await cached_items(
+        "reservoir.pvt_table", request.fluids, compute,
+        context=json.dumps(grid.tolist()), exclude={"name"}
+    )
+
+    if output_format != "json":
+        failed = [f"fluid {index}: {table['error']}" for index, table in enumerate(tables, start=1) if "error" in table]
+        if failed:
+            raise HTTPException(status_code=400, detail="; ".join(failed))
+        if output_format == "csv":
+            return Response(_pvt_csv(request.fluids, tables), media_type=CSV_MEDIA_TYPE,
+                             headers={"Content-Disposition": 'attachment; filename="pvt_table.csv"'})
+        return Response(_pvto(request.fluids, tables), media_type="text/plain; charset=utf-8",
+                        headers={"Content-Disposition": 'attachment; filename="pvt_table.inc"'})
+
+    # Tables are large and already JSON-ready, so skip the generic encoder
+    return Response(encode({
+        "fluids": [{**fluid.model_dump(), **table} for fluid, table in zip(request.fluids, tables)],
+        "invalid_fluids": sum(1 for table in tables if "error" in table),
+        "units": PVT_UNITS
+    }), media_type="application/json")
+
+
+def _decline_time_grid(request: DeclineForecastRequest) -> np.ndarray:
+    """The requested forecast times: ``time`` or ``periods`` steps of ``time_step`` from zero."""
+    if request.time is not None:
+        grid = np.asarray(request.time, dtype=float)
+    else:
+        if request.time_step <= 0 or request.periods < 1:
+            raise ValueError("time_step and periods must be positive")
+        grid = np.arange(request.periods + 1) * request.time_step
+    if grid.size == 0 or grid.size > MAX_DECLINE_TIMES:
+        raise ValueError(f"The time grid must have between 1 and {MAX_DECLINE_TIMES} points")
+    if not np.all(np.isfinite(grid)) or grid[0] < 0 or np.any(np.diff(grid) <= 0):
+        raise ValueError("Times must be finite, non-negative and increasing")
+    return grid
+
+
+def _decline_chunk(columns: Dict[str, np.ndarray], valid: np.ndarray, time: np.ndarray, quantity: str) -> bytes:
+    """One chunk of forecast rows as comma-separated JSON arrays, ``null`` for invalid wells."""
+    values = reservoir_kernels.arps_forecast(
+        *(columns[name] for name in DECLINE_WELL_COLUMNS), time, quantities=(quantity,)
+    )[quantity]
+    return encode([row.tolist() if ok else None for row, ok in zip(values, valid)])[1:-1]
+
+
+def _decline_csv_chunk(columns: Dict[str, np.ndarray], first_well: int, time: np.ndarray) -> bytes:
+    """One chunk of forecast rows as CSV: well, time, rate, cumulative."""
+    forecast = reservoir_kernels.arps_forecast(*(columns[name] for name in DECLINE_WELL_COLUMNS), time)
+    n_wells, n_times = forecast["rate"].shape
+    rows = zip(np.repeat(np.arange(first_well, first_well + n_wells), n_times).tolist(),
+               np.tile(time, n_wells).tolist(), forecast["rate"].ravel().tolist(),
+               forecast["cumulative"].ravel().tolist())
+    # Encoding the rows as JSON arrays and swapping the brackets for line breaks
+    # is several times faster than formatting them with the csv module or savetxt
+    return encode(list(rows))[2:-2].replace(b"],[", b"\n") + b"\n"
+
+
+async def _stream_decline_forecast(header: dict, columns: Dict[str, np.ndarray], valid: np.ndarray,
+                                   time: np.ndarray, output_format: str) -> AsyncIterator[bytes]:
+    """Compute the forecast in chunks of wells and write each chunk as soon as it is ready."""
+    n_wells = len(valid)
+    chunks = [(start, {name: array[start:start + DECLINE_CHUNK_WELLS] for name, array in columns.items()})
+              for start in range(0, n_wells, DECLINE_CHUNK_WELLS)]
+    if output_format == "csv":
+        yield b"well,time,rate,cumulative\n"
+        for start, chunk in chunks:
+            yield await run_calculation(_decline_csv_chunk, chunk, start, time)
+        return
+
+    # Columnar JSON: the per-well columns first, then the rate rows, then the cumulative rows
+    yield encode(header)[:-1]
+    for quantity in ("rate", "cumulative"):
+        yield f',"{quantity}":['.encode()
+        for start, chunk in chunks:
+            body = await run_calculation(
+                _decline_chunk, chunk, valid[start:start + DECLINE_CHUNK_WELLS], time, quantity
+            )
+            yield (b"," if start else b"") + body
+        yield b"]"
+    yield b"}"
+
+
+@router.post("/decline-forecast")
+async def decline_forecast(
+    request: DeclineForecastRequest,
+    output_format: str = Query("json", alias="format", pattern="^(json|csv)$")
+):
+    """
+    Forecast the rate and cumulative production of many wells with Arps decline curves.
+
+    Well parameters are columns (scalars are broadcast): initial rate,
+    initial nominal decline rate (per unit of time), decline exponent ``b``
+    (0 exponential, 1 harmonic, anything else hyperbolic) and an optional
+    terminal decline rate at which hyperbolic wells switch to exponential
+    decline. The forecast covers ``time`` or ``periods`` steps of
+    ``time_step`` from zero.
+
+    The response is streamed in chunks of wells: as columnar JSON with one
+    ``rate`` and one ``cumulative`` row per well (null for invalid wells),
+    or with ``format=csv`` as rows of well, time, rate and cumulative.
+    """
+    try:
+        columns, n_wells = broadcast_columns(request.model_dump(include=set(DECLINE_WELL_COLUMNS)))
+        time = _decline_time_grid(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if n_wells > MAX_DECLINE_WELLS:
+        raise HTTPException(status_code=400, detail=f"Request has {n_wells} wells; the limit is {MAX_DECLINE_WELLS}")
+
+    errors = RowErrors(n_wells)
+    errors.check_finite(columns)
+    errors.flag(columns["initial_rate"] < 0, "initial_rate must not be negative")
+    errors.flag(columns["initial_decline_rate"] < 0, "initial_decline_rate must not be negative")
+    errors.flag(columns["decline_exponent"] < 0, "decline_exponent must not be negative")
+    errors.flag(columns["terminal_decline_rate"] < 0, "terminal_decline_rate must not be negative")
+    if output_format == "csv" and errors.invalid_count:
+        failed = np.flatnonzero(~errors.valid)
+        raise HTTPException(
+            status_code=400,
+            detail="; ".join(f"well {index}: {errors.messages[index]}" for index in failed[:10])
+        )
+
+    parameters = [columns[name] for name in DECLINE_WELL_COLUMNS]
+    switch = reservoir_kernels.terminal_switch_time(*parameters[1:])
+    ultimate = reservoir_kernels.arps_forecast(*parameters, time[-1:], quantities=("cumulative",))["cumulative"][:, 0]
+    b = columns["decline_exponent"]
+    decline_type = np.where(
+        np.abs(b) < reservoir_kernels.DECLINE_EXPONENT_TOLERANCE, "exponential",
+        np.where(np.abs(b - 1) < reservoir_kernels.DECLINE_EXPONENT_TOLERANCE, "harmonic", "hyperbolic")
+    )
+    header = {
+        "wells": n_wells,
+        "invalid_wells": errors.invalid_count,
+        "time": time.tolist(),
+        "decline_type": [kind if ok else None for kind, ok in zip(decline_type.tolist(), errors.valid)],
+        "terminal_switch_time": to_column(switch, errors.valid & np.isfinite(switch)),
+        "cumulative_at_end": to_column(ultimate, errors.valid),
+        "valid": errors.valid.tolist(),
+        "error": errors.messages.tolist()
+    }
+    if output_format == "csv":
+        return StreamingResponse(
+            _stream_decline_forecast(header, columns, errors.valid, time, "csv"), media_type=CSV_MEDIA_TYPE,
+            headers={"Content-Disposition": 'attachment; filename="decline_forecast.csv"'}
+        )
+    return StreamingResponse(
+        _stream_decline_forecast(header, columns, errors.valid, time, "json"), media_type="application/json"
+    )
@@ -2,17 +2,48 @@
 Rock properties calculations API endpoints.
 """
 
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
 from pydantic import BaseModel
 
-# Import petrocalc from pip-installed package
+from app import las
+from app.kernels import rock_properties as rock_kernels
+from app.lazy import lazy_import
+
+# Import petrocalc from pip-installed package (loaded on first use)
 try:
-    from petrocalc import rock_properties
+    rock_properties = lazy_import("petrocalc.rock_properties")
 except ImportError:
     raise ImportError("petrocalc package not found. Please install it using: pip install petrocalc")
 
+from app.cache import cached
+from app.executor import run_calculation
+from app.responses import encode
+from app.streaming import CSV_MEDIA_TYPE, upload_chunks
+
 router = APIRouter()
 
+# Log curve mnemonics recognised for each /log_evaluation input, in order of preference
+CURVE_ALIASES = {
+    "density": ("RHOB", "RHOZ", "ZDEN", "DEN", "RHO"),
+    "neutron": ("NPHI", "TNPH", "NPOR", "CNL", "NEU"),
+    "resistivity": ("RT", "ILD", "LLD", "RDEP", "AT90", "RD", "RES"),
+    "gamma_ray": ("GR", "GRC", "SGR", "CGR"),
+    "shale_volume": ("VSH", "VSHALE", "VCL"),
+}
+# Output curves of /log_evaluation: result key, mnemonic, unit and description
+LOG_OUTPUT_CURVES = (
+    ("shale_volume", "VSH", "V/V", "Shale volume"),
+    ("porosity", "PHIE", "V/V", "Effective porosity"),
+    ("water_saturation", "SW", "V/V", "Archie water saturation"),
+    ("permeability", "PERM", "MD", "Timur permeability"),
+    ("bulk_volume_oil", "BVO", "V/V", "Bulk volume oil"),
+    ("pay", "PAY", "", "Net pay flag"),
+)
+
 
 # Request Models
 class PorosityFromLogsRequest(BaseModel):
@@ -94,6 +125,28 @@ class BulkVolumeOilRequest(BaseModel):
     oil_saturation: float
 
 
+class LogEvaluationParams(BaseModel):
+    water_resistivity: float
+    matrix_density: float = 2.65
+    fluid_density: float = 1.0
+    cementation_factor: float = 2.0
+    saturation_exponent: float = 2.0
+    tortuosity_factor: float = 1.0
+    gamma_ray_clean: Optional[float] = None
+    gamma_ray_shale: Optional[float] = None
+    irreducible_water_saturation: Optional[float] = None
+    porosity_cutoff: float = 0.08
+    water_saturation_cutoff: float = 0.5
+    shale_volume_cutoff: float = 0.4
+    depth_curve: Optional[str] = None
+    density_curve: Optional[str] = None
+    neutron_curve: Optional[str] = None
+    resistivity_curve: Optional[str] = None
+    gamma_ray_curve: Optional[str] = None
+    shale_volume_curve: Optional[str] = None
+    output_format: str = Query("las", alias="format", pattern="^(las|csv|json)$")
+
+
 class HydrocarbonPoreVolumeRequest(BaseModel):
     bulk_volume: float
     porosity: float
@@ -102,10 +155,12 @@ class HydrocarbonPoreVolumeRequest(BaseModel):
 
 # API Endpoints
 @router.post("/porosity_from_logs")
+@cached
 async def calculate_porosity_from_logs(request: PorosityFromLogsRequest):
     """Calculate effective porosity from neutron and density logs."""
     try:
-        result = rock_properties.porosity_from_logs(
+        result = await run_calculation(
+            rock_properties.porosity_from_logs,
             request.neutron_porosity,
             request.density_porosity,
             request.shale_volume
@@ -116,15 +171,19 @@ async def calculate_porosity_from_logs(request: PorosityFromLogsRequest):
             "density_porosity_fraction": request.density_porosity,
             "shale_volume_fraction": request.shale_volume
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/porosity_from_density_log")
+@cached
 async def calculate_porosity_from_density_log(request: PorosityFromDensityLogRequest):
     """Calculate porosity from density log using standard formula."""
     try:
-        result = rock_properties.porosity_from_density_log(
+        result = await run_calculation(
+            rock_properties.porosity_from_density_log,
             request.bulk_density,
             request.matrix_density,
             request.fluid_density
@@ -135,15 +194,19 @@ async def calculate_porosity_from_density_log(request: PorosityFromDensityLogReq
             "matrix_density_g_per_cm3": request.matrix_density,
             "fluid_density_g_per_cm3": request.fluid_density
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/water_saturation_archie")
+@cached
 async def calculate_water_saturation_archie(request: WaterSaturationArchieRequest):
     """Calculate water saturation using Archie's equation."""
     try:
-        result = rock_properties.water_saturation_archie(
+        result = await run_calculation(
+            rock_properties.water_saturation_archie,
             request.formation_resistivity,
             request.water_resistivity,
             request.porosity,
@@ -160,15 +223,19 @@ async def calculate_water_saturation_archie(request: WaterSaturationArchieReques
             "saturation_exponent": request.saturation_exponent,
             "tortuosity_factor": request.tortuosity_factor
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/permeability_from_porosity_kozeny_carman")
+@cached
 async def calculate_permeability_kozeny_carman(request: PermeabilityFromPorosityKozenyCarmanRequest):
     """Calculate permeability using Kozeny-Carman equation."""
     try:
-        result = rock_properties.permeability_from_porosity_kozeny_carman(
+        result = await run_calculation(
+            rock_properties.permeability_from_porosity_kozeny_carman,
             request.porosity,
             request.grain_diameter,
             request.shape_factor
@@ -179,15 +246,19 @@ async def calculate_permeability_kozeny_carman(request: PermeabilityFromPorosity
             "grain_diameter_mm": request.grain_diameter,
             "shape_factor": request.shape_factor
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/permeability_timur_correlation")
+@cached
 async def calculate_permeability_timur(request: PermeabilityTimurCorrelationRequest):
     """Calculate permeability using Timur correlation."""
     try:
-        result = rock_properties.permeability_timur_correlation(
+        result = await run_calculation(
+            rock_properties.permeability_timur_correlation,
             request.porosity,
             request.irreducible_water_saturation
         )
@@ -196,15 +267,19 @@ async def calculate_permeability_timur(request: PermeabilityTimurCorrelationRequ
             "porosity_fraction": request.porosity,
             "irreducible_water_saturation_fraction": request.irreducible_water_saturation
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/rock_compressibility")
+@cached
 async def calculate_rock_compressibility(request: RockCompressibilityRequest):
     """Calculate rock compressibility."""
     try:
-        result = rock_properties.rock_compressibility(
+        result = await run_calculation(
+            rock_properties.rock_compressibility,
             request.porosity,
             request.pressure,
             request.compressibility_coefficient
@@ -215,15 +290,19 @@ async def calculate_rock_compressibility(request: RockCompressibilityRequest):
             "pressure_psia": request.pressure,
             "compressibility_coefficient_per_psi": request.compressibility_coefficient
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/relative_permeability_oil_corey")
+@cached
 async def calculate_relative_permeability_oil_corey(request: RelativePermeabilityOilCoreyRequest):
     """Calculate oil relative permeability using Corey correlation."""
     try:
-        result = rock_properties.relative_permeability_oil_corey(
+        result = await run_calculation(
+            rock_properties.relative_permeability_oil_corey,
             request.water_saturation,
             request.irreducible_water_saturation,
             request.residual_oil_saturation,
@@ -238,15 +317,19 @@ async def calculate_relative_permeability_oil_corey(request: RelativePermeabilit
             "oil_endpoint": request.oil_endpoint,
             "oil_exponent": request.oil_exponent
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/relative_permeability_water_corey")
+@cached
 async def calculate_relative_permeability_water_corey(request: RelativePermeabilityWaterCoreyRequest):
     """Calculate water relative permeability using Corey correlation."""
     try:
-        result = rock_properties.relative_permeability_water_corey(
+        result = await run_calculation(
+            rock_properties.relative_permeability_water_corey,
             request.water_saturation,
             request.irreducible_water_saturation,
             request.residual_oil_saturation,
@@ -261,15 +344,19 @@ async def calculate_relative_permeability_water_corey(request: RelativePermeabil
             "water_endpoint": request.water_endpoint,
             "water_exponent": request.water_exponent
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/capillary_pressure_brooks_corey")
+@cached
 async def calculate_capillary_pressure_brooks_corey(request: CapillaryPressureBrooksCoreyRequest):
     """Calculate capillary pressure using Brooks-Corey correlation."""
     try:
-        result = rock_properties.capillary_pressure_brooks_corey(
+        result = await run_calculation(
+            rock_properties.capillary_pressure_brooks_corey,
             request.water_saturation,
             request.irreducible_water_saturation,
             request.entry_pressure,
@@ -282,15 +369,19 @@ async def calculate_capillary_pressure_brooks_corey(request: CapillaryPressureBr
             "entry_pressure_psi": request.entry_pressure,
             "pore_size_distribution_index": request.pore_size_distribution
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/formation_factor")
+@cached
 async def calculate_formation_factor(request: FormationFactorRequest):
     """Calculate formation resistivity factor."""
     try:
-        result = rock_properties.formation_factor(
+        result = await run_calculation(
+            rock_properties.formation_factor,
             request.porosity,
             request.cementation_factor,
             request.tortuosity_factor
@@ -301,15 +392,19 @@ async def calculate_formation_factor(request: FormationFactorRequest):
             "cementation_factor": request.cementation_factor,
             "tortuosity_factor": request.tortuosity_factor
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/net_to_gross_ratio")
+@cached
 async def calculate_net_to_gross_ratio(request: NetToGrossRatioRequest):
     """Calculate net-to-gross ratio."""
     try:
-        result = rock_properties.net_to_gross_ratio(
+        result = await run_calculation(
+            rock_properties.net_to_gross_ratio,
             request.net_thickness,
             request.gross_thickness
         )
@@ -318,15 +413,19 @@ async def calculate_net_to_gross_ratio(request: NetToGrossRatioRequest):
             "net_thickness_ft": request.net_thickness,
             "gross_thickness_ft": request.gross_thickness
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/bulk_volume_oil")
+@cached
 async def calculate_bulk_volume_oil(request: BulkVolumeOilRequest):
     """Calculate bulk volume of oil in reservoir."""
     try:
-        result = rock_properties.bulk_volume_oil(
+        result = await run_calculation(
+            rock_properties.bulk_volume_oil,
             request.gross_rock_volume,
             request.net_to_gross,
             request.porosity,
@@ -339,15 +438,19 @@ async def calculate_bulk_volume_oil(request: BulkVolumeOilRequest):
             "porosity_fraction": request.porosity,
             "oil_saturation_fraction": request.oil_saturation
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/hydrocarbon_pore_volume")
+@cached
 async def calculate_hydrocarbon_pore_volume(request: HydrocarbonPoreVolumeRequest):
     """Calculate hydrocarbon pore volume."""
     try:
-        result = rock_properties.hydrocarbon_pore_volume(
+        result = await run_calculation(
+            rock_properties.hydrocarbon_pore_volume,
             request.bulk_volume,
             request.porosity,
             request.hydrocarbon_saturation
@@ -358,5 +461,134 @@ async def calculate_hydrocarbon_pore_volume(request: HydrocarbonPoreVolumeReques
             "porosity_fraction": request.porosity,
             "hydrocarbon_saturation_fraction": request.hydrocarbon_saturation
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _map_curves(header: las.LasHeader, params: LogEvaluationParams) -> dict:
+    """Column index of each log input: the named curve, else the first known alias present."""
+    mapping = {}
+    for name, aliases in (("depth", ()), *CURVE_ALIASES.items()):
+        chosen = getattr(params, f"{name}_curve")
+        index = header.find_curve([chosen] if chosen else aliases)
+        if chosen and index is None:
+            raise HTTPException(status_code=400, detail=f"The file has no curve named {chosen}")
+        if index is not None:
+            mapping[name] = index
+    mapping.setdefault("depth", 0)
+    if "resistivity" not in mapping:
+        raise HTTPException(status_code=400, detail="The file needs a resistivity curve (or set resistivity_curve)")
+    if "density" not in mapping and "neutron" not in mapping:
+        raise HTTPException(status_code=400, detail="The file needs a density or neutron porosity curve")
+    return mapping
+
+
+@router.post("/log_evaluation")
+async def evaluate_las_log(request: Request, params: LogEvaluationParams = Depends()):
+    """
+    Evaluate a LAS 2.0 log: porosity, water saturation, permeability, bulk volume oil and net pay.
+
+    The body is the LAS file, raw or as a multipart form with a ``file``
+    field. Input curves are found by their usual mnemonics (``RHOB``,
+    ``NPHI``, ``RT``/``ILD``, ``GR``, ``VSH``...) or named with the
+    ``*_curve`` parameters; the first curve is the depth unless
+    ``depth_curve`` says otherwise. The data section is parsed and evaluated
+    in blocks as it arrives: shale volume from a VSH curve or the linear
+    gamma-ray index, shale-corrected neutron-density porosity, Archie water
+    saturation, Timur permeability, bulk volume oil and a pay flag from the
+    three cutoffs. Net pay and pay averages integrate over depth.
+
+    The computed curves come back as a LAS file with the summary in its
+    parameter section, as CSV (``format=csv``) or as JSON (``format=json``).
+    """
+    try:
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("file")
+            if upload is None or isinstance(upload, str):
+                await form.close()
+                raise HTTPException(status_code=400, detail="Multipart uploads must include a 'file' field")
+            chunks = upload_chunks(form, upload)
+        else:
+            chunks = request.stream()
+
+        reader = las.LasReader(chunks)
+        header = await reader.read_header()
+        mapping = _map_curves(header, params)
+        # Neutron porosity logged in porosity units is converted to a fraction
+        neutron_scale = 0.01 if "neutron" in mapping and \
+            header.curves[mapping["neutron"]].unit.upper() in ("PU", "%", "P.U.") else 1.0
+        settings = params.model_dump(include={
+            "matrix_density", "fluid_density", "water_resistivity", "cementation_factor", "saturation_exponent",
+            "tortuosity_factor", "gamma_ray_clean", "gamma_ray_shale", "irreducible_water_saturation",
+            "porosity_cutoff", "water_saturation_cutoff", "shale_volume_cutoff"
+        })
+
+        summary = rock_kernels.PaySummary()
+        blocks = []
+        async for rows in reader.blocks():
+            curves = {name: rows[:, index] for name, index in mapping.items() if name != "depth"}
+            if "neutron" in curves:
+                curves["neutron"] = curves["neutron"] * neutron_scale
+            result = await run_calculation(rock_kernels.evaluate_log, curves, **settings)
+            depth = rows[:, mapping["depth"]]
+            summary.add(depth, result)
+            blocks.append(np.column_stack([depth] + [result[key] for key, *_ in LOG_OUTPUT_CURVES]))
+        if not blocks:
+            raise HTTPException(status_code=400, detail="The ~A section has no samples")
+        data = np.concatenate(blocks)
+        totals = summary.result()
+        depth_item = header.curves[mapping["depth"]]
+        used = {name: header.curves[index].mnemonic for name, index in mapping.items()}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+    if params.output_format == "json":
+        return Response(encode({
+            "samples": summary.samples,
+            "curves_used": used,
+            "depth_unit": depth_item.unit,
+            "summary": totals,
+            "depth": data[:, 0].tolist(),
+            **{key: data[:, i + 1].tolist() for i, (key, *_) in enumerate(LOG_OUTPUT_CURVES)},
+            "water_resistivity_ohm_m": params.water_resistivity
+        }), media_type="application/json")
+
+    if params.output_format == "csv":
+        names = ["depth"] + [key for key, *_ in LOG_OUTPUT_CURVES]
+        values = data.astype(object)
+        values[~np.isfinite(data)] = None
+        # JSON rows with the brackets swapped for line breaks; null values become empty cells
+        rows = encode(values.tolist())[2:-2].replace(b"],[", b"\n").replace(b"null", b"")
+        body = ",".join(names).encode() + b"\n" + rows + b"\n"
+        return Response(body, media_type=CSV_MEDIA_TYPE,
+                        headers={"Content-Disposition": 'attachment; filename="log_evaluation.csv"'})
+
+    unit = depth_item.unit
+    curves = [las.LasItem(depth_item.mnemonic, unit, "", depth_item.description or "Depth")]
+    curves += [las.LasItem(mnemonic, curve_unit, "", description)
+               for _, mnemonic, curve_unit, description in LOG_OUTPUT_CURVES]
+    parameters = [
+        las.LasItem("RW", "OHMM", f"{params.water_resistivity:g}", "Formation water resistivity"),
+        las.LasItem("A", "", f"{params.tortuosity_factor:g}", "Tortuosity factor"),
+        las.LasItem("M", "", f"{params.cementation_factor:g}", "Cementation exponent"),
+        las.LasItem("N", "", f"{params.saturation_exponent:g}", "Saturation exponent"),
+        las.LasItem("RHOMA", "G/C3", f"{params.matrix_density:g}", "Matrix density"),
+        las.LasItem("RHOF", "G/C3", f"{params.fluid_density:g}", "Fluid density"),
+        las.LasItem("PHICUT", "V/V", f"{params.porosity_cutoff:g}", "Porosity cutoff"),
+        las.LasItem("SWCUT", "V/V", f"{params.water_saturation_cutoff:g}", "Water saturation cutoff"),
+        las.LasItem("VSHCUT", "V/V", f"{params.shale_volume_cutoff:g}", "Shale volume cutoff"),
+        las.LasItem("GROSS", unit, f"{totals['gross_thickness']:.4f}", "Gross thickness"),
+        las.LasItem("NETPAY", unit, f"{totals['net_pay']:.4f}", "Net pay"),
+        las.LasItem("NTG", "V/V", f"{totals['net_to_gross']:.4f}", "Net to gross"),
+        las.LasItem("PHIAVG", "V/V", f"{totals['average_porosity']:.4f}", "Average porosity in pay"),
+        las.LasItem("SWAVG", "V/V", f"{totals['average_water_saturation']:.4f}", "Average water saturation in pay"),
+        las.LasItem("HCOL", unit, f"{totals['hydrocarbon_column']:.4f}", "Hydrocarbon column in pay"),
+    ]
+    return Response(las.write_las(header, curves, data, parameters), media_type="text/plain; charset=utf-8",
+                    headers={"Content-Disposition": 'attachment; filename="log_evaluation.las"'})
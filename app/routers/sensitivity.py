@@ -0,0 +1,215 @@
+"""
+Sensitivity (tornado) analysis API endpoint.
+
+Perturbs the inputs of any calculation endpoint one at a time, and
+optionally in pairs, around a base case, evaluating every case as one
+concurrent batch, and ranks the inputs by the swing they cause in an output.
+"""
+
+import itertools
+import math
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel
+
+from app import dispatch
+from app.config import get_config
+from app.executor import gather_bounded
+
+router = APIRouter()
+config = get_config()
+
+
+# Request Models
+class SensitivityRange(BaseModel):
+    low: Optional[float] = None
+    high: Optional[float] = None
+    variation: Optional[float] = None
+
+
+class SensitivityRequest(BaseModel):
+    endpoint: str
+    base: Dict[str, Any] = {}
+    ranges: Dict[str, SensitivityRange] = {}
+    variation: float = 0.1
+    output: Optional[str] = None
+    pairwise: bool = False
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _input_ranges(request: SensitivityRequest, base: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+    """
+    Low and high value of each varied input.
+
+    Inputs without explicit bounds move by ``variation`` (a fraction of the
+    base value, from the range or the request). Without ``ranges`` every
+    numeric input of the base case is varied. Integer inputs stay integers.
+    """
+    specs = request.ranges or {name: SensitivityRange() for name, value in base.items() if _is_number(value)}
+    ranges = {}
+    for name, spec in specs.items():
+        if name not in base:
+            raise HTTPException(status_code=400, detail=f"{name} is not an input of {request.endpoint}")
+        value = base[name]
+        variation = spec.variation if spec.variation is not None else request.variation
+        if (spec.low is None or spec.high is None) and not _is_number(value):
+            raise HTTPException(status_code=400, detail=f"{name} has no numeric base value; give low and high")
+        low = spec.low if spec.low is not None else value * (1 - variation)
+        high = spec.high if spec.high is not None else value * (1 + variation)
+        if isinstance(value, int) and not isinstance(value, bool):
+            low, high = round(low), round(high)
+        if low == high:
+            if request.ranges:
+                raise HTTPException(status_code=400, detail=f"{name}: low and high are equal")
+            continue
+        ranges[name] = (low, high)
+    if not ranges:
+        raise HTTPException(status_code=400, detail="No inputs to vary; give ranges")
+    return ranges
+
+
+def _elasticity(output_change: float, base_output: float, input_change: float, base_input: float) -> Optional[float]:
+    """Relative output change over relative input change; None where either base is zero."""
+    if not base_output or not base_input or not input_change:
+        return None
+    return (output_change / base_output) / (input_change / base_input)
+
+
+async def _evaluate(route: dispatch.CalculationRoute, payload: Dict[str, Any], output: Optional[str]) -> dict:
+    """Run one case, returning its output or its error."""
+    try:
+        result = await dispatch.call(route, dispatch.validate(route, payload), use_cache=False, slim=True)
+    except dispatch.DispatchError as e:
+        return {"status": e.status_code, "error": e.detail}
+    if output is None:
+        return {"status": 200, "result": result}
+    value = result.get(output) if isinstance(result, dict) else None
+    if not _is_number(value):
+        return {"status": 400, "error": f"{output} is not a numeric result"}
+    return {"status": 200, "value": float(value)}
+
+
+# API Endpoints
+@router.post("/sensitivity")
+async def run_sensitivity(request: SensitivityRequest, http_request: Request):
+    """
+    Rank the inputs of a calculation by their effect on one of its outputs.
+
+    ``endpoint`` names any calculation (as in ``/api/batch``) and ``base``
+    its base-case request. Each input in ``ranges`` is moved to its low and
+    high value with the others at base; with ``pairwise`` every pair of
+    inputs is also moved together to the four corners of their ranges. The
+    cases run through the calculation executor, uncached, at most one per
+    pool worker at a time.
+
+    ``output`` is the result field analysed, by default the first numeric
+    one. The tornado lists each input's outputs at its low and high value,
+    the swing between them and the elasticities (relative output change
+    over relative input change, at each end and across the range), largest
+    swing first. Pairwise results hold each pair's interaction: the part of
+    the joint effect not explained by the two one-at-a-time effects.
+    """
+    try:
+        route = dispatch.resolve(http_request.app, request.endpoint)
+    except dispatch.DispatchError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    try:
+        base = dispatch.validate(route, request.base).model_dump()
+    except dispatch.DispatchError as e:
+        raise HTTPException(status_code=e.status_code, detail={"base": e.detail})
+    ranges = _input_ranges(request, base)
+    names = list(ranges)
+    pairs = list(itertools.combinations(names, 2)) if request.pairwise else []
+    n_cases = 1 + 2 * len(names) + 4 * len(pairs)
+    if n_cases > config.batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Analysis has {n_cases} cases; the limit is {config.batch_max_items}"
+        )
+
+    base_case = await _evaluate(route, base, None)
+    if base_case["status"] != 200:
+        raise HTTPException(status_code=400, detail={"base": base_case["error"]})
+    output = request.output
+    result = base_case["result"]
+    if output is None:
+        output = next((key for key, value in result.items() if _is_number(value)), None) \
+            if isinstance(result, dict) else None
+        if output is None:
+            raise HTTPException(status_code=400, detail=f"{request.endpoint} has no numeric result to analyse")
+    elif not isinstance(result, dict) or not _is_number(result.get(output)):
+        raise HTTPException(status_code=400, detail=f"{output} is not a numeric result of {request.endpoint}")
+    base_output = float(result[output])
+
+    # One-at-a-time cases (low, high per input), then the four corners of each pair
+    cases = []
+    for name in names:
+        cases.extend([{**base, name: ranges[name][0]}, {**base, name: ranges[name][1]}])
+    for first, second in pairs:
+        for i, j in itertools.product((0, 1), repeat=2):
+            cases.append({**base, first: ranges[first][i], second: ranges[second][j]})
+    outcomes = await gather_bounded(_evaluate(route, case, output) for case in cases)
+
+    tornado = []
+    for index, name in enumerate(names):
+        low, high = outcomes[2 * index], outcomes[2 * index + 1]
+        low_input, high_input = ranges[name]
+        bar = {"variable": name, "base_input": base[name], "low_input": low_input, "high_input": high_input}
+        if low["status"] != 200 or high["status"] != 200:
+            bar["error"] = low.get("error") if low["status"] != 200 else high.get("error")
+            bar.update({"output_at_low_input": low.get("value"), "output_at_high_input": high.get("value"),
+                        "swing": None})
+        else:
+            bar.update({
+                "output_at_low_input": low["value"],
+                "output_at_high_input": high["value"],
+                "swing": abs(high["value"] - low["value"]),
+                "elasticity": _elasticity(high["value"] - low["value"], base_output, high_input - low_input,
+                                          base[name]),
+                "elasticity_low": _elasticity(low["value"] - base_output, base_output, low_input - base[name],
+                                              base[name]),
+                "elasticity_high": _elasticity(high["value"] - base_output, base_output, high_input - base[name],
+                                               base[name]),
+            })
+        tornado.append(bar)
+    tornado.sort(key=lambda bar: -1.0 if bar["swing"] is None else bar["swing"], reverse=True)
+
+    interactions = []
+    offset = 2 * len(names)
+    for index, (first, second) in enumerate(pairs):
+        corners = outcomes[offset + 4 * index:offset + 4 * index + 4]
+        entry = {"variables": [first, second]}
+        if any(corner["status"] != 200 for corner in corners):
+            entry.update({"error": next(corner["error"] for corner in corners if corner["status"] != 200),
+                          "interaction": None})
+        else:
+            low_low, low_high, high_low, high_high = (corner["value"] for corner in corners)
+            entry.update({
+                "output_low_low": low_low,
+                "output_low_high": low_high,
+                "output_high_low": high_low,
+                "output_high_high": high_high,
+                "interaction": (high_high - high_low - low_high + low_low) / 4,
+            })
+        interactions.append(entry)
+    interactions.sort(key=lambda entry: -1.0 if entry["interaction"] is None else abs(entry["interaction"]),
+                      reverse=True)
+
+    failed = sum(1 for outcome in outcomes if outcome["status"] != 200)
+    return {
+        "endpoint": route.path,
+        "output": output,
+        "base_output": base_output,
+        "base": base,
+        "cases": n_cases,
+        "failed": failed,
+        "tornado": tornado,
+        "interactions": interactions,
+        "variation": request.variation,
+        "pairwise": request.pairwise
+    }
@@ -0,0 +1,212 @@
+"""
+Parameter sweep API endpoint.
+
+Evaluates a calculation over the Cartesian product of value ranges for
+several of its inputs and streams the points back as NDJSON or CSV, one
+chunk of points at a time.
+"""
+
+import asyncio
+import itertools
+import math
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app import dispatch
+from app.config import get_config
+from app.executor import gather_bounded, get_executor
+from app.streaming import RowWriter
+
+router = APIRouter()
+config = get_config()
+
+
+# Request Models
+class SweepAxis(BaseModel):
+    values: Optional[List[Any]] = None
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    points: Optional[int] = None
+    step: Optional[float] = None
+    scale: str = "linear"
+
+
+class SweepRequest(BaseModel):
+    endpoint: str
+    base: Dict[str, Any] = {}
+    inputs: Dict[str, SweepAxis]
+    progress: bool = False
+
+
+def _axis_values(name: str, axis: SweepAxis) -> List[Any]:
+    """
+    The values of one swept input.
+
+    An axis is a list of ``values``, or runs from ``start`` to ``stop``
+    (inclusive) over ``points`` values or every ``step``; ``scale="log"``
+    spaces the points geometrically.
+    """
+    if axis.values is not None:
+        if not axis.values:
+            raise HTTPException(status_code=400, detail=f"{name}: values is empty")
+        return axis.values
+    if axis.start is None or axis.stop is None or (axis.points is None) == (axis.step is None):
+        raise HTTPException(status_code=400, detail=f"{name}: give values, or start and stop with points or step")
+    if axis.scale not in ("linear", "log"):
+        raise HTTPException(status_code=400, detail=f"{name}: scale must be linear or log")
+    if axis.scale == "log" and (axis.start <= 0 or axis.stop <= 0):
+        raise HTTPException(status_code=400, detail=f"{name}: a log axis needs positive start and stop")
+    if axis.step is not None:
+        if axis.step <= 0 or axis.scale == "log":
+            raise HTTPException(status_code=400, detail=f"{name}: step must be positive on a linear axis")
+        points = int(math.floor(abs(axis.stop - axis.start) / axis.step + 1e-9)) + 1
+    else:
+        points = axis.points
+    if points < 1 or points > config.sweep_max_points:
+        raise HTTPException(status_code=400, detail=f"{name}: {points} points; the limit is {config.sweep_max_points}")
+    if points == 1:
+        return [axis.start]
+    if axis.step is not None:
+        direction = 1 if axis.stop >= axis.start else -1
+        return [axis.start + direction * i * axis.step for i in range(points)]
+    if axis.scale == "log":
+        low, high = math.log10(axis.start), math.log10(axis.stop)
+        return [10 ** (low + (high - low) * i / (points - 1)) for i in range(points - 1)] + [axis.stop]
+    width = (axis.stop - axis.start) / (points - 1)
+    return [axis.start + width * i for i in range(points - 1)] + [axis.stop]
+
+
+def _chunks(axes: Dict[str, List[Any]], chunk_rows: int) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+    """Generate the Cartesian product lazily (last input fastest) in numbered chunks of points."""
+    names = list(axes)
+    points = enumerate(dict(zip(names, values)) for values in itertools.product(*axes.values()))
+    while True:
+        chunk = list(itertools.islice(points, chunk_rows))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _evaluate(route: dispatch.CalculationRoute, base: Dict[str, Any], index: int,
+                    point: Dict[str, Any]) -> dict:
+    """Evaluate one point, returning a flat row of its inputs, status and results."""
+    try:
+        result = await dispatch.call(route, dispatch.validate(route, {**base, **point}), use_cache=False, slim=True)
+    except dispatch.DispatchError as e:
+        return {"row": index, "status": e.status_code, **point, "error": e.detail}
+    if not isinstance(result, dict):
+        result = {"result": result}
+    return {"row": index, "status": 200, **point, **result}
+
+
+async def _evaluate_chunk(route: dispatch.CalculationRoute, base: Dict[str, Any],
+                          chunk: List[Tuple[int, Dict[str, Any]]], slots: asyncio.Semaphore) -> List[dict]:
+    """
+    Evaluate a chunk of points into flat rows.
+
+    Endpoints generated by ``app.registry`` evaluate the whole chunk as
+    columns, like ``/api/bulk``; other endpoints take one call per point, at
+    most one per ``slots`` at a time, with expensive calls in the pool.
+    """
+    calculation = getattr(route.endpoint, "calculation", None)
+    if calculation is None:
+        return await gather_bounded((_evaluate(route, base, index, point) for index, point in chunk), semaphore=slots)
+    results = await calculation.evaluate_records(chunk[0][0], [{**base, **point} for _, point in chunk], slim=True)
+    return [
+        {"row": result.pop("row"), "status": result.pop("status"), **point, **result}
+        for result, (_, point) in zip(results, chunk)
+    ]
+
+
+async def _stream_sweep(route: dispatch.CalculationRoute, base: Dict[str, Any], axes: Dict[str, List[Any]],
+                        total: int, writer: RowWriter, progress: bool) -> AsyncIterator[str]:
+    """
+    Evaluate and serialize the sweep chunk by chunk.
+
+    The next chunk is evaluated while the current one is written, so at most
+    two chunks of points are held in memory; for per-point endpoints both
+    share one bound of ``max_workers`` points in flight.
+    """
+    chunks = _chunks(axes, config.bulk_chunk_rows)
+    slots = asyncio.Semaphore(get_executor().max_workers)
+    completed = failed = 0
+    pending = None
+    try:
+        chunk = next(chunks, None)
+        if chunk is not None:
+            pending = asyncio.ensure_future(_evaluate_chunk(route, base, chunk, slots))
+        while pending is not None:
+            rows = await pending
+            chunk = next(chunks, None)
+            pending = asyncio.ensure_future(_evaluate_chunk(route, base, chunk, slots)) if chunk is not None else None
+            completed += len(rows)
+            failed += sum(1 for row in rows if row["status"] != 200)
+            yield writer.write(rows)
+            if progress and writer.output_format == "ndjson":
+                yield writer.write([{"progress": {
+                    "completed": completed, "total": total, "failed": failed,
+                    "fraction": completed / total, "done": completed == total,
+                }}])
+        yield writer.close()
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+# API Endpoints
+@router.post("/sweep")
+async def run_sweep(
+    request: SweepRequest,
+    http_request: Request,
+    output_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$")
+):
+    """
+    Evaluate a calculation over every combination of values of several inputs.
+
+    ``endpoint`` names any calculation (as in ``/api/batch``), ``base``
+    holds its fixed inputs and ``inputs`` the swept ones, each a list of
+    ``values`` or a ``start``/``stop`` range with ``points`` (linear or
+    ``log`` spacing) or a ``step``. The Cartesian product is generated
+    lazily, last input fastest, and evaluated uncached in chunks of
+    ``PETROCALC_BULK_CHUNK_ROWS`` points: calculations declared in
+    ``app.registry`` as columns, as in ``/api/bulk``, others one point at a
+    time through the calculation executor with at most one point per pool
+    worker in flight.
+
+    Rows stream back as NDJSON (default) or CSV (``?format=csv``), each with
+    its point index (``row``), ``status``, the swept inputs and the slim
+    results; a failing point gets an ``error`` instead of failing the sweep.
+    The number of points is limited by ``PETROCALC_SWEEP_MAX_POINTS`` and
+    returned in the ``X-Sweep-Points`` header. With ``progress`` the NDJSON
+    stream also carries a ``{"progress": ...}`` line after each chunk.
+    """
+    try:
+        route = dispatch.resolve(http_request.app, request.endpoint)
+    except dispatch.DispatchError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    if not request.inputs:
+        raise HTTPException(status_code=400, detail="inputs needs at least one swept input")
+
+    axes = {name: _axis_values(name, axis) for name, axis in request.inputs.items()}
+    total = math.prod(len(values) for values in axes.values())
+    if total > config.sweep_max_points:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep has {total} points; the limit is {config.sweep_max_points}"
+        )
+    # Reject a bad base case up front rather than on every point
+    first = {name: values[0] for name, values in axes.items()}
+    try:
+        dispatch.validate(route, {**request.base, **first})
+    except dispatch.DispatchError as e:
+        raise HTTPException(status_code=e.status_code, detail={"base": e.detail})
+
+    writer = RowWriter(output_format, buffer_rows=config.bulk_chunk_rows)
+    return StreamingResponse(
+        _stream_sweep(route, request.base, axes, total, writer, request.progress),
+        media_type=writer.media_type,
+        headers={"X-Sweep-Points": str(total)}
+    )
@@ -0,0 +1,116 @@
+"""
+Production server for PetroCalc Web.
+
+The application, every calculation router, petrocalc and NumPy are imported
+once in a supervisor process, which then binds the listening socket and forks
+the uvicorn workers. Workers share the preloaded pages copy-on-write instead
+of importing everything again, and the supervisor restarts workers that die.
+"""
+
+import gc
+import importlib.util
+import os
+import signal
+import time
+from typing import Dict
+
+import uvicorn
+
+from app.config import get_config
+
+config = get_config()
+
+
+def preload():
+    """Import the app and everything it loads lazily, so workers inherit it."""
+    from app.main import app
+
+    routers = getattr(app.state, "calculation_routers", None)
+    if routers is not None:
+        routers.load_all()
+        import petrocalc  # noqa: F401
+    app.openapi()
+    # Keep the garbage collector from touching (and so copying) shared objects
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def _pick(module: str) -> str:
+    """Use an optional accelerated implementation when it is installed."""
+    if importlib.util.find_spec(module) is not None:
+        return module
+    print(f"⚠️  {module} not installed, using the default implementation")
+    return "auto"
+
+
+def build_server_config(app) -> uvicorn.Config:
+    return uvicorn.Config(
+        app,
+        host=config.server_host,
+        port=config.server_port,
+        loop=_pick("uvloop"),
+        http=_pick("httptools"),
+        backlog=config.server_backlog,
+        timeout_keep_alive=config.server_keep_alive,
+        access_log=config.server_access_log,
+        log_level="info",
+        proxy_headers=True,
+    )
+
+
+def _run_worker(server_config: uvicorn.Config, sockets) -> None:
+    # Default signal handling; uvicorn installs its own handlers in the worker
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    uvicorn.Server(server_config).run(sockets=sockets)
+
+
+def serve():
+    """Preload the app, fork ``PETROCALC_WORKERS`` workers and supervise them."""
+    app = preload() if config.server_preload else "app.main:app"
+    server_config = build_server_config(app)
+    sock = server_config.bind_socket()
+    workers: Dict[int, float] = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(server_config, [sock])
+            finally:
+                os._exit(0)
+        workers[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"🚀 Serving on http://{config.server_host}:{config.server_port} with {config.server_workers} workers")
+    for _ in range(config.server_workers):
+        spawn()
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = workers.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"⚠️  Worker {pid} exited with code {os.waitstatus_to_exitcode(status)}, restarting")
+        # Avoid a tight restart loop if workers die straight away
+        if time.monotonic() - started < 1:
+            time.sleep(1)
+        spawn()
+
+    sock.close()
@@ -0,0 +1,288 @@
+"""
+Helpers for streaming record files in and out of the API.
+
+Uploads are decoded incrementally into lines and records so memory use depends
+on the chunk size, not on the size of the file. Results are written back as
+NDJSON or CSV chunks through a streaming response.
+"""
+
+import asyncio
+import codecs
+import csv
+import io
+import json
+import tempfile
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.lazy import lazy_import
+
+# NumPy is only needed for numeric uploads; keep it out of start up
+np = lazy_import("numpy")
+
+CHUNK_BYTES = 64 * 1024
+MAX_LINE_BYTES = 1024 * 1024
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose body generator reads the request body as it goes.
+
+    ``StreamingResponse`` listens on ``receive`` for a disconnect while it
+    streams, which would swallow request body chunks. Here the generator
+    itself consumes ``receive`` (a disconnect surfaces as ``ClientDisconnect``).
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def spool_chunks(chunks: AsyncIterator[bytes], chunk_bytes: int = CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """
+    Re-yield a body stream through a temporary file that is filled concurrently.
+
+    Most HTTP/1.1 clients send the whole request body before reading the
+    response. If the body were read only as fast as results are written, a
+    large upload would stall once the response buffers fill. Spooling the
+    body to disk keeps memory flat while the upload runs at network speed;
+    processing is still paced by the client reading the response.
+    """
+    spool = tempfile.TemporaryFile()
+    written = 0
+    done = False
+    error: Optional[BaseException] = None
+    arrived = asyncio.Event()
+
+    async def fill():
+        nonlocal written, done, error
+        try:
+            async for chunk in chunks:
+                spool.seek(written)
+                spool.write(chunk)
+                written += len(chunk)
+                arrived.set()
+        except Exception as e:
+            error = e
+        finally:
+            done = True
+            arrived.set()
+
+    task = asyncio.create_task(fill())
+    position = 0
+    try:
+        while True:
+            if position < written:
+                spool.seek(position)
+                data = spool.read(min(chunk_bytes, written - position))
+                position += len(data)
+                yield data
+            elif done:
+                if error is not None:
+                    raise error
+                break
+            else:
+                arrived.clear()
+                await arrived.wait()
+    finally:
+        task.cancel()
+        spool.close()
+
+
+async def upload_chunks(form, upload, chunk_bytes: int = CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """Yield a spooled multipart upload in chunks, closing the form when done."""
+    try:
+        while True:
+            chunk = await upload.read(chunk_bytes)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        await form.close()
+
+
+async def iter_arrays(chunks: AsyncIterator[bytes], n_columns: int, input_format: str,
+                      dtype: str = "<f8") -> AsyncIterator["np.ndarray"]:
+    """
+    Decode a numeric table arriving in byte chunks into 2-D float arrays.
+
+    ``binary`` input is packed rows of ``n_columns`` values of ``dtype``;
+    ``csv`` input is comma-separated rows, optionally after a header row.
+    Each yielded array holds the complete rows of one chunk, so memory
+    depends on the chunk size, not on the size of the body.
+    """
+    pending = b""
+    row_bytes = n_columns * np.dtype(dtype).itemsize
+    header_checked = False
+    async for chunk in chunks:
+        pending += chunk
+        if input_format == "binary":
+            complete = len(pending) - len(pending) % row_bytes
+            block, pending = pending[:complete], pending[complete:]
+            if block:
+                yield np.frombuffer(block, dtype=dtype).astype(float).reshape(-1, n_columns)
+            continue
+        end = pending.rfind(b"\n") + 1
+        block, pending = pending[:end], pending[end:]
+        if not header_checked and block.strip():
+            block, header_checked = _skip_header(block), True
+        if block.strip():
+            yield _parse_csv_block(block, n_columns)
+    if input_format == "binary":
+        if pending:
+            raise ValueError(f"Body length is not a multiple of {row_bytes} bytes per row")
+    elif pending.strip():
+        if not header_checked:
+            pending = _skip_header(pending)
+        if pending.strip():
+            yield _parse_csv_block(pending, n_columns)
+
+
+def _skip_header(block: bytes) -> bytes:
+    """Drop the first non-blank line if it is not numeric."""
+    stripped = block.lstrip()
+    first, _, rest = stripped.partition(b"\n")
+    try:
+        [float(value) for value in first.split(b",")]
+    except ValueError:
+        return rest
+    return stripped
+
+
+def _parse_csv_block(block: bytes, n_columns: int) -> "np.ndarray":
+    try:
+        rows = np.loadtxt(io.StringIO(block.decode("utf-8")), delimiter=",", ndmin=2)
+    except ValueError as e:
+        raise ValueError(f"Invalid numeric CSV: {e}")
+    if rows.shape[1] != n_columns:
+        raise ValueError(f"Expected {n_columns} columns, found {rows.shape[1]}")
+    return rows
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 byte chunks into lines without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        if len(pending) > max_line_bytes:
+            raise ValueError(f"Line longer than {max_line_bytes} bytes")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_records(lines: AsyncIterator[str], input_format: str) -> AsyncIterator[Any]:
+    """
+    Parse CSV (header row first) or NDJSON lines into dict records.
+
+    Blank lines are skipped. Empty CSV cells are left out so that request
+    model defaults apply. A line that cannot be parsed yields the exception
+    in place of the record so callers can report it for that row.
+    """
+    header: Optional[List[str]] = None
+    async for line in lines:
+        if not line.strip():
+            continue
+        if input_format == "csv":
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            if len(values) != len(header):
+                yield ValueError(f"Expected {len(header)} columns, found {len(values)}")
+                continue
+            yield {name: value.strip() for name, value in zip(header, values) if value.strip() != ""}
+        else:
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield ValueError(f"Invalid JSON: {e}")
+                continue
+            yield record if isinstance(record, dict) else ValueError("Each line must be a JSON object")
+
+
+def detect_format(content_type: str, filename: str = "") -> str:
+    """Pick ``csv`` or ``ndjson`` from a content type or file name."""
+    content_type = content_type.lower()
+    filename = filename.lower()
+    if "csv" in content_type or filename.endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+def flatten(result: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Flatten nested result dicts into ``parent.child`` keys for CSV output."""
+    flat = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (list, tuple)):
+            flat[name] = json.dumps(value)
+        else:
+            flat[name] = value
+    return flat
+
+
+class RowWriter:
+    """Serialize result rows to NDJSON or CSV text chunks."""
+
+    def __init__(self, output_format: str, buffer_rows: int = 1000):
+        self.output_format = output_format
+        self.buffer_rows = buffer_rows
+        self.columns: Optional[List[str]] = None
+        self._pending: List[Dict[str, Any]] = []
+
+    @property
+    def media_type(self) -> str:
+        return CSV_MEDIA_TYPE if self.output_format == "csv" else NDJSON_MEDIA_TYPE
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> str:
+        """Serialize rows, returning the text that is ready to send."""
+        if self.output_format != "csv":
+            return "".join(json.dumps(row) + "\n" for row in rows)
+
+        out = io.StringIO()
+        for row in rows:
+            row = flatten(row)
+            if self.columns is None:
+                # CSV needs its header up front; hold rows back until a row
+                # with results shows the columns, or the buffer fills up
+                self._pending.append(row)
+                if "status" in row and row["status"] == 200 or len(self._pending) >= self.buffer_rows:
+                    self._write_header(out, row)
+                continue
+            self._write_rows(out, [row])
+        return out.getvalue()
+
+    def close(self) -> str:
+        """Flush rows still held back waiting for a header."""
+        if self.output_format != "csv" or self.columns is not None:
+            return ""
+        out = io.StringIO()
+        if self._pending:
+            self._write_header(out, self._pending[-1])
+        return out.getvalue()
+
+    def _write_header(self, out: io.StringIO, sample: Dict[str, Any]):
+        leading = ["row", "status"]
+        self.columns = leading + [key for key in sample if key not in leading and key != "error"] + ["error"]
+        csv.writer(out).writerow(self.columns)
+        pending, self._pending = self._pending, []
+        self._write_rows(out, pending)
+
+    def _write_rows(self, out: io.StringIO, rows: List[Dict[str, Any]]):
+        writer = csv.writer(out)
+        for row in rows:
+            writer.writerow(["" if row.get(column) is None else row.get(column) for column in self.columns])
@@ -0,0 +1,261 @@
+"""
+Adaptive-step wellbore pressure traverse.
+
+Marches along the measured depth of a well, from the wellhead down or from
+the bottomhole up, integrating the Beggs-Brill pressure gradient of
+``petrocalc.production`` with an embedded Heun-Euler pair: each step's error
+estimate decides whether it is accepted and how long the next step is.
+Black-oil properties come from the ``petrocalc.fluids`` and
+``petrocalc.reservoir`` correlations at the local pressure and temperature
+and are cached per fluid, pressure and temperature, so repeated traverses
+of the same fluid (up and down, or at several rates) reuse them. Deviated wells are
+described by a survey table; true vertical depth follows the minimum
+curvature method.
+"""
+
+import functools
+import math
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.lazy import lazy_import
+
+fluids = lazy_import("petrocalc.fluids")
+production = lazy_import("petrocalc.production")
+reservoir = lazy_import("petrocalc.reservoir")
+
+AIR_MOLECULAR_WEIGHT = 28.97
+WATER_DENSITY = 62.428  # lb/ft3
+
+# Properties are evaluated and cached at this pressure (psi) and temperature (°F) resolution
+PRESSURE_RESOLUTION = 0.5
+TEMPERATURE_RESOLUTION = 0.1
+PVT_CACHE_SIZE = 65536
+# Serializes PVT cache lookups so hit counting is exact across pool threads
+_pvt_lock = threading.Lock()
+
+# Profile columns and the traverse state they are read from
+PROFILE_COLUMNS = (
+    ("measured_depth_ft", "md"),
+    ("true_vertical_depth_ft", "tvd"),
+    ("inclination_degrees", "inclination"),
+    ("pressure_psia", "pressure"),
+    ("temperature_fahrenheit", "temperature"),
+    ("pressure_gradient_psi_per_ft", "gradient"),
+    ("liquid_holdup", "holdup"),
+    ("solution_gor_scf_per_stb", "solution_gor"),
+    ("oil_fvf_rb_per_stb", "oil_fvf"),
+    ("z_factor", "z_factor"),
+)
+
+
+class Survey:
+    """Well path from survey stations: measured depth (ft), inclination and azimuth (degrees)."""
+
+    def __init__(self, measured_depth: Sequence[float], inclination: Sequence[float],
+                 azimuth: Optional[Sequence[float]] = None):
+        md = np.asarray(measured_depth, dtype=float)
+        inc = np.radians(np.asarray(inclination, dtype=float))
+        azi = np.radians(np.asarray(azimuth if azimuth is not None else np.zeros(len(md)), dtype=float))
+        if not (len(md) == len(inc) == len(azi)) or len(md) < 2:
+            raise ValueError("A survey needs at least two stations with md, inclination and azimuth each")
+        if not np.all(np.isfinite(md)) or md[0] < 0 or np.any(np.diff(md) <= 0):
+            raise ValueError("Survey measured depths must start at or above zero and increase")
+        if md[0] > 0:
+            md, inc, azi = np.concatenate([[0.0], md]), np.concatenate([[0.0], inc]), np.concatenate([[0.0], azi])
+
+        # Minimum curvature: dogleg angle and ratio factor per interval
+        cos_dogleg = np.cos(np.diff(inc)) - np.sin(inc[:-1]) * np.sin(inc[1:]) * (1 - np.cos(np.diff(azi)))
+        dogleg = np.arccos(np.clip(cos_dogleg, -1.0, 1.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ratio = np.where(dogleg > 1e-9, 2 / dogleg * np.tan(dogleg / 2), 1.0)
+        tvd_steps = np.diff(md) / 2 * (np.cos(inc[:-1]) + np.cos(inc[1:])) * ratio
+
+        self.measured_depth = md
+        self.inclination = np.degrees(inc)
+        self.true_vertical_depth = np.concatenate([[0.0], np.cumsum(tvd_steps)])
+
+    @classmethod
+    def vertical(cls, depth: float) -> "Survey":
+        return cls([0.0, depth], [0.0, 0.0])
+
+    @property
+    def total_depth(self) -> float:
+        return float(self.measured_depth[-1])
+
+    def at(self, md: float) -> Tuple[float, float]:
+        """Inclination (degrees from vertical) and true vertical depth at a measured depth."""
+        return (float(np.interp(md, self.measured_depth, self.inclination)),
+                float(np.interp(md, self.measured_depth, self.true_vertical_depth)))
+
+
+@functools.lru_cache(maxsize=PVT_CACHE_SIZE)
+def black_oil_pvt(oil_gravity: float, gas_gravity: float, gas_oil_ratio: float, water_gravity: float,
+                  salinity: float, pressure: float, temperature: float) -> Dict[str, float]:
+    """
+    Black-oil properties at a pressure (psia) and temperature (°F).
+
+    Rate-independent, so the cache is shared by every traverse of the same
+    fluid: the up and down march of one well, or a well at several rates.
+    """
+    t_rankine = temperature + 459.67
+    molecular_weight = AIR_MOLECULAR_WEIGHT * gas_gravity
+    rs = min(reservoir.solution_gas_oil_ratio_standing(pressure, temperature, gas_gravity, oil_gravity),
+             gas_oil_ratio)
+    bw = fluids.water_formation_volume_factor(temperature, pressure, salinity)
+    z = fluids.gas_compressibility_factor_standing(pressure, t_rankine, gas_gravity)
+    return {
+        "solution_gor": rs,
+        "oil_fvf": reservoir.oil_formation_volume_factor_standing(rs, gas_gravity, oil_gravity, temperature, pressure),
+        "oil_density": fluids.oil_density(oil_gravity, gas_gravity, rs, temperature, pressure),
+        "oil_viscosity": reservoir.oil_viscosity_beggs_robinson(oil_gravity, temperature, pressure, rs),
+        "water_fvf": bw,
+        "water_density": water_gravity * WATER_DENSITY / bw,
+        "water_viscosity": fluids.water_viscosity(temperature, pressure, salinity),
+        "z_factor": z,
+        "gas_fvf": fluids.gas_formation_volume_factor(t_rankine, pressure, z),
+        "gas_density": fluids.gas_density(pressure, t_rankine, molecular_weight, z),
+        "gas_viscosity": reservoir.gas_viscosity_lee(molecular_weight, t_rankine, pressure, gas_gravity),
+    }
+
+
+class BlackOilFluid:
+    """Producing oil, gas and water stream; black-oil properties come from ``black_oil_pvt``."""
+
+    def __init__(self, oil_rate: float, gas_oil_ratio: float, water_rate: float, oil_gravity: float,
+                 gas_gravity: float, water_gravity: float = 1.0, salinity: float = 0.0):
+        self.oil_rate = oil_rate
+        self.gas_oil_ratio = gas_oil_ratio
+        self.water_rate = water_rate
+        self.oil_gravity = oil_gravity
+        self.gas_gravity = gas_gravity
+        self.water_gravity = water_gravity
+        self.salinity = salinity
+        self.lookups = 0
+        self.hits = 0
+
+    def properties(self, pressure: float, temperature: float) -> Dict[str, float]:
+        """In-situ rates and mixed liquid properties at a pressure (psia) and temperature (°F)."""
+        # Round to the cache resolution so nearby points share an evaluation
+        p = round(pressure / PRESSURE_RESOLUTION) * PRESSURE_RESOLUTION
+        t = round(temperature / TEMPERATURE_RESOLUTION) * TEMPERATURE_RESOLUTION
+        # Traverses run on pool threads and share the cache; the lock keeps
+        # another thread's miss from being counted against this lookup
+        with _pvt_lock:
+            misses = black_oil_pvt.cache_info().misses
+            pvt = black_oil_pvt(self.oil_gravity, self.gas_gravity, self.gas_oil_ratio, self.water_gravity,
+                                self.salinity, p, t)
+            self.lookups += 1
+            self.hits += black_oil_pvt.cache_info().misses == misses
+
+        oil_volume = self.oil_rate * pvt["oil_fvf"]
+        water_volume = self.water_rate * pvt["water_fvf"]
+        liquid_volume = oil_volume + water_volume
+        water_fraction = water_volume / liquid_volume if liquid_volume > 0 else 0.0
+        free_gas = max(self.oil_rate * (self.gas_oil_ratio - pvt["solution_gor"]), 0.0)
+        return {
+            **pvt,
+            "liquid_rate": liquid_volume,
+            # Free gas at local conditions, in the Mcf/day the gradient expects
+            "gas_rate": free_gas * pvt["gas_fvf"] / 1000,
+            "liquid_density": (1 - water_fraction) * pvt["oil_density"] + water_fraction * pvt["water_density"],
+            "liquid_viscosity": (1 - water_fraction) * pvt["oil_viscosity"] + water_fraction * pvt["water_viscosity"],
+        }
+
+
+def pressure_traverse(
+    fluid: BlackOilFluid,
+    survey: Survey,
+    tubing_diameter: float,
+    pressure: float,
+    wellhead_temperature: float,
+    bottomhole_temperature: float,
+    direction: str = "down",
+    tolerance: float = 1.0,
+    initial_step: float = 100.0,
+    min_step: float = 1.0,
+    max_step: float = 1000.0,
+    max_steps: int = 10000
+) -> Dict[str, List[float]]:
+    """
+    Integrate the pressure along the well and return the profile.
+
+    ``pressure`` is the wellhead pressure when marching ``down`` and the
+    bottomhole pressure when marching ``up``. A step is accepted when its
+    error estimate is within ``tolerance`` psi (or it is already
+    ``min_step`` long); the next step grows or shrinks with the error.
+    Temperature varies linearly with true vertical depth. The profile is
+    ordered from the wellhead down whichever way it was integrated.
+    """
+    total_depth = survey.total_depth
+    total_tvd = survey.at(total_depth)[1]
+
+    def state(md: float, p: float) -> Dict[str, float]:
+        inclination, tvd = survey.at(md)
+        temperature = wellhead_temperature + (bottomhole_temperature - wellhead_temperature) * tvd / total_tvd
+        props = fluid.properties(p, temperature)
+        gradient, holdup = production.multiphase_flow_beggs_brill(
+            props["liquid_rate"], props["gas_rate"], tubing_diameter, 90.0 - inclination,
+            props["liquid_density"], props["gas_density"], props["liquid_viscosity"], props["gas_viscosity"]
+        )
+        return {"md": md, "tvd": tvd, "inclination": inclination, "pressure": p, "temperature": temperature,
+                "gradient": gradient, "holdup": holdup, **props}
+
+    if direction not in ("down", "up"):
+        raise ValueError("direction must be 'down' or 'up'")
+    sign = 1.0 if direction == "down" else -1.0
+    md = 0.0 if direction == "down" else total_depth
+    current = state(md, pressure)
+    points = [current]
+    step = min(max(initial_step, min_step), max_step)
+    accepted = rejected = 0
+
+    while True:
+        remaining = total_depth - md if direction == "down" else md
+        if remaining <= 1e-6:
+            break
+        if accepted + rejected >= max_steps:
+            raise ValueError(f"Traverse did not finish within {max_steps} steps")
+        h = min(step, remaining)
+        k1 = current["gradient"]
+        predicted = current["pressure"] + sign * h * k1
+        if predicted <= 0:
+            if h > min_step:
+                step = max(h / 2, min_step)
+                rejected += 1
+                continue
+            raise ValueError(f"Pressure falls to zero near measured depth {md:.0f} ft")
+        k2 = state(md + sign * h, predicted)["gradient"]
+        error = abs(h * (k2 - k1) / 2)
+        if error > tolerance and h > min_step:
+            rejected += 1
+            step = max(h * max(0.2, 0.9 * math.sqrt(tolerance / error)), min_step)
+            continue
+
+        new_pressure = current["pressure"] + sign * h * (k1 + k2) / 2
+        if new_pressure <= 0:
+            raise ValueError(f"Pressure falls to zero near measured depth {md:.0f} ft")
+        md = md + sign * h
+        current = state(md, new_pressure)
+        points.append(current)
+        accepted += 1
+        growth = 5.0 if error == 0 else min(5.0, max(0.2, 0.9 * math.sqrt(tolerance / error)))
+        step = min(max(h * growth, min_step), max_step)
+
+    if direction != "down":
+        points.reverse()
+    return {
+        "wellhead_pressure": points[0]["pressure"],
+        "bottomhole_pressure": points[-1]["pressure"],
+        "steps": accepted,
+        "rejected_steps": rejected,
+        "property_lookups": fluid.lookups,
+        "property_cache_hits": fluid.hits,
+        "profile": {
+            name: [point[key] for point in points]
+            for name, key in PROFILE_COLUMNS
+        },
+    }
+
@@ -0,0 +1,235 @@
+"""
+Latency, throughput and allocations of every calculation endpoint.
+
+Each endpoint is called through an in-process ASGI client with a
+representative payload (see ``payloads.py``), and the petrocalc call behind it
+is timed on its own, so time spent in the web layer and in the calculation
+can be told apart. The result cache is switched off so every request
+computes. For each endpoint the report lists p50/p99 latency, requests per
+second and the memory allocated per call (peak traced by ``tracemalloc``).
+
+Results can be saved as a JSON baseline and later runs compared against it;
+endpoints whose p50 latency grew by more than ``--tolerance`` are reported as
+regressions and the script exits with status 1.
+
+Usage:
+    python benchmarks/bench_endpoints.py [--requests 200] [--filter drilling]
+    python benchmarks/bench_endpoints.py --save baselines/release.json
+    python benchmarks/bench_endpoints.py --compare baselines/release.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import dispatch  # noqa: E402
+from app.config import get_config  # noqa: E402
+from app.executor import get_executor  # noqa: E402
+from app.main import app  # noqa: E402
+from payloads import batch_payload, extra_requests, payload_for  # noqa: E402
+
+
+def _summary(latencies: List[float], elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "p50_us": statistics.median(latencies) * 1e6,
+        "p99_us": latencies[int(0.99 * (len(latencies) - 1))] * 1e6,
+        "rps": len(latencies) / elapsed,
+    }
+
+
+def _allocated_bytes(func: Callable, calls: int = 20) -> float:
+    """Average peak memory allocated by one call."""
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            func()
+            total += tracemalloc.get_traced_memory()[1] - baseline
+        return total / calls
+    finally:
+        tracemalloc.stop()
+
+
+async def _allocated_bytes_async(func: Callable, calls: int = 20) -> float:
+    """Average peak memory allocated by one awaited call."""
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            await func()
+            total += tracemalloc.get_traced_memory()[1] - baseline
+        return total / calls
+    finally:
+        tracemalloc.stop()
+
+
+class CallRecorder:
+    """Capture the petrocalc calls an endpoint hands to the executor."""
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.calls = []
+        self._run = executor.run
+
+    async def _record(self, func, *args, offload=None, **kwargs):
+        self.calls.append((func, args, kwargs))
+        return await self._run(func, *args, offload=offload, **kwargs)
+
+    def __enter__(self):
+        self.executor.run = self._record
+        return self
+
+    def __exit__(self, *exc):
+        del self.executor.run
+
+
+async def bench_endpoint(client: httpx.AsyncClient, path: str, request: dict, requests: int) -> dict:
+    """Time sequential requests to one endpoint; ``request`` holds ``httpx`` arguments."""
+    response = await client.post(path, **request)
+    if response.status_code != 200:
+        return {"status": response.status_code, "error": response.text[:200]}
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        request_start = time.perf_counter()
+        await client.post(path, **request)
+        latencies.append(time.perf_counter() - request_start)
+    result = {"status": 200, **_summary(latencies, time.perf_counter() - start)}
+    result["alloc_bytes"] = await _allocated_bytes_async(lambda: client.post(path, **request))
+    return result
+
+
+def bench_kernel(calls: list, repeats: int) -> Optional[dict]:
+    """Time the petrocalc calls recorded for one request, called directly."""
+    if not calls:
+        return None
+
+    def run_calls():
+        for func, args, kwargs in calls:
+            func(*args, **kwargs)
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(repeats):
+        call_start = time.perf_counter()
+        run_calls()
+        latencies.append(time.perf_counter() - call_start)
+    result = _summary(latencies, time.perf_counter() - start)
+    result["function"] = ", ".join(f"{func.__module__}.{func.__name__}" for func, _, _ in calls)
+    result["alloc_bytes"] = _allocated_bytes(run_calls)
+    return result
+
+
+async def run_suite(requests: int, name_filter: str) -> dict:
+    routes = dispatch.get_route_table(app)
+    executor = get_executor()
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        scenarios = {path: {"json": payload_for(path, route.model)} for path, route in routes.items()}
+        scenarios.update({
+            path + "/batch": {"json": batch_payload(route.endpoint.calculation)}
+            for path, route in routes.items() if hasattr(route.endpoint, "calculation")
+        })
+        scenarios.update(extra_requests())
+        for path, request in sorted(scenarios.items()):
+            if name_filter not in path:
+                continue
+            with CallRecorder(executor) as recorder:
+                await client.post(path, **request)
+            result = await bench_endpoint(client, path, request, requests)
+            if result["status"] == 200:
+                result["kernel"] = bench_kernel(recorder.calls, requests * 5)
+            results[path] = result
+    return results
+
+
+def environment() -> dict:
+    config = get_config()
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "petrocalc": config.get_petrocalc_version(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Endpoints whose p50 latency regressed by more than ``tolerance``."""
+    regressions = []
+    for path, result in results.items():
+        before = baseline.get("endpoints", {}).get(path)
+        if not before or before.get("status") != 200 or result.get("status") != 200:
+            continue
+        change = result["p50_us"] / before["p50_us"] - 1
+        if change > tolerance:
+            regressions.append(f"{path}: p50 {before['p50_us']:.0f} -> {result['p50_us']:.0f} us ({change:+.0%})")
+    return regressions
+
+
+def print_report(results: dict):
+    print(f"{'endpoint':<66}{'p50 us':>9}{'p99 us':>9}{'req/s':>8}{'KiB':>7}"
+          f"{'kernel p50':>12}{'kernel KiB':>11}")
+    for path, result in results.items():
+        if result["status"] != 200:
+            print(f"{path:<66}  HTTP {result['status']}: {result['error'][:60]}")
+            continue
+        kernel = result.get("kernel")
+        kernel_text = f"{kernel['p50_us']:>12.1f}{kernel['alloc_bytes'] / 1024:>11.1f}" if kernel else f"{'-':>12}{'-':>11}"
+        print(f"{path:<66}{result['p50_us']:>9.0f}{result['p99_us']:>9.0f}{result['rps']:>8.0f}"
+              f"{result['alloc_bytes'] / 1024:>7.1f}{kernel_text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per endpoint")
+    parser.add_argument("--filter", default="", help="only endpoints whose path contains this text")
+    parser.add_argument("--save", type=Path, help="write results to this JSON baseline")
+    parser.add_argument("--compare", type=Path, help="compare against a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown before flagging")
+    args = parser.parse_args()
+
+    # Measure the calculation path, not cache hits
+    get_config().cache_routers = set()
+    results = asyncio.run(run_suite(args.requests, args.filter))
+    get_executor().shutdown()
+    print_report(results)
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps({"environment": environment(), "endpoints": results}, indent=2) + "\n")
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        print(f"\nCompared with {args.compare} ({baseline.get('environment', {}).get('created', 'unknown')})")
+        if regressions:
+            print("Regressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Latency of cheap requests under contention from slow calculations.
+
+Fires a stream of cheap hydrostatic-pressure requests while several clients
+keep slow IRR requests (long cash-flow series) continuously in flight. The
+scenario runs once with everything inline on the event loop and once with the
+execution layer offloading slow calls to its pool, and reports the
+cheap-request latency percentiles for both.
+
+Usage:
+    python benchmarks/bench_executor.py [--slow 4] [--fast 200] [--periods 1000]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.executor import get_executor  # noqa: E402
+from app.main import app  # noqa: E402
+
+FAST_PAYLOAD = {"mud_weight": 12.0, "depth": 10000}
+
+
+def slow_payload(periods: int) -> dict:
+    return {"cash_flows": [1000.0] * periods, "initial_investment": 5000.0, "tolerance": 1e-9}
+
+
+async def _timed_post(client, url, payload) -> float:
+    start = time.perf_counter()
+    response = await client.post(url, json=payload)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def _slow_client(client, payload, stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        latencies.append(await _timed_post(client, "/api/economics/internal_rate_of_return", payload))
+        await asyncio.sleep(0)
+
+
+async def run_scenario(slow: int, fast: int, periods: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        slow_latencies = []
+        slow_tasks = [
+            asyncio.create_task(_slow_client(client, slow_payload(periods), stop, slow_latencies))
+            for _ in range(slow)
+        ]
+        await asyncio.sleep(0.05)
+        fast_latencies = []
+        for _ in range(fast):
+            # Time from the moment the request is issued, so waiting for a
+            # blocked event loop to pick it up counts towards its latency
+            issued = time.perf_counter()
+            await asyncio.create_task(client.post("/api/drilling/hydrostatic-pressure", json=FAST_PAYLOAD))
+            fast_latencies.append(time.perf_counter() - issued)
+            await asyncio.sleep(0.001)
+        stop.set()
+        await asyncio.gather(*slow_tasks)
+
+    fast_latencies.sort()
+    return {
+        "fast_p50_ms": statistics.median(fast_latencies) * 1000,
+        "fast_p99_ms": fast_latencies[int(0.99 * (len(fast_latencies) - 1))] * 1000,
+        "fast_max_ms": fast_latencies[-1] * 1000,
+        "slow_mean_ms": statistics.mean(slow_latencies) * 1000,
+        "slow_completed": len(slow_latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--slow", type=int, default=4, help="clients issuing slow IRR requests")
+    parser.add_argument("--fast", type=int, default=200, help="sequential cheap requests")
+    parser.add_argument("--periods", type=int, default=1000, help="cash-flow periods per slow request")
+    args = parser.parse_args()
+
+    executor = get_executor()
+    print(f"{'mode':<10}{'fast p50':>12}{'fast p99':>12}{'fast max':>12}{'slow mean':>12}{'slow n':>8}  (ms)")
+    for mode, enabled in (("inline", False), ("offload", True)):
+        executor.enabled = enabled
+        result = asyncio.run(run_scenario(args.slow, args.fast, args.periods))
+        print(f"{mode:<10}{result['fast_p50_ms']:>12.2f}{result['fast_p99_ms']:>12.2f}"
+              f"{result['fast_max_ms']:>12.2f}{result['slow_mean_ms']:>12.2f}{result['slow_completed']:>8}")
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
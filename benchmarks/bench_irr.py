@@ -0,0 +1,75 @@
+"""
+Batched IRR kernel against the scalar petrocalc function in a loop.
+
+Generates a portfolio of random projects (an investment followed by
+declining cash flows, some with a late abandonment cost that gives a second
+sign change), solves it once with ``app.kernels.economics.irr_roots`` and
+once by calling ``petrocalc.economics.internal_rate_of_return`` per
+project, and reports both timings and the largest disagreement on the
+projects with a single IRR where the scalar function found it.
+
+Usage:
+    python benchmarks/bench_irr.py [--projects 2000] [--periods 15] [--seed 0]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.kernels import economics as economics_kernels  # noqa: E402
+from petrocalc import economics  # noqa: E402
+
+
+def portfolio(projects: int, periods: int, seed: int):
+    rng = np.random.default_rng(seed)
+    first_year = rng.uniform(200, 2000, projects)
+    decline = rng.uniform(0.05, 0.3, projects)
+    cash_flows = first_year[:, None] * (1 - decline[:, None]) ** np.arange(periods)
+    # A tenth of the projects end with an abandonment cost
+    abandoned = rng.random(projects) < 0.1
+    cash_flows[abandoned, -1] = -rng.uniform(500, 5000, abandoned.sum())
+    investment = rng.uniform(1000, 8000, projects)
+    return cash_flows, investment
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--projects", type=int, default=2000, help="projects in the portfolio")
+    parser.add_argument("--periods", type=int, default=15, help="cash-flow periods per project")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    cash_flows, investment = portfolio(args.projects, args.periods, args.seed)
+
+    start = time.perf_counter()
+    solved = economics_kernels.irr_roots(cash_flows, investment)
+    batched = time.perf_counter() - start
+
+    start = time.perf_counter()
+    looped = np.full(args.projects, np.nan)
+    for i in range(args.projects):
+        try:
+            looped[i] = economics.internal_rate_of_return(cash_flows[i].tolist(), investment[i], 1e-10)
+        except Exception:
+            pass
+    scalar = time.perf_counter() - start
+
+    # The scalar function only finds positive rates; compare where its answer is a root
+    with np.errstate(all="ignore"):
+        residual = np.abs(economics_kernels.net_present_value(cash_flows, looped, investment))
+    single = (solved["status"] == "ok") & (residual < 1e-6 * investment)
+    difference = np.abs(solved["irr"][single] - looped[single]).max() if single.any() else float("nan")
+    print(f"{'method':<10}{'time ms':>12}{'per project us':>16}")
+    print(f"{'batched':<10}{batched * 1000:>12.1f}{batched / args.projects * 1e6:>16.1f}")
+    print(f"{'loop':<10}{scalar * 1000:>12.1f}{scalar / args.projects * 1e6:>16.1f}")
+    print(f"speedup {scalar / batched:.1f}x; max |difference| on {single.sum()} single-root projects: {difference:.2e}")
+    print(", ".join(f"{status}: {(solved['status'] == status).sum()}" for status in ("ok", "multiple_roots", "no_root")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Throughput of the development and production serving modes.
+
+Starts ``run.py`` once with ``ENVIRONMENT=development`` (single auto-reloading
+process) and once with ``ENVIRONMENT=production`` (preloaded, forked workers
+on uvloop/httptools), drives each with concurrent keep-alive clients posting a
+cheap calculation, and reports requests per second, latency percentiles and
+the total proportional set size (PSS) of the server processes.
+
+Usage:
+    python benchmarks/bench_serving.py [--seconds 10] [--concurrency 32] [--workers N]
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+PAYLOAD = {"mud_weight": 12.0, "depth": 10000}
+URL = "/api/drilling/hydrostatic-pressure"
+
+
+def _process_tree(pid: int) -> list:
+    children = subprocess.run(["pgrep", "-P", str(pid)], capture_output=True, text=True).stdout.split()
+    return [pid] + [p for child in children for p in _process_tree(int(child))]
+
+
+def _pss_mb(pid: int) -> float:
+    """Sum the proportional set size of a process and its descendants."""
+    total = 0
+    for member in _process_tree(pid):
+        try:
+            with open(f"/proc/{member}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1])
+        except FileNotFoundError:
+            pass
+    return total / 1024
+
+
+async def _client(client: httpx.AsyncClient, deadline: float, latencies: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        # Vary the body so the result cache does not answer every request
+        payload = {**PAYLOAD, "depth": 10000 + len(latencies) % 1000}
+        response = await client.post(URL, json=payload)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+async def drive(base_url: str, seconds: float, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        await client.post(URL, json=PAYLOAD)
+        latencies: list = []
+        start = time.perf_counter()
+        deadline = start + seconds
+        await asyncio.gather(*(_client(client, deadline, latencies) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000,
+    }
+
+
+def run_mode(environment: str, port: int, args) -> dict:
+    env = {**os.environ, "ENVIRONMENT": environment, "PETROCALC_PORT": str(port)}
+    if args.workers:
+        env["PETROCALC_WORKERS"] = str(args.workers)
+    server = subprocess.Popen(
+        [sys.executable, "run.py"], cwd=ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(base_url + "/api/status", timeout=1)
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        result = asyncio.run(drive(base_url, args.seconds, args.concurrency))
+        result["pss_mb"] = _pss_mb(server.pid)
+        return result
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=10, help="load duration per mode")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent keep-alive clients")
+    parser.add_argument("--workers", type=int, default=0, help="production workers (default CPU count)")
+    parser.add_argument("--port", type=int, default=8790)
+    args = parser.parse_args()
+
+    print(f"{'mode':<13}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'PSS MB':>10}")
+    for offset, environment in enumerate(("development", "production")):
+        result = run_mode(environment, args.port + offset, args)
+        print(f"{environment:<13}{result['rps']:>10.0f}{result['p50_ms']:>10.2f}"
+              f"{result['p99_ms']:>10.2f}{result['pss_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Cold start time of the application.
+
+Starts fresh interpreters and measures how long ``import app.main`` takes,
+how long the first calculation request takes after that (it loads its
+router and petrocalc module), and, for comparison, the import time when every
+router is loaded up front. Results can be written to a JSON file and compared
+against an earlier run to track start-up time over changes.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 10] [--save startup.json] [--baseline startup.json]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs in a fresh interpreter and prints its timings as JSON
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+if {eager}:
+    app.main.app.state.calculation_routers.load_all()
+loaded = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(app.main.app)
+request_start = time.perf_counter()
+client.post("/api/drilling/hydrostatic-pressure", json={{"mud_weight": 12.0, "depth": 10000}}).raise_for_status()
+first_request = time.perf_counter() - request_start
+print(json.dumps({{
+    "import_ms": (loaded - start) * 1000,
+    "first_request_ms": first_request * 1000,
+    "modules": len(sys.modules),
+}}))
+"""
+
+
+def probe(eager: bool) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(eager=eager)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(runs: int, eager: bool) -> dict:
+    samples = [probe(eager) for _ in range(runs)]
+    return {
+        key: statistics.median(sample[key] for sample in samples)
+        for key in ("import_ms", "first_request_ms", "modules")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per mode")
+    parser.add_argument("--save", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--baseline", type=Path, help="compare against results saved earlier")
+    args = parser.parse_args()
+
+    results = {"lazy": measure(args.runs, eager=False), "eager": measure(args.runs, eager=True)}
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else {}
+
+    print(f"{'mode':<8}{'import':>10}{'first req':>12}{'modules':>10}  (median ms of {args.runs} runs)")
+    for mode, result in results.items():
+        line = f"{mode:<8}{result['import_ms']:>10.1f}{result['first_request_ms']:>12.1f}{result['modules']:>10.0f}"
+        if mode in baseline:
+            change = result["import_ms"] - baseline[mode]["import_ms"]
+            line += f"  import {change:+.1f} ms vs baseline"
+        print(line)
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
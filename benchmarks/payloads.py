@@ -0,0 +1,326 @@
+"""
+Representative request payloads for every calculation endpoint.
+
+Values follow the well, fluid, rock and project parameters used in
+``examples.py`` where it has them; the remaining fields use typical field
+values. Endpoints taking arrays, nested documents or raw files get a whole
+request from ``extra_requests``, and the columnar ``/batch`` routes of
+registry calculations one from ``batch_payload``.
+"""
+
+import math
+from typing import Dict, Type
+
+import numpy as np
+from pydantic import BaseModel
+
+# Parameters from examples.py
+DEPTH = 12000.0
+HOLE_DIAMETER = 8.5
+PIPE_OD = 5.0
+MUD_WEIGHT = 12.5
+FLOW_RATE = 450.0
+API_GRAVITY = 32.0
+GAS_GRAVITY = 0.7
+TEMPERATURE = 180.0
+PRESSURE = 2500.0
+GAS_OIL_RATIO = 550.0
+RESERVOIR_PRESSURE = 3200.0
+MAX_OIL_RATE = 1500.0
+TEST_PWF = 2000.0
+AOF = 10000.0
+INITIAL_INVESTMENT = 2500000.0
+OIL_PRICE = 75.0
+GAS_PRICE = 4.5
+OPERATING_COST = 25.0
+DISCOUNT_RATE = 0.12
+OIL_PRODUCTION = [800.0, 700.0, 600.0, 500.0, 450.0, 400.0, 350.0, 300.0, 250.0, 200.0]
+NEUTRON_POROSITY = 0.25
+DENSITY_POROSITY = 0.22
+BULK_DENSITY = 2.35
+FORMATION_RESISTIVITY = 15.0
+WATER_RESISTIVITY = 0.08
+
+FIELD_VALUES = {
+    # Drilling and well control
+    "depth": DEPTH,
+    "true_vertical_depth": DEPTH,
+    "well_depth": DEPTH,
+    "hole_diameter": HOLE_DIAMETER,
+    "wellbore_diameter": HOLE_DIAMETER,
+    "pipe_diameter": PIPE_OD,
+    "pipe_inner_diameter": 4.276,
+    "mud_weight": MUD_WEIGHT,
+    "original_mud_weight": MUD_WEIGHT,
+    "current_mud_weight": MUD_WEIGHT,
+    "kill_mud_weight": 13.2,
+    "flow_rate": FLOW_RATE,
+    "mud_gradient": 0.65,
+    "casing_shoe_depth": 5000.0,
+    "shoe_depth": 5000.0,
+    "fracture_pressure": 4200.0,
+    "formation_pressure": 6800.0,
+    "shut_in_drillpipe_pressure": 500.0,
+    "slow_pump_rate_pressure": 800.0,
+    "initial_circulating_pressure": 1300.0,
+    "final_circulating_pressure": 850.0,
+    "total_pump_strokes": 2000.0,
+    "current_stroke": 500.0,
+    "kick_volume": 20.0,
+    "hydrostatic_pressure": 7800.0,
+    "day_rate": 25000.0,
+    # Fluids and PVT
+    "oil_gravity": API_GRAVITY,
+    "gas_gravity": GAS_GRAVITY,
+    "temperature": TEMPERATURE,
+    "pressure": PRESSURE,
+    "gas_oil_ratio": GAS_OIL_RATIO,
+    "salinity": 100000.0,
+    "z_factor": 0.85,
+    "formation_volume_factor": 1.2,
+    "viscosity": 1.5,
+    "fluid_viscosity": 1.0,
+    "fluid_density": 62.4,
+    "density": 62.4,
+    "gas_density": 8.0,
+    "liquid_density": 55.0,
+    "gas_viscosity": 0.02,
+    "liquid_viscosity": 2.0,
+    "surface_tension": 30.0,
+    "formation_water_density": 1.05,
+    # Reservoir and rock
+    "porosity": 0.2,
+    "permeability": 100.0,
+    "formation_permeability": 100.0,
+    "water_saturation": 0.3,
+    "oil_saturation": 0.5,
+    "hydrocarbon_saturation": 0.7,
+    "irreducible_water_saturation": 0.2,
+    "residual_oil_saturation": 0.25,
+    "thickness": 50.0,
+    "net_thickness": 40.0,
+    "gross_thickness": 50.0,
+    "net_to_gross": 0.8,
+    "gross_rock_volume": 1000.0,
+    "bulk_volume": 1000.0,
+    "drainage_radius": 1000.0,
+    "drainage_area": 40.0,
+    "wellbore_radius": 0.354,
+    "total_compressibility": 1e-5,
+    "neutron_porosity": NEUTRON_POROSITY,
+    "density_porosity": DENSITY_POROSITY,
+    "bulk_density": BULK_DENSITY,
+    "matrix_density": 2.65,
+    "formation_resistivity": FORMATION_RESISTIVITY,
+    "water_resistivity": WATER_RESISTIVITY,
+    "grain_diameter": 0.01,
+    "pore_size_distribution": 2.0,
+    "entry_pressure": 5.0,
+    "overburden_gradient": 1.0,
+    "pore_pressure_gradient": 0.465,
+    "youngs_modulus": 2e6,
+    # Production and completion
+    "reservoir_pressure": RESERVOIR_PRESSURE,
+    "bottomhole_pressure": TEST_PWF,
+    "flowing_bottomhole_pressure": TEST_PWF,
+    "maximum_oil_rate": MAX_OIL_RATE,
+    "production_rate": 800.0,
+    "absolute_open_flow_potential": AOF,
+    "ideal_productivity_index": 1.0,
+    "actual_productivity_index": 0.8,
+    "liquid_rate": 1000.0,
+    "gas_rate": 500.0,
+    "choke_diameter": 32.0,
+    "upstream_pressure": 1000.0,
+    "downstream_pressure": 500.0,
+    "orifice_diameter": 1.0,
+    "pressure_drop": 100.0,
+    "production_time": 100.0,
+    "total_dynamic_head": 5000.0,
+    "injection_rate": 10.0,
+    "fracture_half_length": 300.0,
+    "fracture_height": 100.0,
+    "fracture_conductivity": 2000.0,
+    "fracture_volume": 5000.0,
+    "proppant_mass": 100000.0,
+    "perforation_diameter": 0.5,
+    "penetration_depth": 12.0,
+    "shots_per_foot": 4.0,
+    "time_data": [1.0, 2.0, 4.0, 8.0, 16.0, 32.0],
+    "pressure_data": [1500.0, 1800.0, 2000.0, 2150.0, 2250.0, 2300.0],
+    # Flow
+    "velocity": 5.0,
+    "diameter": 4.0,
+    "length": 1000.0,
+    "pipe_length": 1000.0,
+    "reynolds_number": 100000.0,
+    "relative_roughness": 0.0001,
+    "liquid_superficial_velocity": 2.0,
+    "gas_superficial_velocity": 5.0,
+    "pipe_inclination": 90.0,
+    "particle_diameter": 0.001,
+    "particle_density": 2650.0,
+    # Thermodynamics
+    "heat_capacity": 0.5,
+    "thermal_conductivity": 1.5,
+    "inner_temperature": 200.0,
+    "outer_temperature": 60.0,
+    "pipe_inner_radius": 0.2,
+    "pipe_outer_radius": 0.25,
+    "pipe_thermal_conductivity": 26.0,
+    "insulation_outer_radius": 0.35,
+    "insulation_thermal_conductivity": 0.03,
+    # Economics
+    "initial_investment": INITIAL_INVESTMENT,
+    "oil_price": OIL_PRICE,
+    "gas_price": GAS_PRICE,
+    "operating_cost_per_barrel": OPERATING_COST,
+    "discount_rate": DISCOUNT_RATE,
+    "annual_production": sum(OIL_PRODUCTION) * 365 / len(OIL_PRODUCTION),
+    "cash_flows": [rate * 365 * (OIL_PRICE - OPERATING_COST) for rate in OIL_PRODUCTION],
+}
+
+# Rows per request for the columnar and many-well endpoints
+BATCH_ROWS = 1000
+WELLS = 100
+# Nodes per side of the looped /gas_network grid (2 * 72 * 71 = 10,224 pipes)
+NETWORK_SIDE = 72
+
+LAS_HEADER = """~VERSION INFORMATION
+ VERS.   2.0 : CWLS LOG ASCII STANDARD - VERSION 2.0
+ WRAP.   NO : ONE LINE PER DEPTH STEP
+~WELL INFORMATION
+ NULL.   -999.25 : NULL VALUE
+~CURVE INFORMATION
+ DEPT.F     : Depth
+ RHOB.G/C3  : Bulk density
+ NPHI.V/V   : Neutron porosity
+ ILD .OHMM  : Deep resistivity
+~A  DEPT RHOB NPHI ILD
+"""
+
+
+def payload_for(path: str, model: Type[BaseModel]) -> dict:
+    """Build a payload for ``model`` from the shared values."""
+    return {name: FIELD_VALUES[name] for name in model.model_fields if name in FIELD_VALUES}
+
+
+def batch_payload(calculation) -> dict:
+    """Columns of ``BATCH_ROWS`` rows for the ``/batch`` route of a registry calculation."""
+    return {
+        spec.name: [FIELD_VALUES[spec.name] * (1 + 0.1 * i / BATCH_ROWS) for i in range(BATCH_ROWS)]
+        for spec in calculation.inputs if spec.type is float and spec.name in FIELD_VALUES
+    }
+
+
+def _buildup_gauge_data(hours: float = 6.0) -> bytes:
+    """A 1 Hz synthetic buildup as packed little-endian float64 (seconds, psia) pairs."""
+    seconds = np.arange(-600.0, hours * 3600)
+    shut_in = np.maximum(seconds / 3600, 1e-9)
+    pressure = np.where(seconds <= 0, TEST_PWF, RESERVOIR_PRESSURE - 40 * np.log10((500 + shut_in) / shut_in))
+    return np.column_stack([seconds, pressure]).astype("<f8").tobytes()
+
+
+def _las_log(samples: int = BATCH_ROWS) -> str:
+    """A LAS 2.0 density-neutron-resistivity log sampled every half foot."""
+    rows = "".join(
+        f"{DEPTH + 0.5 * i:.1f} {BULK_DENSITY + 0.1 * math.sin(i / 25):.3f} "
+        f"{NEUTRON_POROSITY + 0.05 * math.cos(i / 40):.3f} {FORMATION_RESISTIVITY * (1 + 0.5 * math.sin(i / 60)):.2f}\n"
+        for i in range(samples)
+    )
+    return LAS_HEADER + rows
+
+
+def _gas_grid(side: int = NETWORK_SIDE) -> dict:
+    """A looped gathering grid fed from one corner, with an offtake at every other node."""
+    nodes = np.arange(side * side).reshape(side, side)
+    pipe_from = np.concatenate([nodes[:, :-1].ravel(), nodes[:-1, :].ravel()])
+    pipe_to = np.concatenate([nodes[:, 1:].ravel(), nodes[1:, :].ravel()])
+    n_pipes = len(pipe_from)
+    return {
+        "pipe_from": pipe_from.tolist(), "pipe_to": pipe_to.tolist(),
+        "pipe_diameter": [4.0 + 4.0 * (i % 7) / 6 for i in range(n_pipes)],
+        "pipe_length": [0.5 + 1.5 * (i % 5) / 4 for i in range(n_pipes)],
+        "gas_gravity": GAS_GRAVITY, "temperature": 540.0, "fixed_pressures": {"0": 1000.0},
+        "node_flows": {str(node): -0.5 - 4.5 * (node % 11) / 10 for node in range(1, side * side)},
+    }
+
+
+def extra_requests() -> Dict[str, dict]:
+    """Requests for the batch, bulk, multi-well and file endpoints, as ``httpx`` keyword arguments."""
+    wells = [{"mud_weight": MUD_WEIGHT + i * 0.1, "depth": DEPTH} for i in range(10)]
+    rows = "".join(f"{TEMPERATURE + i},{PRESSURE},100000\n" for i in range(100))
+    pressures = [RESERVOIR_PRESSURE * (1 - 0.002 * i) for i in range(WELLS)]
+    fluid = {"gas_oil_ratio": GAS_OIL_RATIO, "gas_gravity": GAS_GRAVITY, "oil_gravity": API_GRAVITY,
+             "temperature": TEMPERATURE}
+    lift = {"wellhead_pressure": 200.0, "depth": 8000.0, "tubing_diameter": 2.441, "liquid_density": 55.0,
+            "gas_gravity": GAS_GRAVITY, "liquid_viscosity": 2.0, "gas_viscosity": 0.02,
+            "temperature": TEMPERATURE, "z_factor": 0.85, "gas_liquid_ratio": 500.0}
+    cash_flows = FIELD_VALUES["cash_flows"]
+    darcy = {"permeability": 100.0, "thickness": 50.0, "pressure_drop": 500.0, "viscosity": 1.5,
+             "formation_volume_factor": 1.2, "wellbore_radius": 0.354, "drainage_radius": 1000.0}
+    return {
+        "/api/batch": {"json": {"items": [
+            {"endpoint": "/api/drilling/hydrostatic-pressure", "payload": well} for well in wells
+        ]}},
+        "/api/bulk/fluids/water-viscosity": {
+            "content": "temperature,pressure,salinity\n" + rows,
+            "headers": {"Content-Type": "text/csv"},
+        },
+        "/api/sensitivity": {"json": {
+            "endpoint": "/api/production/darcy_radial_flow", "base": darcy, "pairwise": True,
+        }},
+        "/api/sweep": {"json": {
+            "endpoint": "/api/drilling/hydrostatic-pressure",
+            "inputs": {"mud_weight": {"start": 9, "stop": 18, "points": 20},
+                       "depth": {"start": 1000, "stop": DEPTH, "points": 20}},
+        }},
+        "/api/reservoir/pvt-table": {"json": {
+            "fluids": [{**fluid, "gas_oil_ratio": GAS_OIL_RATIO + 20 * i} for i in range(10)],
+        }},
+        "/api/reservoir/decline-forecast": {"json": {
+            "initial_rate": [800.0 + i for i in range(WELLS)], "initial_decline_rate": 0.3,
+            "decline_exponent": 0.5, "terminal_decline_rate": 0.06,
+        }},
+        "/api/production/nodal_analysis": {"json": {
+            **lift, "reservoir_pressure": pressures, "maximum_oil_rate": MAX_OIL_RATE,
+        }},
+        "/api/production/pressure_traverse": {"json": {
+            "oil_rate": 1000.0, "gas_oil_ratio": GAS_OIL_RATIO, "water_rate": 200.0, "oil_gravity": API_GRAVITY,
+            "gas_gravity": GAS_GRAVITY, "tubing_diameter": 2.441, "pressure": 200.0,
+            "wellhead_temperature": 100.0, "bottomhole_temperature": TEMPERATURE, "depth": 8000.0,
+        }},
+        "/api/production/buildup_analysis": {
+            "params": {"production_time": 500, "flow_rate": 500, "porosity": 0.2, "viscosity": 1.5,
+                       "total_compressibility": 1e-5, "formation_volume_factor": 1.2, "thickness": 50,
+                       "wellbore_radius": 0.354, "time_unit": "seconds", "fit_start": 1},
+            "content": _buildup_gauge_data(),
+            "headers": {"Content-Type": "application/octet-stream"},
+        },
+        "/api/economics/internal_rate_of_return_batch": {"json": {
+            "cash_flows": [[flow * (1 + 0.01 * i) for flow in cash_flows] for i in range(WELLS)],
+            "initial_investment": INITIAL_INVESTMENT,
+        }},
+        "/api/economics/monte_carlo": {"json": {
+            "oil_price": {"distribution": "triangular", "low": 50, "mode": OIL_PRICE, "high": 110},
+            "initial_rate": 800.0, "decline_rate": 0.1, "operating_cost_per_barrel": OPERATING_COST,
+            "capital_cost": {"distribution": "uniform", "low": 4e6, "high": 6e6},
+            "discount_rate": DISCOUNT_RATE, "trials": 10_000,
+        }},
+        "/api/flow/gas_network": {"json": _gas_grid()},
+        "/api/pressure/kill_sheet": {"json": {
+            "original_mud_weight": MUD_WEIGHT, "shut_in_drillpipe_pressure": 500.0, "true_vertical_depth": DEPTH,
+            "slow_pump_rate_pressure": 800.0, "pump_output": 0.1, "slow_pump_rate": 30.0, "stroke_interval": 10,
+            "drillstring": [{"length": DEPTH - 600, "inner_diameter": 4.276, "name": "DP"},
+                            {"length": 600, "inner_diameter": 2.8125, "name": "DC"}],
+            "annulus": [{"length": DEPTH, "hole_diameter": HOLE_DIAMETER, "pipe_outer_diameter": PIPE_OD}],
+            "shoe_true_vertical_depth": 5000.0, "leak_off_mud_weight": 15.0,
+        }},
+        "/api/pressure/pressure_profile": {"json": {
+            "wells": [{"name": "trend"}], "base_depth": DEPTH, "depth_step": 10.0,
+        }},
+        "/api/rock_properties/log_evaluation": {
+            "params": {"water_resistivity": WATER_RESISTIVITY, "format": "json"},
+            "content": _las_log(),
+        },
+    }
@@ -3,31 +3,40 @@ Entry point for running the PetroCalc Web application.
 
 This application requires the petrocalc package to be installed via pip.
 Install it using: pip install petrocalc
+
+Set ``ENVIRONMENT=production`` to serve with several preloaded worker
+processes instead of the single auto-reloading development server.
 """
 
 # Import and run the FastAPI app
 if __name__ == "__main__":
     import uvicorn
-    
+
+    from app.config import get_config
+
+    config = get_config()
+
     print("🚀 Starting PetroCalc Web Application...")
-    print("📚 API Documentation: http://localhost:8000/api/docs")
-    print("🌐 Web Interface: http://localhost:8000")
+    print(f"📚 API Documentation: http://localhost:{config.server_port}/api/docs")
+    print(f"🌐 Web Interface: http://localhost:{config.server_port}")
     
     # Check if petrocalc is available
-    try:
-        import petrocalc
-        print(f"✅ Using petrocalc package from: {petrocalc.__file__}")
-        print(f"📦 PetroCalc version: {getattr(petrocalc, '__version__', 'unknown')}")
-    except ImportError:
+    if not config.is_petrocalc_available():
         print("❌ Error: petrocalc package not found!")
         print("💡 Please install it using: pip install petrocalc")
         print("🔗 Or install from source if available")
         exit(1)
-    
-    uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0", 
-        port=8000, 
-        reload=True,
-        log_level="info"
-    )
+    print(f"📦 PetroCalc version: {config.get_petrocalc_version()}")
+
+    if config.is_development:
+        uvicorn.run(
+            "app.main:app",
+            host=config.server_host,
+            port=config.server_port,
+            reload=True,
+            log_level="info"
+        )
+    else:
+        from app.server import serve
+
+        serve()
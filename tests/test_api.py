@@ -0,0 +1,636 @@
+"""
+Test file for the web API endpoints.
+"""
+
+import json
+import math
+import subprocess
+import sys
+
+import petrocalc
+from fastapi.testclient import TestClient
+
+from app.cache import get_cache
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_oil_fvf_batch_matches_scalar():
+    """Batch Bo matches the scalar correlation and broadcasts scalars"""
+    pressures = [1500.0, 2500.0, 3500.0]
+    response = client.post("/api/reservoir/oil-formation-volume-factor/batch", json={
+        "gas_oil_ratio": [300.0, 500.0, 700.0],
+        "gas_gravity": 0.7,
+        "oil_gravity": 35.0,
+        "temperature": [180.0],
+        "pressure": pressures
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["rows"] == 3
+    assert data["invalid_rows"] == 0
+    for gor, pressure, bo in zip([300, 500, 700], pressures, data["oil_fvf"]):
+        expected = petrocalc.reservoir.oil_formation_volume_factor_standing(gor, 0.7, 35, 180, pressure)
+        assert math.isclose(bo, expected, rel_tol=1e-12)
+
+
+def test_solution_gor_batch_flags_bad_rows():
+    """Invalid rows are masked instead of failing the request"""
+    response = client.post("/api/reservoir/solution-gas-oil-ratio/batch", json={
+        "pressure": [2000.0, 2500.0],
+        "temperature": 180.0,
+        "gas_gravity": [0.7, -0.1],
+        "oil_gravity": 35.0
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["valid"] == [True, False]
+    assert data["solution_gor"][1] is None
+    assert "gas_gravity" in data["error"][1]
+    expected = petrocalc.reservoir.solution_gas_oil_ratio_standing(2000, 180, 0.7, 35)
+    assert math.isclose(data["solution_gor"][0], expected, rel_tol=1e-12)
+
+
+def test_batch_rejects_mismatched_columns():
+    """Columns of different lengths are a request error"""
+    response = client.post("/api/reservoir/solution-gas-oil-ratio/batch", json={
+        "pressure": [2000.0, 2500.0, 3000.0],
+        "temperature": [180.0, 190.0],
+        "gas_gravity": 0.7,
+        "oil_gravity": 35.0
+    })
+    assert response.status_code == 400
+
+
+def test_batch_rejects_too_many_rows(monkeypatch):
+    """Batches over the registry's row limit are a request error"""
+    from app.routers import reservoir
+
+    monkeypatch.setattr(reservoir, "MAX_BATCH_ROWS", 2)
+    response = client.post("/api/reservoir/solution-gas-oil-ratio/batch", json={
+        "pressure": [2000.0, 2500.0, 3000.0],
+        "temperature": 180.0,
+        "gas_gravity": 0.7,
+        "oil_gravity": 35.0
+    })
+    assert response.status_code == 400 and "limit is 2" in response.json()["detail"]
+
+
+def test_pvt_table_matches_scalar_correlations():
+    """PVT tables bracket the bubble point and export as CSV and PVTO"""
+    fluid = {"gas_oil_ratio": 500.0, "gas_gravity": 0.7, "oil_gravity": 35.0, "temperature": 180.0}
+    body = {"fluids": [fluid, {**fluid, "gas_gravity": -1.0}], "pressures": [1000, 3000, 5000]}
+    response = client.post("/api/reservoir/pvt-table", json=body)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["invalid_fluids"] == 1 and "error" in data["fluids"][1]
+
+    table = data["fluids"][0]
+    pb = petrocalc.reservoir.bubble_point_pressure_standing(500.0, 0.7, 35.0, 180.0)
+    assert math.isclose(table["bubble_point_pressure"], pb)
+    assert table["saturated"] == [True, True, False, False]
+    at_pb = table["pressure"].index(table["bubble_point_pressure"])
+    assert math.isclose(table["solution_gor"][at_pb], 500.0)
+    assert math.isclose(
+        table["oil_fvf"][at_pb],
+        petrocalc.reservoir.oil_formation_volume_factor_standing(500.0, 0.7, 35.0, 180.0, pb)
+    )
+    assert table["oil_fvf"][-1] < table["oil_fvf"][at_pb]
+
+    body["fluids"] = [fluid]
+    lines = client.post("/api/reservoir/pvt-table?format=csv", json=body).text.strip().splitlines()
+    assert len(lines) == 5
+    pvto = client.post("/api/reservoir/pvt-table?format=pvto", json=body).text
+    assert pvto.splitlines()[1] == "PVTO" and pvto.rstrip().endswith("/\n/")
+
+
+def test_decline_forecast_matches_scalar_arps():
+    """Streamed forecasts match petrocalc's Arps functions and switch to terminal decline"""
+    body = {"initial_rate": [1000, 800, 600, -1], "initial_decline_rate": 0.4,
+            "decline_exponent": [0, 0.5, 1, 1], "time": [0, 1, 5, 10]}
+    data = client.post("/api/reservoir/decline-forecast", json=body).json()
+    assert data["decline_type"] == ["exponential", "hyperbolic", "harmonic", None]
+    assert data["rate"][3] is None and data["invalid_wells"] == 1
+    for well, (qi, b) in enumerate([(1000, 0), (800, 0.5), (600, 1)]):
+        for t, rate, cumulative in zip(body["time"], data["rate"][well], data["cumulative"][well]):
+            assert math.isclose(rate, petrocalc.reservoir.arps_decline_curve(qi, t, 0.4, b))
+            assert math.isclose(cumulative, petrocalc.reservoir.cumulative_production_arps(qi, t, 0.4, b),
+                                abs_tol=1e-9)
+
+    terminal = client.post("/api/reservoir/decline-forecast", json={
+        "initial_rate": 1000, "initial_decline_rate": 0.4, "decline_exponent": 1, "terminal_decline_rate": 0.1,
+        "time": [0, 10, 20]
+    }).json()
+    assert math.isclose(terminal["terminal_switch_time"][0], 7.5)
+    switch_rate = petrocalc.reservoir.arps_decline_curve(1000, 7.5, 0.4, 1)
+    assert math.isclose(terminal["rate"][0][2], switch_rate * math.exp(-0.1 * 12.5))
+
+    lines = client.post("/api/reservoir/decline-forecast?format=csv", json={**body, "initial_rate": 100}).text
+    assert lines.splitlines()[0] == "well,time,rate,cumulative" and len(lines.splitlines()) == 17
+
+
+def test_vogel_ipr_curve_matches_scalar():
+    """IPR curves for several wells match the scalar Vogel function and pass through their test points"""
+    response = client.post("/api/production/vogel_ipr_curve", json={
+        "reservoir_pressure": [3000, 2500, 3000],
+        "test_rate": [500, 400, 100],
+        "test_bottomhole_pressure": [2000, 1500, 3500],
+        "points": 5
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["valid"] == [True, True, False]
+    for well, (pr, q_test, pwf_test) in enumerate([(3000, 500, 2000), (2500, 400, 1500)]):
+        qmax = data["maximum_oil_rate_stb_per_day"][well]
+        assert math.isclose(petrocalc.production.vogel_ipr(pr, pwf_test, qmax), q_test)
+        for pwf, rate in zip(data["bottomhole_pressure_psia"][well], data["flow_rate_stb_per_day"][well]):
+            assert math.isclose(rate, petrocalc.production.vogel_ipr(pr, pwf, qmax), abs_tol=1e-9)
+    assert data["flow_rate_stb_per_day"][2] is None
+
+    curve = client.post("/api/production/vogel_ipr_curve", json={
+        "reservoir_pressure": 3000, "test_rate": 500, "test_bottomhole_pressure": 2000,
+        "bottomhole_pressures": [2000]
+    }).json()
+    assert math.isclose(curve["flow_rate_stb_per_day"][0][0], 500)
+
+
+def test_nodal_analysis_operating_point():
+    """The operating point lies on both the IPR and the VLP; dead wells are flagged"""
+    from app.kernels.nodal import vlp_bottomhole_pressure
+
+    well = {
+        "wellhead_pressure": 200.0, "depth": 8000.0, "tubing_diameter": 2.441, "liquid_density": 55.0,
+        "gas_gravity": 0.7, "liquid_viscosity": 2.0, "gas_viscosity": 0.02, "temperature": 150.0,
+        "z_factor": 0.9, "gas_liquid_ratio": 500.0
+    }
+    response = client.post("/api/production/nodal_analysis", json={
+        **well, "reservoir_pressure": [3000, 1200], "maximum_oil_rate": 2000, "include_curves": True
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["flowing_wells"] == 1 and data["valid"] == [True, False]
+    rate = data["operating_rate_stb_per_day"][0]
+    pwf = data["operating_bottomhole_pressure_psia"][0]
+    assert math.isclose(petrocalc.production.vogel_ipr(3000, pwf, 2000), rate, rel_tol=1e-6)
+    assert abs(vlp_bottomhole_pressure(well, rate) - pwf) < 0.5
+    assert len(data["curve_vlp_pressure_psia"][1]) == 30
+
+
+def test_pressure_traverse_round_trip():
+    """Marching up from the computed bottomhole pressure returns to the wellhead pressure"""
+    well = {
+        "oil_rate": 1000, "gas_oil_ratio": 500, "water_rate": 200, "oil_gravity": 35, "gas_gravity": 0.7,
+        "tubing_diameter": 2.5, "wellhead_temperature": 100, "bottomhole_temperature": 200,
+        "survey": [{"measured_depth": 2000}, {"measured_depth": 5000, "inclination": 45, "azimuth": 90},
+                   {"measured_depth": 9000, "inclination": 60, "azimuth": 90}],
+    }
+    down = client.post("/api/production/pressure_traverse", json={**well, "pressure": 200}).json()
+    profile = down["profile"]
+    assert profile["measured_depth_ft"][0] == 0 and profile["measured_depth_ft"][-1] == 9000
+    assert down["true_vertical_depth_ft"] < 9000
+    assert all(b > a for a, b in zip(profile["pressure_psia"], profile["pressure_psia"][1:]))
+    assert all(0 < holdup <= 1 for holdup in profile["liquid_holdup"])
+
+    up = client.post("/api/production/pressure_traverse", json={
+        **well, "pressure": down["bottomhole_pressure_psia"], "direction": "up"
+    }).json()
+    assert abs(up["wellhead_pressure_psia"] - 200) < 2
+    assert up["profile"]["measured_depth_ft"][0] == 0
+
+
+def test_gas_network_balances_weymouth_flows():
+    """Pipe flows follow Weymouth at the solved pressures and balance at every node; warm restarts converge"""
+    network = {
+        "pipe_from": ["plant", "plant", "a", "b", "b"], "pipe_to": ["a", "b", "b", "c", "d"],
+        "pipe_diameter": [8, 6, 4, 4, 3], "pipe_length": [2, 3, 1, 1.5, 0.5], "gas_gravity": 0.65,
+        "temperature": 540, "fixed_pressures": {"plant": 900},
+        "node_flows": {"a": -5000, "c": -8000, "d": -3000},
+    }
+    data = client.post("/api/flow/gas_network", json=network).json()
+    assert data["converged"] and data["node_count"] == 5
+    pressures, flows = data["pressures_psia"], data["pipe_flow_mscf_per_day"]
+    for source, target, diameter, length, flow in zip(
+        network["pipe_from"], network["pipe_to"], network["pipe_diameter"], network["pipe_length"], flows
+    ):
+        high, low = sorted([pressures[source], pressures[target]], reverse=True)
+        expected = petrocalc.flow.gas_flow_rate_weymouth(high, low, diameter, length, 0.65, 540)
+        assert math.isclose(abs(flow), expected, rel_tol=1e-9)
+    assert math.isclose(data["node_flows_mscf_per_day"]["plant"], 16000, rel_tol=1e-6)
+    assert math.isclose(data["node_flows_mscf_per_day"]["b"], 0, abs_tol=0.1)
+
+    warm = client.post("/api/flow/gas_network", json={
+        **network, "node_flows": {"a": -5500, "c": -8000, "d": -3000}, "initial_pressures": pressures
+    }).json()
+    assert warm["converged"] and warm["iterations"] <= 3
+    assert math.isclose(warm["node_flows_mscf_per_day"]["plant"], 16500, rel_tol=1e-6)
+
+
+def test_gas_network_converges_on_large_looped_grid():
+    """A 10k-pipe looped grid with light offtakes converges, and restarts from its pipe flows in a few steps"""
+    side = 72
+    pipe_from = [r * side + c for r in range(side) for c in range(side - 1)] + list(range(side * (side - 1)))
+    pipe_to = [r * side + c + 1 for r in range(side) for c in range(side - 1)] + list(range(side, side * side))
+    network = {
+        "pipe_from": pipe_from, "pipe_to": pipe_to,
+        "pipe_diameter": [4.0 + i % 5 for i in range(len(pipe_from))], "pipe_length": 1.0,
+        "gas_gravity": 0.65, "temperature": 540, "fixed_pressures": {"0": 1000},
+        "node_flows": {str(node): -0.05 - 0.45 * (node % 7) / 6 for node in range(1, side * side)},
+    }
+    assert len(pipe_from) > 10_000
+    data = client.post("/api/flow/gas_network", json=network).json()
+    assert data["converged"] and data["iterations"] <= 10
+    assert data["relative_imbalance"] < 1e-6
+    demand = -sum(network["node_flows"].values())
+    assert math.isclose(data["node_flows_mscf_per_day"]["0"], demand, rel_tol=1e-6)
+
+    warm = client.post("/api/flow/gas_network", json={
+        **network, "initial_pipe_flows": data["pipe_flow_mscf_per_day"],
+        "node_flows": {name: flow * 1.1 for name, flow in network["node_flows"].items()},
+    }).json()
+    assert warm["converged"] and warm["iterations"] <= 3
+    assert math.isclose(warm["node_flows_mscf_per_day"]["0"], 1.1 * demand, rel_tol=1e-6)
+
+
+def test_buildup_analysis_bins_binary_gauge_data():
+    """A 1 Hz synthetic buildup uploaded as packed float64 recovers the Horner slope from log-time bins"""
+    import numpy as np
+
+    seconds = np.arange(-600.0, 3 * 24 * 3600)
+    shut_in = np.maximum(seconds / 3600, 1e-9)
+    pressure = np.where(seconds <= 0, 2000.0, 3000 - 40 * np.log10((500 + shut_in) / shut_in))
+    params = {
+        "production_time": 500, "flow_rate": 500, "porosity": 0.2, "viscosity": 1.0,
+        "total_compressibility": 1e-5, "formation_volume_factor": 1.2, "thickness": 50,
+        "wellbore_radius": 0.3, "time_unit": "seconds", "fit_start": 1,
+    }
+    response = client.post(
+        "/api/production/buildup_analysis", params=params,
+        content=np.column_stack([seconds, pressure]).astype("<f8").tobytes(),
+        headers={"content-type": "application/octet-stream"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["samples"] == len(seconds) and data["bins"] < 200
+    assert data["flowing_pressure_at_shut_in_psia"] == 2000
+    assert math.isclose(data["horner_slope_psi_per_cycle"], 40, rel_tol=1e-3)
+    assert math.isclose(data["extrapolated_pressure_psia"], 3000, abs_tol=0.1)
+    assert math.isclose(data["permeability_md"], 162.6 * 500 * 1.2 / (40 * 50), rel_tol=1e-3)
+    assert len(data["diagnostics"]["bourdet_derivative_psi"]) == data["bins"]
+
+
+LAS_LOG = """~VERSION INFORMATION
+ VERS.   2.0 : CWLS LOG ASCII STANDARD - VERSION 2.0
+ WRAP.   {wrap} : ONE LINE PER DEPTH STEP
+~WELL INFORMATION
+ NULL.   -999.25 : NULL VALUE
+ WELL.   TEST #1 : WELL
+~CURVE INFORMATION
+ DEPT.F     : Depth
+ RHOB.G/C3  : Bulk density
+ NPHI.PU    : Neutron porosity
+ ILD .OHMM  : Deep resistivity
+~A  DEPT RHOB NPHI ILD
+"""
+
+
+def test_log_evaluation_streams_las_files():
+    """Chunked and wrapped LAS uploads give petrocalc's porosity, Sw and Timur permeability per sample"""
+    rows = "1000.0 2.30 24.0 20.0\n1000.5 2.35\n 20.0 15.0\n1001.0 -999.25 18.0 2.0\n1001.5 2.60 5.0 40.0\n"
+    body = (LAS_LOG.format(wrap="YES") + rows).encode()
+    response = client.post("/api/rock_properties/log_evaluation?water_resistivity=0.04&format=json",
+                           content=(body[i:i + 37] for i in range(0, len(body), 37)))
+    assert response.status_code == 200
+    data = response.json()
+    assert data["curves_used"] == {"depth": "DEPT", "density": "RHOB", "neutron": "NPHI", "resistivity": "ILD"}
+    phi = petrocalc.rock_properties.porosity_from_logs(
+        0.24, petrocalc.rock_properties.porosity_from_density_log(2.30, 2.65, 1.0)
+    )
+    sw = petrocalc.rock_properties.water_saturation_archie(20.0, 0.04, phi)
+    assert math.isclose(data["porosity"][0], phi) and math.isclose(data["water_saturation"][0], sw)
+    assert math.isclose(data["permeability"][0], petrocalc.rock_properties.permeability_timur_correlation(phi, sw))
+    assert data["porosity"][2] is None and data["pay"] == [1.0, 1.0, 0.0, 0.0]
+    assert data["summary"]["net_pay"] == 0.75 and data["summary"]["gross_thickness"] == 1.5
+
+    las = client.post("/api/rock_properties/log_evaluation?water_resistivity=0.04",
+                      content=LAS_LOG.format(wrap="NO") + rows.replace("2.35\n", "2.35")).text
+    assert " NETPAY.F" in las and las.splitlines()[-1].split()[-1] == "0.0000"
+    assert client.post("/api/rock_properties/log_evaluation?water_resistivity=0.04",
+                       content=LAS_LOG.format(wrap="NO").replace("ILD", "SP")).status_code == 400
+
+
+def test_kill_sheet_schedule_matches_scalar_step_down():
+    """A single vertical string steps down like pump_pressure_schedule; tapered strings add section boundaries"""
+    body = {
+        "original_mud_weight": 10.0, "shut_in_drillpipe_pressure": 520, "true_vertical_depth": 10000,
+        "slow_pump_rate_pressure": 800, "pump_output": 0.1, "stroke_interval": 100,
+        "drillstring": [{"length": 10000, "capacity": 0.0178}],
+        "annulus": [{"length": 10000, "hole_diameter": 8.5, "pipe_outer_diameter": 5.0}],
+        "shoe_true_vertical_depth": 5000, "leak_off_mud_weight": 14.5,
+    }
+    data = client.post("/api/pressure/kill_sheet", json={**body, "include_annulus": False}).json()
+    kmw = petrocalc.pressure.kill_mud_weight(10.0, 520, 10000)
+    icp, fcp = data["initial_circulating_pressure_psi"], data["final_circulating_pressure_psi"]
+    assert data["kill_mud_weight_ppg"] == kmw and icp == 1320
+    assert fcp == petrocalc.pressure.final_circulating_pressure(800, 10.0, kmw)
+    assert data["maasp_psi"] == petrocalc.pressure.maximum_allowable_annular_surface_pressure(0.052 * 14.5 * 5000, 10.0, 5000)
+    schedule = data["schedule"]
+    assert math.isclose(schedule["stroke"][-1], 1780) and schedule["location"][-1] == "drillstring"
+    for stroke, pressure in zip(schedule["stroke"], schedule["drillpipe_pressure_psi"]):
+        assert math.isclose(pressure, petrocalc.pressure.pump_pressure_schedule(icp, fcp, 1780, stroke))
+
+    margin = client.post("/api/pressure/kill_sheet", json={
+        **body, "include_annulus": False, "kill_mud_weight_margin": 0.3
+    }).json()
+    assert math.isclose(margin["kill_mud_weight_ppg"], kmw + 0.3)
+    assert margin["schedule"]["drillpipe_pressure_psi"][0] == icp
+    assert math.isclose(margin["schedule"]["drillpipe_pressure_psi"][-1], margin["final_circulating_pressure_psi"])
+
+    tapered = {**body, "drillstring": [{"length": 9400, "inner_diameter": 4.276, "name": "DP"},
+                                       {"length": 600, "inner_diameter": 2.8125, "name": "DC"}]}
+    lines = client.post("/api/pressure/kill_sheet?format=csv", json=tapered).text.strip().splitlines()
+    assert lines[0].startswith("stroke,volume_bbl,location,section")
+    assert any(",drillstring,DC,9400.0," in line for line in lines) and lines[-1].split(",")[2] == "annulus"
+
+
+def test_pressure_profile_matches_scalar_gradients():
+    """Without logs the profile follows the petrocalc gradients; a density log is integrated cumulatively"""
+    body = {"wells": [{"name": "trend"}], "base_depth": 20000, "formation_water_density": 67.0}
+    well = client.post("/api/pressure/pressure_profile", json=body).json()["wells"][0]
+    profile = well["profile"]
+    assert well["samples"] == 20001 and profile["pore_pressure_ppg"][0] is None
+    for depth in (500, 1000, 12000, 20000):
+        overburden = petrocalc.pressure.overburden_pressure_gradient(depth)
+        pore = petrocalc.pressure.formation_pressure_gradient(67.0)
+        fracture = petrocalc.pressure.fracture_pressure_gradient(overburden, pore, 0.25)
+        assert math.isclose(profile["overburden_pressure_psi"][depth], overburden * depth)
+        assert math.isclose(profile["fracture_pressure_psi"][depth], fracture * depth)
+        assert math.isclose(profile["fracture_ppg"][depth],
+                            petrocalc.pressure.equivalent_mud_weight(fracture * depth, depth))
+
+    logged = {"wells": [{"depth": [1000, 2000, 3000], "bulk_density": [2.0, None, 2.4]}], "kick_margin": 0.5}
+    data = client.post("/api/pressure/pressure_profile", json=logged).json()["wells"][0]
+    start = petrocalc.pressure.overburden_pressure_gradient(1000) * 1000
+    assert math.isclose(data["profile"]["overburden_pressure_psi"][2], start + 0.052 * 8.345 * 2.2 * 2000)
+    assert math.isclose(data["summary"]["minimum_mud_weight_ppg"], 67.0 / 144 / 0.052 + 0.5)
+
+    lines = client.post("/api/pressure/pressure_profile?format=csv", json=logged).text.strip().splitlines()
+    assert lines[0].startswith("well,depth_ft,") and lines[1].startswith("well 1,1000.0,") and len(lines) == 4
+
+
+def test_monte_carlo_economics_reproducible_percentiles():
+    """Seeded trials reproduce exactly; fixed inputs collapse to the deterministic petrocalc NPV; sizes are capped"""
+    fixed = {"oil_price": 70, "initial_rate": 300, "decline_rate": 0, "operating_cost_per_barrel": 20,
+             "capital_cost": 5e6, "discount_rate": 0.1, "project_life": 10, "trials": 1000}
+    data = client.post("/api/economics/monte_carlo", json=fixed).json()
+    annual = 300 * 365 * (70 * (1 - 0.125) - 20)
+    expected = petrocalc.economics.net_present_value([annual] * 10, 0.1, 5e6)
+    for key in ("p10", "p50", "p90"):
+        assert math.isclose(data["net_present_value"][key], expected, rel_tol=1e-9)
+    assert data["tornado"] == []
+
+    uncertain = {**fixed, "trials": 60_000, "seed": 7,
+                 "oil_price": {"distribution": "triangular", "low": 40, "mode": 70, "high": 110},
+                 "capital_cost": {"distribution": "uniform", "low": 4e6, "high": 6e6}}
+    first = client.post("/api/economics/monte_carlo", json=uncertain).json()
+    get_cache().clear()
+    second = client.post("/api/economics/monte_carlo", json=uncertain).json()
+    assert first == second
+    npv = first["net_present_value"]
+    assert npv["p90"] < npv["p50"] < npv["p10"] and sum(npv["histogram"]["counts"]) == 60_000
+    assert [bar["variable"] for bar in first["tornado"]] == ["oil_price", "capital_cost"]
+    for field in ("project_life", "histogram_bins"):
+        response = client.post("/api/economics/monte_carlo", json={**fixed, field: 10**9})
+        assert response.status_code == 400 and field in response.json()["detail"]
+
+
+def test_irr_batch_matches_scalar_and_flags_multiple_roots():
+    """Single-root projects match the scalar IRR; sign-changing flows report every root"""
+    response = client.post("/api/economics/internal_rate_of_return_batch", json={
+        "cash_flows": [[300, 400, 500], [5, -6, 0], [0, 0, 0], [300, 400]],
+        "initial_investment": [800, 1, 10, 800],
+    })
+    assert response.status_code == 400
+
+    data = client.post("/api/economics/internal_rate_of_return_batch", json={
+        "cash_flows": [[300, 400, 500], [5, -6, 0], [0, 0, 0]],
+        "initial_investment": [800, 1, 10],
+    }).json()
+    expected = petrocalc.economics.internal_rate_of_return([300, 400, 500], 800, 1e-10)
+    assert math.isclose(data["internal_rate_of_return"][0], expected, rel_tol=1e-8)
+    assert data["status"] == ["ok", "multiple_roots", "no_root"]
+    assert [round(rate, 8) for rate in data["roots"][1]] == [1.0, 2.0]
+    assert data["internal_rate_of_return"][2] is None and data["projects_without_root"] == 1
+
+
+def test_batch_dispatch_across_modules():
+    """Batch items run against different routers and keep their order"""
+    response = client.post("/api/batch", json={"items": [
+        {"endpoint": "/api/drilling/hydrostatic-pressure",
+         "payload": {"mud_weight": 12.0, "depth": 10000}},
+        {"endpoint": "fluids/water-viscosity",
+         "payload": {"temperature": 180, "pressure": 2500}},
+        {"endpoint": "/api/drilling/hydrostatic-pressure",
+         "payload": {"mud_weight": "heavy"}},
+        {"endpoint": "/api/unknown/endpoint", "payload": {}},
+        {"endpoint": "/api/batch", "payload": {"items": []}},
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    statuses = [item["status"] for item in data["results"]]
+    assert statuses == [200, 200, 422, 404, 404]
+    assert [item["index"] for item in data["results"]] == [0, 1, 2, 3, 4]
+    assert abs(data["results"][0]["result"]["hydrostatic_pressure"] - 6240) < 1
+    assert data["succeeded"] == 2 and data["failed"] == 3
+
+
+def test_sensitivity_ranks_inputs_with_elasticities():
+    """Darcy flow is linear in k and h and inverse in viscosity; the radii barely matter"""
+    base = {"permeability": 100, "thickness": 50, "pressure_drop": 500, "viscosity": 1.0,
+            "formation_volume_factor": 1.2, "wellbore_radius": 0.35, "drainage_radius": 1000}
+    data = client.post("/api/sensitivity", json={
+        "endpoint": "production/darcy_radial_flow", "base": base, "pairwise": True,
+        "ranges": {"permeability": {"low": 50, "high": 150}, "viscosity": {"variation": 0.5},
+                   "drainage_radius": {}},
+    }).json()
+    assert data["output"] == "flow_rate_stb_per_day" and data["cases"] == 1 + 2 * 3 + 4 * 3 and data["failed"] == 0
+    assert data["base_output"] == petrocalc.production.darcy_radial_flow(100, 50, 500, 1.0, 1.2, 0.35, 1000)
+    tornado = {bar["variable"]: bar for bar in data["tornado"]}
+    assert [bar["variable"] for bar in data["tornado"]] == ["viscosity", "permeability", "drainage_radius"]
+    assert math.isclose(tornado["permeability"]["elasticity"], 1.0)
+    assert math.isclose(tornado["viscosity"]["elasticity_high"], -1 / 1.5)
+    assert tornado["drainage_radius"]["low_input"] == 900
+    pair = next(entry for entry in data["interactions"] if entry["variables"] == ["permeability", "viscosity"])
+    assert pair["output_high_low"] == petrocalc.production.darcy_radial_flow(150, 50, 500, 0.5, 1.2, 0.35, 1000)
+
+    response = client.post("/api/sensitivity", json={"endpoint": "production/darcy_radial_flow", "base": base,
+                                                     "ranges": {"porosity": {}}})
+    assert response.status_code == 400
+
+
+def test_sweep_streams_cartesian_product():
+    """Points come back in product order (last input fastest) with progress lines, or as CSV"""
+    body = {"endpoint": "flow/moody_friction_factor", "progress": True,
+            "inputs": {"reynolds_number": {"start": 1e4, "stop": 1e6, "points": 3, "scale": "log"},
+                       "relative_roughness": {"values": [1e-4, 1e-3]}}}
+    response = client.post("/api/sweep", json=body)
+    assert response.headers["x-sweep-points"] == "6"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    rows, progress = lines[:-1], lines[-1]["progress"]
+    assert progress == {"completed": 6, "total": 6, "failed": 0, "fraction": 1.0, "done": True}
+    assert [(row["reynolds_number"], row["relative_roughness"]) for row in rows] == [
+        (1e4, 1e-4), (1e4, 1e-3), (1e5, 1e-4), (1e5, 1e-3), (1e6, 1e-4), (1e6, 1e-3)]
+    assert math.isclose(rows[3]["friction_factor"], petrocalc.flow.moody_friction_factor(1e5, 1e-3))
+
+    lines = client.post("/api/sweep?format=csv", json={**body, "inputs": {
+        "reynolds_number": {"start": 2000, "stop": 3000, "step": 500}, "relative_roughness": {"values": [1e-3]}
+    }}).text.strip().splitlines()
+    assert lines[0] == "row,status,reynolds_number,relative_roughness,friction_factor,error" and len(lines) == 4
+
+    too_big = {**body, "inputs": {"reynolds_number": {"start": 1, "stop": 2, "points": 1001},
+                                  "relative_roughness": {"start": 0, "stop": 1, "points": 1000}}}
+    assert client.post("/api/sweep", json=too_big).status_code == 400
+
+
+def test_sweep_evaluates_registry_calculations_as_columns():
+    """Registry calculations sweep chunk by chunk as columns, with the same rows as single calls"""
+    body = {"endpoint": "drilling/hydrostatic-pressure", "base": {"depth": 10000},
+            "inputs": {"mud_weight": {"values": [10, "heavy", 12]}}}
+    rows = [json.loads(line) for line in client.post("/api/sweep", json=body).text.splitlines()]
+    assert [(row["row"], row["status"], row["mud_weight"]) for row in rows] == [
+        (0, 200, 10), (1, 422, "heavy"), (2, 200, 12)]
+    single = client.post("/api/drilling/hydrostatic-pressure?response=slim", json={"mud_weight": 12, "depth": 10000})
+    assert {key: rows[2][key] for key in single.json()} == single.json()
+
+
+def test_bulk_csv_upload_streams_results():
+    """CSV records are evaluated row by row, bad rows reported in place"""
+    body = "temperature,pressure,salinity\n180,2500,\n200,3000,50000\nhot,2500,0\n"
+    response = client.post(
+        "/api/bulk/fluids/water-viscosity?format=csv",
+        content=body,
+        headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.strip().splitlines()
+    assert lines[0].startswith("row,status,")
+    assert len(lines) == 4
+    assert lines[3].startswith("2,422,")
+
+
+def test_bulk_ndjson_multipart_upload():
+    """NDJSON uploaded as a multipart file streams back NDJSON"""
+    body = '{"mud_weight": 12.0, "depth": 10000}\n\n{"mud_weight": 10.0, "depth": 5000}\nnot json\n'
+    response = client.post(
+        "/api/bulk/drilling/hydrostatic-pressure",
+        files={"file": ("wells.ndjson", body, "application/x-ndjson")}
+    )
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["status"] for row in rows] == [200, 200, 400]
+    assert abs(rows[0]["hydrostatic_pressure"] - 6240) < 1
+
+
+def test_slim_response_drops_echoed_inputs():
+    """Slim mode returns only computed outputs and units, by query or Accept header"""
+    payload = {"mud_weight": 12.0, "depth": 10000}
+    full = client.post("/api/drilling/hydrostatic-pressure", json=payload).json()
+    slim = client.post("/api/drilling/hydrostatic-pressure?response=slim", json=payload)
+    assert slim.status_code == 200
+    assert slim.headers["content-type"] == "application/vnd.petrocalc.slim+json"
+    assert slim.json() == {key: full[key] for key in ("unit", "hydrostatic_pressure", "pressure_unit")}
+
+    response = client.post(
+        "/api/economics/net_present_value",
+        json={"cash_flows": [100.0] * 50, "discount_rate": 0.1, "initial_investment": 500},
+        headers={"Accept": "application/vnd.petrocalc.slim+json"}
+    )
+    assert list(response.json()) == ["net_present_value"]
+
+    batch = client.post("/api/batch?response=slim", json={"items": [
+        {"endpoint": "/api/drilling/hydrostatic-pressure", "payload": payload}
+    ]}).json()
+    assert "mud_weight" not in batch["results"][0]["result"]
+
+
+def test_metrics_endpoint_reports_route_counters():
+    """Requests show up in the Prometheus metrics under their route template"""
+    client.post("/api/drilling/hydrostatic-pressure", json={"mud_weight": 12.0, "depth": 10000})
+    client.post("/api/drilling/hydrostatic-pressure", json={"mud_weight": "heavy"})
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    labels = 'method="POST",route="/api/drilling/hydrostatic-pressure"'
+    assert f'petrocalc_requests_total{{{labels},status="422"}}' in text
+    assert f'petrocalc_request_errors_total{{{labels}}}' in text
+    assert f'petrocalc_request_duration_seconds_bucket{{{labels},le="+Inf"}}' in text
+    for phase in ("validation", "compute", "serialization"):
+        assert f'petrocalc_phase_duration_seconds_count{{{labels},phase="{phase}"}}' in text
+    assert 'route="/api/metrics"' not in text
+
+
+def test_routers_and_petrocalc_load_on_first_use():
+    """Importing the app loads neither the calculation routers nor petrocalc"""
+    probe = (
+        "import sys, app.main; "
+        "print(sorted(m for m in ('petrocalc', 'numpy', 'app.routers.drilling') if m in sys.modules))"
+    )
+    output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+    assert output.strip().splitlines()[-1] == "[]"
+
+
+def test_registry_generates_batch_routes_and_catalog():
+    """Registry calculations get a matching batch route and are listed in the catalog"""
+    temperatures = [150.0, 200.0, 150.0]
+    response = client.post("/api/thermodynamics/heat_capacity_gas/batch", json={
+        "gas_gravity": [0.65, 0.7, None], "temperature": temperatures
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["rows"] == 3 and data["invalid_rows"] == 1
+    assert data["valid"] == [True, True, False]
+    assert data["error"][2] == "gas_gravity must be finite"
+    for gravity, temperature, value in zip([0.65, 0.7], temperatures, data["heat_capacity_btu_per_lb_f"]):
+        expected = petrocalc.thermodynamics.heat_capacity_gas(gravity, temperature, 14.7)
+        assert math.isclose(value, expected)
+    assert data["heat_capacity_btu_per_lb_f"][2] is None
+
+    scalar = client.post("/api/thermodynamics/heat_capacity_gas", json={"gas_gravity": 0.65, "temperature": 150})
+    assert scalar.json()["heat_capacity_btu_per_lb_f"] == data["heat_capacity_btu_per_lb_f"][0]
+
+    catalog = client.get("/api/calculations").json()["calculations"]
+    entry = catalog["/api/drilling/hydrostatic-pressure"]
+    assert entry["routes"]["batch"] == "/api/drilling/hydrostatic-pressure/batch"
+    assert [spec["name"] for spec in entry["inputs"]][:2] == ["mud_weight", "depth"]
+
+    bulk = client.post(
+        "/api/bulk/drilling/hydrostatic-pressure?format=csv",
+        content="mud_weight,depth\n12,10000\nx,5\n",
+        headers={"Content-Type": "text/csv"}
+    )
+    lines = bulk.text.splitlines()
+    assert lines[1].startswith("0,200,12.0,10000.0,ppg,6240.0")
+    assert lines[2].startswith("1,422,")
+
+
+def test_registry_batch_chunks_stay_within_executor_queue(monkeypatch):
+    """A batch split into more chunks than the executor queue holds is evaluated without 503s"""
+    import asyncio
+
+    import numpy as np
+
+    from app import registry
+    from app.executor import get_executor
+    from app.routers import drilling
+
+    monkeypatch.setattr(registry, "BATCH_CHUNK_ROWS", 5)
+    n_rows = 5 * (get_executor().max_queue + get_executor().max_workers + 10)
+    calculation = next(calc for calc in drilling.CALCULATIONS if calc.path == "pipe-velocity")
+    flow_rate = np.linspace(100, 600, n_rows)
+    values, errors = asyncio.run(calculation.evaluate(
+        {"flow_rate": flow_rate, "pipe_inner_diameter": np.full(n_rows, 4.0)}, n_rows
+    ))
+    assert errors == [None] * n_rows
+    assert math.isclose(values[-1], petrocalc.drilling.pipe_velocity(600.0, 4.0))
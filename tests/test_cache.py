@@ -0,0 +1,55 @@
+"""
+Test file for the calculation result cache.
+"""
+
+import time
+
+from fastapi.testclient import TestClient
+
+from app.cache import CalculationCache, get_cache
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_lru_eviction_and_ttl():
+    """Least-recently-used entries are evicted and stale entries expire"""
+    cache = CalculationCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+    cache = CalculationCache(ttl_seconds=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+
+
+def test_byte_budget():
+    """Entries are evicted once the byte budget is exceeded"""
+    cache = CalculationCache(max_bytes=100)
+    cache.set("a", 1, size=60)
+    cache.set("b", 2, size=60)
+    assert cache.get("a") is None
+    assert cache.bytes == 60
+
+
+def test_endpoint_results_are_cached():
+    """Identical requests, defaults included, hit the cache"""
+    cache = get_cache()
+    cache.clear()
+    hits = cache.hits
+    payload = {"mud_weight": 12.0, "depth": 10000}
+    first = client.post("/api/drilling/hydrostatic-pressure", json=payload).json()
+    second = client.post("/api/drilling/hydrostatic-pressure", json={**payload, "unit": "ppg"}).json()
+    assert first == second
+    assert cache.hits == hits + 1
+
+    status = client.get("/api/status").json()["cache"]
+    assert status["entries"] >= 1
+    assert status["approx_bytes"] > 0
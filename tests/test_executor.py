@@ -0,0 +1,102 @@
+"""
+Test file for the calculation execution layer.
+"""
+
+import asyncio
+import time
+
+import petrocalc
+import pytest
+from fastapi import HTTPException
+
+from app.executor import Admission, CalculationExecutor, _admission
+
+
+def test_classification():
+    """Listed functions and long sequences are offloaded, cheap calls are not"""
+    executor = CalculationExecutor(max_workers=2, offload_min_items=10)
+    assert executor.should_offload(petrocalc.economics.internal_rate_of_return, ([1.0], 1.0), {})
+    assert executor.should_offload(petrocalc.economics.net_present_value, ([1.0] * 10, 0.1), {})
+    assert not executor.should_offload(petrocalc.drilling.hydrostatic_pressure, (12.0, 10000, "ppg"), {})
+    executor.enabled = False
+    assert not executor.should_offload(petrocalc.economics.internal_rate_of_return, ([1.0], 1.0), {})
+
+
+def test_offloaded_call_returns_result():
+    """Offloaded calls return the same result and update the counters"""
+    executor = CalculationExecutor(max_workers=2)
+    result = asyncio.run(executor.run(petrocalc.drilling.hydrostatic_pressure, 12.0, 10000, "ppg", offload=True))
+    assert abs(result - 6240) < 1
+    status = executor.get_status()
+    assert status["offloaded_total"] == 1
+    assert status["active"] == 0 and status["queued"] == 0
+    executor.shutdown()
+
+
+def test_full_queue_rejects():
+    """Calls beyond the worker and queue limits are rejected with 503"""
+    executor = CalculationExecutor(max_workers=1, max_queue=0)
+
+    async def scenario():
+        busy = asyncio.create_task(executor.run(time.sleep, 0.2, offload=True))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as excinfo:
+            await executor.run(abs, -1, offload=True)
+        await busy
+        return excinfo.value.status_code
+
+    assert asyncio.run(scenario()) == 503
+    assert executor.get_status()["rejected_total"] == 1
+    executor.shutdown()
+
+
+def test_admitted_request_fans_out_without_rejection():
+    """Calls of an admitted request wait for a worker; only new requests are rejected"""
+    executor = CalculationExecutor(max_workers=1, max_queue=0)
+
+    async def request(calls: int):
+        _admission.set(Admission())
+        return await asyncio.gather(*(executor.run(abs, -i, offload=True) for i in range(calls)))
+
+    async def scenario():
+        fan_out = asyncio.create_task(request(20))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException):
+            await asyncio.create_task(request(1))
+        return await fan_out
+
+    assert asyncio.run(scenario()) == list(range(20))
+    status = executor.get_status()
+    assert status["rejected_total"] == 1 and status["offloaded_total"] == 20
+    assert status["queued"] == 0 and status["queued_requests"] == 0
+    executor.shutdown()
+
+
+def test_map_calculation_bounds_chunks_in_flight():
+    """map_calculation keeps at most max_workers chunks in flight and preserves order"""
+    from app import executor as executor_module
+
+    in_flight = peak = 0
+
+    def work(chunk):
+        return chunk * 2
+
+    async def track(awaitable):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            return await awaitable
+        finally:
+            in_flight -= 1
+
+    async def scenario():
+        return await executor_module.gather_bounded(
+            (track(asyncio.sleep(0.001, result=i)) for i in range(50)), limit=4
+        ), await executor_module.map_calculation(work, range(200))
+
+    rejected = executor_module.get_executor().rejected
+    bounded, mapped = asyncio.run(scenario())
+    assert bounded == list(range(50)) and peak == 4
+    assert mapped == [2 * i for i in range(200)]
+    assert executor_module.get_executor().rejected == rejected